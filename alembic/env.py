@@ -3,7 +3,7 @@ from alembic import context
 import os
 from dotenv import load_dotenv
 from sqlalchemy import engine_from_config, pool
-from app.database import Base, engine  # Usa o engine do seu arquivo database.py
+from app.database import Base, get_engine  # Usa o engine do seu arquivo database.py
 from app.database import User, Product, PurchaseRequest, RefreshToken, AccessTokenBlacklist  # Importa suas models
 from sqlalchemy.engine.url import URL
 
@@ -42,7 +42,7 @@ def run_migrations_offline() -> None:
 
 def run_migrations_online() -> None:
     """Executa migrações no modo online."""
-    connectable = engine  # Usa o engine já configurado no database.py
+    connectable = get_engine()  # Usa o engine já configurado no database.py
 
     with connectable.connect() as connection:
         context.configure(
@@ -0,0 +1,28 @@
+"""purchase request product/status index
+
+Revision ID: 9b3d6e2a5c14
+Revises: 4f2a9c1e7b30
+Create Date: 2026-10-18 10:03:17.550482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3d6e2a5c14'
+down_revision: Union[str, None] = '4f2a9c1e7b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_purchase_product_status', 'purchase_requests', ['product_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_purchase_product_status', table_name='purchase_requests')
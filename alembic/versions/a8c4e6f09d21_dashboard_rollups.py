@@ -0,0 +1,59 @@
+"""dashboard rollups
+
+Revision ID: a8c4e6f09d21
+Revises: f3b8d21c6e47
+Create Date: 2026-10-18 18:27:53.640291
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e6f09d21'
+down_revision: Union[str, None] = 'f3b8d21c6e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_product_movements',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('inbound', sa.Integer(), nullable=False),
+    sa.Column('outbound', sa.Integer(), nullable=False),
+    sa.Column('movements', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    op.create_index('idx_daily_movement_day', 'daily_product_movements', ['day'], unique=False)
+    # O tipo prstatus já existe (tabela purchase_requests)
+    op.create_table('purchase_request_status_counts',
+    sa.Column('status', postgresql.ENUM('PENDING', 'APPROVED', 'REJECTED', name='prstatus', create_type=False), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('status', 'shard')
+    )
+    # Backfill a partir do histórico existente (o mesmo que `python -m app.rollups`)
+    op.execute(
+        "INSERT INTO daily_product_movements (product_id, day, inbound, outbound, movements) "
+        "SELECT product_id, date(created_at), "
+        "SUM(CASE WHEN quantity > 0 THEN quantity ELSE 0 END), "
+        "SUM(CASE WHEN quantity < 0 THEN -quantity ELSE 0 END), COUNT(*) "
+        "FROM stock_movements GROUP BY product_id, date(created_at)"
+    )
+    op.execute(
+        "INSERT INTO purchase_request_status_counts (status, shard, count) "
+        "SELECT status, 0, COUNT(*) FROM purchase_requests GROUP BY status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('purchase_request_status_counts')
+    op.drop_index('idx_daily_movement_day', table_name='daily_product_movements')
+    op.drop_table('daily_product_movements')
@@ -0,0 +1,52 @@
+"""unique pending purchase request per product
+
+Revision ID: b6d2f9e41a73
+Revises: a8c4e6f09d21
+Create Date: 2026-10-18 21:14:36.208917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2f9e41a73'
+down_revision: Union[str, None] = 'a8c4e6f09d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SCs pendentes duplicadas (geração automática concorrente) impedem o
+    # índice. Decidir qual delas vale é uma decisão de negócio: a migração
+    # lista as duplicadas e para, sem alterar nenhuma SC
+    rows = op.get_bind().execute(sa.text(
+        "SELECT product_id, id FROM purchase_requests WHERE status = 'PENDING' AND product_id IN ("
+        "SELECT product_id FROM purchase_requests WHERE status = 'PENDING' "
+        "GROUP BY product_id HAVING COUNT(*) > 1) ORDER BY product_id, id"
+    )).all()
+    if rows:
+        duplicates = {}
+        for product_id, request_id in rows:
+            duplicates.setdefault(product_id, []).append(request_id)
+        listed = "; ".join(f"produto {product_id}: SCs {ids}" for product_id, ids in duplicates.items())
+        raise RuntimeError(
+            f"{len(duplicates)} produto(s) com mais de uma SC pendente ({listed}). "
+            "Aprove ou rejeite as excedentes e rode a migração de novo."
+        )
+    op.create_index(
+        'uq_purchase_pending_product',
+        'purchase_requests',
+        ['product_id'],
+        unique=True,
+        postgresql_where=sa.text("status = 'PENDING'"),
+        sqlite_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_purchase_pending_product', table_name='purchase_requests')
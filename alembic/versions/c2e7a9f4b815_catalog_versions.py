@@ -0,0 +1,33 @@
+"""catalog versions
+
+Revision ID: c2e7a9f4b815
+Revises: b6d2f9e41a73
+Create Date: 2026-10-18 22:41:07.552310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e7a9f4b815'
+down_revision: Union[str, None] = 'b6d2f9e41a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sem linhas iniciais: o primeiro incremento de cada shard as cria (upsert)
+    op.create_table('catalog_versions',
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('shard')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_versions')
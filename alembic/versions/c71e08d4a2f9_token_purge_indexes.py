@@ -0,0 +1,30 @@
+"""token purge indexes
+
+Revision ID: c71e08d4a2f9
+Revises: 9b3d6e2a5c14
+Create Date: 2026-10-18 11:40:05.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71e08d4a2f9'
+down_revision: Union[str, None] = '9b3d6e2a5c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index('idx_blacklist_revoked_at', 'access_token_blacklist', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_blacklist_revoked_at', table_name='access_token_blacklist')
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
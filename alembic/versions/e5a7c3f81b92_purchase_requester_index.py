@@ -0,0 +1,28 @@
+"""purchase requester index
+
+Revision ID: e5a7c3f81b92
+Revises: c71e08d4a2f9
+Create Date: 2026-10-18 14:05:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3f81b92'
+down_revision: Union[str, None] = 'c71e08d4a2f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_purchase_requester', 'purchase_requests', ['requester_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_purchase_requester', table_name='purchase_requests')
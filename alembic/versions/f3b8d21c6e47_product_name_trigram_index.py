@@ -0,0 +1,41 @@
+"""product name trigram index
+
+Revision ID: f3b8d21c6e47
+Revises: e5a7c3f81b92
+Create Date: 2026-10-18 16:42:09.518833
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d21c6e47'
+down_revision: Union[str, None] = 'e5a7c3f81b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índice GIN trigram para lower(name) LIKE '%termo%' (crud.search_products).
+    # Só existe no Postgres; nos demais bancos a busca faz varredura.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'idx_products_name_trgm',
+        'products',
+        [sa.text('lower(name) gin_trgm_ops')],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('idx_products_name_trgm', table_name='products')
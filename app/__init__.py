@@ -1,45 +1,82 @@
 # app/__init__.py
+#
+# Os submódulos são importados sob demanda (PEP 562): `import app` não carrega
+# FastAPI, passlib ou SQLAlchemy até que algum nome abaixo seja acessado.
 
-from .auth import (
-    get_password_hash,
-    verify_password,
-    authenticate_user,
-    create_access_token,
-    create_refresh_token,
-    revoke_refresh_token,
-    is_token_revoked,
-    verify_token,
-)
+import importlib
 
-from .utils import (
-    verify_password,
-    create_access_token,
-    create_refresh_token,
-    verify_access_token,
-)
+# nome exportado -> (submódulo, atributo)
+_EXPORTS = {
+    # auth
+    "get_password_hash": ("hashing", "get_password_hash"),
+    "authenticate_user": ("auth", "authenticate_user"),
+    "revoke_refresh_token": ("auth", "revoke_refresh_token"),
+    "is_token_revoked": ("auth", "is_token_revoked"),
+    "verify_token": ("auth", "verify_token"),
+    # utils
+    "verify_password": ("hashing", "verify_password"),
+    "create_access_token": ("utils", "create_access_token"),
+    "create_refresh_token": ("utils", "create_refresh_token"),
+    "verify_access_token": ("utils", "verify_access_token"),
+    # login
+    "login_router": ("login", "router"),
+    # database
+    "User": ("database", "User"),
+    "Product": ("database", "Product"),
+    "PurchaseRequest": ("database", "PurchaseRequest"),
+    "StockMovement": ("database", "StockMovement"),
+    "SessionLocal": ("database", "SessionLocal"),
+    "engine": ("database", "engine"),
+    "UserRole": ("database", "UserRole"),
+    "PRStatus": ("database", "PRStatus"),
+    "AsyncSessionLocal": ("database", "AsyncSessionLocal"),
+    "async_engine": ("database", "async_engine"),
+    "get_db": ("database", "get_db"),
+    "get_async_db": ("database", "get_async_db"),
+    # crud
+    "create_user": ("crud", "create_user"),
+    "get_user_by_id": ("crud", "get_user_by_id"),
+    "get_user_by_email": ("crud", "get_user_by_email"),
+    "get_all_users": ("crud", "get_all_users"),
+    "update_user_password": ("crud", "update_user_password"),
+    "update_user": ("crud", "update_user"),
+    "delete_user": ("crud", "delete_user"),
+    "create_product": ("crud", "create_product"),
+    "get_product_by_id": ("crud", "get_product_by_id"),
+    "get_all_products": ("crud", "get_all_products"),
+    "update_product": ("crud", "update_product"),
+    "delete_product": ("crud", "delete_product"),
+    "create_purchase_request": ("crud", "create_purchase_request"),
+    "get_purchase_request_by_id": ("crud", "get_purchase_request_by_id"),
+    "get_purchase_requests_by_user": ("crud", "get_purchase_requests_by_user"),
+    "get_all_purchase_requests": ("crud", "get_all_purchase_requests"),
+    "update_purchase_request_status": ("crud", "update_purchase_request_status"),
+    "bulk_update_purchase_request_status": ("crud", "bulk_update_purchase_request_status"),
+    "delete_purchase_request": ("crud", "delete_purchase_request"),
+    "get_users_page": ("crud", "get_users_page"),
+    "get_products_page": ("crud", "get_products_page"),
+    "iter_products": ("crud", "iter_products"),
+    "search_products": ("crud", "search_products"),
+    "get_purchase_requests_page": ("crud", "get_purchase_requests_page"),
+    "get_critical_products_page": ("crud", "get_critical_products_page"),
+    "get_purchase_request_summaries_page": ("crud", "get_purchase_request_summaries_page"),
+    "iter_purchase_requests": ("crud", "iter_purchase_requests"),
+    "apply_stock_movements": ("crud", "apply_stock_movements"),
+    "get_stock_movements_by_product": ("crud", "get_stock_movements_by_product"),
+    "generate_purchase_requests": ("crud", "generate_purchase_requests"),
+    "get_daily_movements": ("crud", "get_daily_movements"),
+    "get_purchase_request_status_counts": ("crud", "get_purchase_request_status_counts"),
+}
 
-from .login import router as login_router
-from .database import User, Product, PurchaseRequest, SessionLocal, engine, UserRole, PRStatus
-from .crud import (
-    create_user,
-    get_user_by_id,
-    get_user_by_email,
-    get_all_users,
-    update_user_password,
-    update_user,
-    delete_user,
-    create_product,
-    get_product_by_id,
-    get_all_products,
-    update_product,
-    delete_product,
-    create_purchase_request,
-    get_purchase_request_by_id,
-    get_purchase_requests_by_user,
-    get_all_purchase_requests,
-    update_purchase_request_status,
-    delete_purchase_request,
-)
+__all__ = list(_EXPORTS)
 
-# Funções adicionais podem ser importadas conforme necessidade
 
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _EXPORTS[name]
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attr)
+    globals()[name] = value
+    return value
+
+# Funções adicionais podem ser importadas conforme necessidade
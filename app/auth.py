@@ -4,10 +4,12 @@ from uuid import uuid4
 
 from dotenv import load_dotenv
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app.database import User, RefreshToken, AccessTokenBlacklist
+from app.revocation import revocation_filter
+from app.cache import decode_token
+from app.hashing import get_password_hash, verify_password, verify_and_update
 
 # ----- Carrega variáveis do ambiente -----
 load_dotenv()
@@ -17,20 +19,7 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
-# ----- Configuração de criptografia -----
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# ------------------------------------------------------
-# ------------------ Funções de senha ------------------
-# ------------------------------------------------------
-
-def get_password_hash(password: str) -> str:
-    """Gera o hash da senha usando bcrypt + salt."""
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica se a senha fornecida corresponde ao hash armazenado."""
-    return pwd_context.verify(plain_password, hashed_password)
+# Funções de senha (get_password_hash, verify_password) vêm de app.hashing
 
 # ------------------------------------------------------
 # ------------------ Autenticação ----------------------
@@ -39,11 +28,17 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def authenticate_user(db: Session, email: str, password: str) -> User | None:
     """Autentica o usuário:
     - Busca o email.
-    - Verifica a senha.
+    - Verifica a senha (refazendo o hash se o custo do bcrypt mudou).
     Retorna o usuário ou None."""
     user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
+        return None
+    valid, new_hash = verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
 # ------------------------------------------------------
@@ -111,13 +106,19 @@ def create_refresh_token(db: Session, user_id: int) -> str:
 # ------------------------------------------------------
 
 def revoke_refresh_token(db: Session, jti: str) -> None:
-    """Revoga um refresh token, adicionando-o à blacklist."""
-    db_token = AccessTokenBlacklist(jti=jti, revoked_at=datetime.utcnow())
+    """Revoga um refresh token, adicionando-o à blacklist.
+    Só o jti é conhecido aqui: ele também preenche a coluna token (única)."""
+    db_token = AccessTokenBlacklist(token=jti, jti=jti, revoked_at=datetime.utcnow())
     db.add(db_token)
     db.commit()
+    revocation_filter.add(jti)
 
 def is_token_revoked(db: Session, jti: str) -> bool:
-    """Verifica se o refresh token está na blacklist."""
+    """Verifica se o refresh token está na blacklist.
+    O filtro em memória responde os casos negativos sem consultar o banco."""
+    revocation_filter.refresh(db)
+    if not revocation_filter.might_contain(jti):
+        return False
     db_token = db.query(AccessTokenBlacklist).filter(AccessTokenBlacklist.jti == jti).first()
     return db_token is not None
 
@@ -128,10 +129,11 @@ def is_token_revoked(db: Session, jti: str) -> bool:
 def verify_token(db: Session, token: str, token_type: str = "access") -> dict:
     """Verifica a validade do token:
     - Access token: verifica assinatura e expiração.
-    - Refresh token: consulta o banco para verificar validade.
+    - Refresh token: consulta o banco para verificar validade em uma única query
+      (a blacklist só entra na consulta se o filtro em memória indicar possível revogação).
     Retorna o payload ou levanta JWTError."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise JWTError("Invalid token or signature.")
 
@@ -142,13 +144,20 @@ def verify_token(db: Session, token: str, token_type: str = "access") -> dict:
         jti = payload.get("jti")
         user_id = int(payload["sub"])
 
-        if is_token_revoked(db, jti):
-            raise JWTError("Refresh token has been revoked.")
+        revocation_filter.refresh(db)
+        maybe_revoked = revocation_filter.might_contain(jti)
 
-        db_token = db.query(RefreshToken).filter_by(jti=jti, user_id=user_id).first()
+        query = db.query(RefreshToken.revoked, RefreshToken.expires_at)
+        if maybe_revoked:
+            query = query.add_columns(AccessTokenBlacklist.id).outerjoin(
+                AccessTokenBlacklist, AccessTokenBlacklist.jti == RefreshToken.jti
+            )
+        db_token = query.filter(RefreshToken.jti == jti, RefreshToken.user_id == user_id).first()
 
         if not db_token:
             raise JWTError("Refresh token not found in database.")
+        if maybe_revoked and db_token[2] is not None:
+            raise JWTError("Refresh token has been revoked.")
         if db_token.revoked:
             raise JWTError("Refresh token revoked.")
         if db_token.expires_at < datetime.utcnow():
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from jose import jwt
+
+from app.metrics import Gauge, Histogram
+from app.revocation import revocation_filter
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "50000"))
+
+# ------------------------------------------------------
+# ------------------ Cache TTL/LRU ---------------------
+# ------------------------------------------------------
+
+class TTLCache:
+    """Cache em memória limitado por tamanho (LRU) e por tempo de vida (TTL).
+    Seguro para uso entre threads; mantém contadores de acertos e falhas.
+
+    Leituras da origem concorrentes com uma invalidação: pegue `generation()`
+    antes de ler a origem e passe o valor para `set`. Se alguma invalidação
+    aconteceu no meio, o valor lido pode estar velho e não é gravado."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Incrementada por invalidate/clear
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Retorna o valor em cache ou None se ausente/expirado."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def set(self, key, value, ttl: float | None = None, generation: int | None = None) -> bool:
+        """Armazena o valor; `ttl` sobrescreve o tempo de vida padrão.
+        Com `generation`, só grava se não houve invalidação desde então.
+        Retorna se o valor foi gravado."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return True
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+# ------------------------------------------------------
+# ------------------ Cache de usuários -----------------
+# ------------------------------------------------------
+
+@dataclass(frozen=True)
+class Principal:
+    """Dados mínimos do usuário autenticado mantidos em cache."""
+    id: int
+    email: str
+    role: str
+
+# Cache de usuários autenticados por id; invalidado pelo crud (após o commit)
+# ao alterar/remover usuários. get_current_user grava com `generation`.
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+# ------------------------------------------------------
+# ------------------ Cache de tokens -------------------
+# ------------------------------------------------------
+
+# Payloads de tokens já verificados, indexados pelo hash do token.
+# Cada entrada expira junto com o próprio token (claim "exp").
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=0)
+
+JWT_DECODE_SECONDS = Histogram("jwt_decode_seconds", "Tempo de verificação completa de um JWT (falhas do cache)")
+
+_decode_lock = threading.Lock()
+_decode_count = 0
+_decode_seconds = 0.0
+
+def decode_token(token: str, secret_key: str, algorithms: list[str]) -> dict:
+    """Decodifica e verifica o JWT, reaproveitando verificações anteriores.
+    Tokens com jti possivelmente revogado nunca são servidos do cache.
+    Levanta JWTError como jwt.decode."""
+    global _decode_count, _decode_seconds
+    key = (hashlib.sha256(token.encode()).digest(), tuple(algorithms))
+    payload = token_cache.get(key)
+    if payload is not None:
+        jti = payload.get("jti")
+        if jti is None or not revocation_filter.might_contain(jti):
+            return dict(payload)
+        token_cache.invalidate(key)
+
+    start = time.perf_counter()
+    payload = jwt.decode(token, secret_key, algorithms=algorithms)
+    elapsed = time.perf_counter() - start
+    JWT_DECODE_SECONDS.observe(elapsed)
+    with _decode_lock:
+        _decode_count += 1
+        _decode_seconds += elapsed
+
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = exp - time.time()
+        if ttl > 0:
+            token_cache.set(key, dict(payload), ttl=ttl)
+    return payload
+
+def token_cache_stats() -> dict:
+    """Estatísticas do cache de tokens, incluindo o tempo de CPU economizado
+    (acertos x tempo médio de uma verificação completa)."""
+    stats = token_cache.stats()
+    with _decode_lock:
+        avg_decode = _decode_seconds / _decode_count if _decode_count else 0.0
+        stats["decodes"] = _decode_count
+        stats["decode_seconds"] = _decode_seconds
+    stats["avg_decode_seconds"] = avg_decode
+    stats["saved_seconds"] = stats["hits"] * avg_decode
+    return stats
+
+def _cache_gauge(field: str):
+    def collect():
+        return [
+            ({"cache": "principal"}, principal_cache.stats()[field]),
+            ({"cache": "token"}, token_cache.stats()[field]),
+        ]
+    return collect
+
+Gauge("cache_hits", "Acertos dos caches em memória", _cache_gauge("hits"))
+Gauge("cache_misses", "Falhas dos caches em memória", _cache_gauge("misses"))
+Gauge("cache_entries", "Entradas nos caches em memória", _cache_gauge("size"))
@@ -0,0 +1,109 @@
+import os
+import random
+import time
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.database import DATABASE_REPLICA_URLS, CatalogVersion
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "1000"))
+# Tempo de vida dos corpos em cache (o ETag já muda a cada escrita)
+CATALOG_MAX_AGE = float(os.getenv("CATALOG_MAX_AGE", "30"))
+# Linhas do contador de versão (1 = sem divisão)
+CATALOG_VERSION_SHARDS = int(os.getenv("CATALOG_VERSION_SHARDS", "8"))
+# Com réplicas de leitura, a listagem logo após uma escrita pode ainda não
+# enxergá-la: por esse intervalo as respostas não vão para o cache nem levam ETag.
+CATALOG_SETTLE_SECONDS = float(os.getenv("CATALOG_SETTLE_SECONDS", "2" if DATABASE_REPLICA_URLS else "0"))
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# ------------------------------------------------------
+# ------------------ Versão do catálogo ----------------
+# ------------------------------------------------------
+# Guardada no banco (tabela catalog_versions), e não no processo: todos os
+# workers enxergam a mesma versão, e nenhum responde 304 para dados que outro
+# worker já alterou. O crud (e a importação) chama bump_catalog_version antes
+# do commit da própria escrita, então versão e dados mudam juntos.
+
+_bumped_at = float("-inf")
+
+def _bump_statement(dialect: str):
+    table = CatalogVersion.__table__
+    try:
+        stmt = _INSERTS[dialect](table)
+    except KeyError:
+        raise RuntimeError(f"Versão do catálogo não suportada no banco {dialect!r}") from None
+    return stmt.values(shard=random.randrange(CATALOG_VERSION_SHARDS), version=1).on_conflict_do_update(
+        index_elements=["shard"],
+        set_={"version": table.c.version + 1},
+    )
+
+def bump_catalog_version(db: Session) -> None:
+    """Marca o catálogo como alterado na transação corrente, sem commit."""
+    global _bumped_at
+    db.execute(_bump_statement(db.get_bind().dialect.name))
+    _bumped_at = time.monotonic()
+
+async def bump_catalog_version_async(db) -> None:
+    """Variante de bump_catalog_version para AsyncSession."""
+    global _bumped_at
+    await db.execute(_bump_statement(db.get_bind().dialect.name))
+    _bumped_at = time.monotonic()
+
+def catalog_version(db: Session) -> int:
+    return db.execute(select(func.coalesce(func.sum(CatalogVersion.version), 0))).scalar_one()
+
+def catalog_etag(version: int) -> str:
+    return f'W/"{version}"'
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparação fraca: ignora o prefixo W/
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+# ------------------------------------------------------
+# ------------------ Respostas condicionais ------------
+# ------------------------------------------------------
+
+# Corpos JSON já serializados, por (versão, rota, parâmetros). Entradas de
+# versões antigas nunca mais são lidas e saem pelo LRU.
+response_cache = TTLCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_MAX_AGE or 3600)
+
+def _serialize(result) -> bytes:
+    return result.model_dump_json().encode() if isinstance(result, BaseModel) else result
+
+def catalog_response(request: Request, db: Session, build) -> Response:
+    """Resposta de listagem do catálogo com ETag.
+    - If-None-Match igual ao ETag atual: 304 após uma única consulta (a versão).
+    - Caso contrário, serve o corpo em cache da versão atual ou chama
+      `build()` (que retorna o modelo pydantic da resposta) e guarda o JSON.
+    A versão é lida antes dos dados: uma escrita no meio só deixa o corpo
+    mais novo que o ETag, nunca o contrário."""
+    if time.monotonic() - _bumped_at < CATALOG_SETTLE_SECONDS:
+        return Response(content=_serialize(build()), media_type="application/json", headers={"Cache-Control": "no-cache"})
+
+    version = catalog_version(db)
+    etag = catalog_etag(version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (etag, request.url.path, str(request.query_params))
+    body = response_cache.get(key)
+    if body is None:
+        body = _serialize(build())
+        response_cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
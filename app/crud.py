@@ -1,14 +1,30 @@
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from app.database import User, Product, PurchaseRequest, UserRole, PRStatus
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import DateTime, bindparam, case, exists, func, insert, literal, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.pagination import encode_cursor, STREAM_BATCH_SIZE
+from app.database import User, Product, PurchaseRequest, StockMovement, UserRole, PRStatus, DailyProductMovement, PurchaseRequestStatusCount, PENDING_PURCHASE_REQUEST
+from app.cache import principal_cache
+from app.catalog import bump_catalog_version
+from app.hashing import get_password_hash
+from app.search import product_index
+from app.rollups import purchase_request_status_totals, record_rollups
+from dotenv import load_dotenv
 
-# Instância do CryptContext para hash de senhas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+# Alçada do comprador nas decisões em lote: quantidade máxima de uma SC que ele
+# pode aprovar ou rejeitar (acima disso, só o gerente)
+BUYER_APPROVAL_MAX_QUANTITY = int(os.getenv("BUYER_APPROVAL_MAX_QUANTITY", "100"))
 
 # ---------------------- USERS ----------------------
 
 def create_user(db: Session, email: str, password: str, role: UserRole) -> User:
-    hashed_password = pwd_context.hash(password)
+    hashed_password = get_password_hash(password)
     user = User(email=email, hashed_password=hashed_password, role=role)
     db.add(user)
     db.commit()
@@ -24,12 +40,23 @@ def get_user_by_email(db: Session, email: str) -> User | None:
 def get_all_users(db: Session) -> list[User]:
     return db.query(User).all()
 
+def get_users_page(db: Session, limit: int, after_id: int | None = None) -> tuple[list[User], str | None]:
+    """Página de usuários por keyset (id crescente). Retorna (usuários, próximo cursor)."""
+    query = select(User).order_by(User.id).limit(limit)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    users = list(db.execute(query).scalars())
+    next_cursor = encode_cursor({"id": users[-1].id}) if len(users) == limit else None
+    return users, next_cursor
+
 def update_user_password(db: Session, user_id: int, new_password: str) -> User | None:
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         return None
-    user.hashed_password = pwd_context.hash(new_password)
+    user.hashed_password = get_password_hash(new_password)
+    bump_catalog_version(db)
     db.commit()
+    principal_cache.invalidate(user_id)
     db.refresh(user)
     return user
 
@@ -40,10 +67,12 @@ def update_user(db: Session, user_id: int, email: str = None, password: str = No
     if email:
         user.email = email
     if password:
-        user.hashed_password = pwd_context.hash(password)
+        user.hashed_password = get_password_hash(password)
     if role:
         user.role = role
+    bump_catalog_version(db)
     db.commit()
+    principal_cache.invalidate(user_id)
     db.refresh(user)
     return user
 
@@ -51,8 +80,13 @@ def delete_user(db: Session, user_id: int) -> bool:
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         return False
+    # As SCs do usuário saem em cascata: desconta dos contadores por status
+    removed = db.execute(purchase_request_status_totals(PurchaseRequest.requester_id == user_id)).all()
+    record_rollups(db, status_deltas={status: -count for status, count in removed})
     db.delete(user)
+    bump_catalog_version(db)
     db.commit()
+    principal_cache.invalidate(user_id)
     return True
 
 # ---------------------- PRODUCTS ----------------------
@@ -60,8 +94,10 @@ def delete_user(db: Session, user_id: int) -> bool:
 def create_product(db: Session, name: str, min_stock: int, max_stock: int, current_stock: int = 0) -> Product:
     product = Product(name=name, min_stock=min_stock, max_stock=max_stock, current_stock=current_stock)
     db.add(product)
+    bump_catalog_version(db)
     db.commit()
     db.refresh(product)
+    product_index.add(product.id, product.name)
     return product
 
 def get_product_by_id(db: Session, product_id: int) -> Product | None:
@@ -70,6 +106,44 @@ def get_product_by_id(db: Session, product_id: int) -> Product | None:
 def get_all_products(db: Session) -> list[Product]:
     return db.query(Product).all()
 
+def get_products_page(db: Session, limit: int, after_id: int | None = None) -> tuple[list[Product], str | None]:
+    """Página de produtos por keyset (id crescente). Retorna (produtos, próximo cursor)."""
+    query = select(Product).order_by(Product.id).limit(limit)
+    if after_id is not None:
+        query = query.where(Product.id > after_id)
+    products = list(db.execute(query).scalars())
+    next_cursor = encode_cursor({"id": products[-1].id}) if len(products) == limit else None
+    return products, next_cursor
+
+def get_critical_products_page(db: Session, limit: int, after_id: int | None = None) -> tuple[list[Product], str | None]:
+    """Página (keyset, id crescente) dos produtos com estoque atual <= mínimo."""
+    query = select(Product).where(Product.current_stock <= Product.min_stock).order_by(Product.id).limit(limit)
+    if after_id is not None:
+        query = query.where(Product.id > after_id)
+    products = list(db.execute(query).scalars())
+    next_cursor = encode_cursor({"id": products[-1].id}) if len(products) == limit else None
+    return products, next_cursor
+
+def search_products(db: Session, q: str, limit: int) -> list[Product]:
+    """Produtos cujo nome contém `q` (sem diferenciar maiúsculas). No Postgres
+    o filtro usa o índice trigram de lower(name) (idx_products_name_trgm).
+    Ordem: nomes que começam com `q`, depois os mais curtos."""
+    term = q.strip().lower()
+    name = func.lower(Product.name)
+    query = (
+        select(Product)
+        .where(name.contains(term, autoescape=True))
+        .order_by(case((name.startswith(term, autoescape=True), 0), else_=1), func.length(Product.name), Product.name, Product.id)
+        .limit(limit)
+    )
+    return list(db.execute(query).scalars())
+
+def iter_products(db: Session, batch_size: int = STREAM_BATCH_SIZE):
+    """Percorre todos os produtos com cursor do servidor (yield_per),
+    mantendo em memória apenas um lote por vez."""
+    query = select(Product).order_by(Product.id).execution_options(yield_per=batch_size)
+    yield from db.execute(query).scalars()
+
 def update_product(db: Session, product_id: int, name: str = None, min_stock: int = None, max_stock: int = None, current_stock: int = None) -> Product | None:
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
@@ -82,28 +156,63 @@ def update_product(db: Session, product_id: int, name: str = None, min_stock: in
         product.max_stock = max_stock
     if current_stock is not None:
         product.current_stock = current_stock
+    bump_catalog_version(db)
     db.commit()
     db.refresh(product)
+    if name:
+        product_index.add(product.id, product.name)
     return product
 
 def delete_product(db: Session, product_id: int) -> bool:
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         return False
+    # As SCs do produto saem em cascata (as movimentações diárias também, pela FK)
+    removed = db.execute(purchase_request_status_totals(PurchaseRequest.product_id == product_id)).all()
+    record_rollups(db, status_deltas={status: -count for status, count in removed})
     db.delete(product)
+    bump_catalog_version(db)
     db.commit()
+    product_index.remove(product_id)
     return True
 
 # ---------------------- PURCHASE REQUESTS ----------------------
 
-def create_purchase_request(db: Session, product_id: int, quantity: int, requester_id: int) -> PurchaseRequest:
+def pending_purchase_request_exists(product_id: int):
+    """SELECT EXISTS de SC pendente do produto."""
+    return select(
+        exists().where(PurchaseRequest.product_id == product_id, PurchaseRequest.status == PRStatus.PENDING)
+    )
+
+def _save_pending(db: Session, product_id: int, change) -> bool:
+    """Aplica `change` (SC nova ou que volta a ficar pendente) em um savepoint.
+    Se o produto já tiver outra SC pendente (índice único parcial
+    uq_purchase_pending_product), desfaz só o savepoint, encerra a transação
+    sem gravar nada e retorna False; outras violações de integridade (ex.:
+    produto inexistente) são repassadas."""
+    try:
+        with db.begin_nested():
+            change()
+    except IntegrityError:
+        if not db.scalar(pending_purchase_request_exists(product_id)):
+            raise
+        db.commit()
+        return False
+    return True
+
+def create_purchase_request(db: Session, product_id: int, quantity: int, requester_id: int) -> PurchaseRequest | None:
+    """Cria uma SC pendente. Retorna None, sem gravar nada, se o produto já
+    tiver uma SC pendente."""
     purchase_request = PurchaseRequest(
         product_id=product_id,
         quantity=quantity,
         requester_id=requester_id,
         status=PRStatus.PENDING
     )
-    db.add(purchase_request)
+    if not _save_pending(db, product_id, lambda: db.add(purchase_request)):
+        return None
+    record_rollups(db, status_deltas={PRStatus.PENDING: 1})
+    bump_catalog_version(db)
     db.commit()
     db.refresh(purchase_request)
     return purchase_request
@@ -111,25 +220,397 @@ def create_purchase_request(db: Session, product_id: int, quantity: int, request
 def get_purchase_request_by_id(db: Session, request_id: int) -> PurchaseRequest | None:
     return db.query(PurchaseRequest).filter(PurchaseRequest.id == request_id).first()
 
-def get_purchase_requests_by_user(db: Session, user_id: int) -> list[PurchaseRequest]:
-    return db.query(PurchaseRequest).filter(PurchaseRequest.requester_id == user_id).all()
+def get_purchase_requests_by_user(db: Session, user_id: int, with_product: bool = False) -> list[PurchaseRequest]:
+    """SCs do solicitante. Com `with_product`, os produtos vêm em uma única
+    query extra (selectinload), sem uma consulta por SC."""
+    query = db.query(PurchaseRequest).filter(PurchaseRequest.requester_id == user_id)
+    if with_product:
+        query = query.options(selectinload(PurchaseRequest.product))
+    return query.all()
 
 def get_all_purchase_requests(db: Session) -> list[PurchaseRequest]:
     return db.query(PurchaseRequest).all()
 
+def _purchase_requests_query(
+    status: PRStatus | None = None,
+    requester_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    query = select(PurchaseRequest)
+    if status is not None:
+        query = query.where(PurchaseRequest.status == status)
+    if requester_id is not None:
+        query = query.where(PurchaseRequest.requester_id == requester_id)
+    if created_from is not None:
+        query = query.where(PurchaseRequest.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(PurchaseRequest.created_at < created_to)
+    return query
+
+def get_purchase_requests_page(
+    db: Session,
+    limit: int,
+    before_id: int | None = None,
+    status: PRStatus | None = None,
+    requester_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    with_details: bool = False,
+) -> tuple[list[PurchaseRequest], str | None]:
+    """Página de SCs por keyset, das mais recentes para as mais antigas (id decrescente),
+    com filtros opcionais de status, solicitante e período [created_from, created_to).
+    Com `with_details`, produto e solicitante vêm na mesma query (joinedload)."""
+    query = _purchase_requests_query(status, requester_id, created_from, created_to)
+    if before_id is not None:
+        query = query.where(PurchaseRequest.id < before_id)
+    query = query.order_by(PurchaseRequest.id.desc()).limit(limit)
+    if with_details:
+        query = query.options(joinedload(PurchaseRequest.product), joinedload(PurchaseRequest.requester))
+    requests = list(db.execute(query).scalars())
+    next_cursor = encode_cursor({"id": requests[-1].id}) if len(requests) == limit else None
+    return requests, next_cursor
+
+# Colunas da projeção compacta das SCs (ordem das tuplas)
+PURCHASE_REQUEST_SUMMARY_FIELDS = [
+    "id", "status", "quantity", "created_at",
+    "product_id", "product_name", "requester_id", "requester_email",
+]
+
+def get_purchase_request_summaries_page(
+    db: Session,
+    limit: int,
+    before_id: int | None = None,
+    status: PRStatus | None = None,
+    requester_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> tuple[list[tuple], str | None]:
+    """Mesma página de get_purchase_requests_page, mas como tuplas
+    (PURCHASE_REQUEST_SUMMARY_FIELDS) lidas em uma única query com JOIN,
+    sem montar entidades ORM."""
+    query = _purchase_requests_query(status, requester_id, created_from, created_to).with_only_columns(
+        PurchaseRequest.id,
+        PurchaseRequest.status,
+        PurchaseRequest.quantity,
+        PurchaseRequest.created_at,
+        PurchaseRequest.product_id,
+        Product.name,
+        PurchaseRequest.requester_id,
+        User.email,
+    )
+    query = query.join_from(PurchaseRequest, Product, PurchaseRequest.product).join_from(
+        PurchaseRequest, User, PurchaseRequest.requester
+    )
+    if before_id is not None:
+        query = query.where(PurchaseRequest.id < before_id)
+    query = query.order_by(PurchaseRequest.id.desc()).limit(limit)
+    rows = [tuple(row) for row in db.execute(query)]
+    next_cursor = encode_cursor({"id": rows[-1][0]}) if len(rows) == limit else None
+    return rows, next_cursor
+
+def iter_purchase_requests(
+    db: Session,
+    status: PRStatus | None = None,
+    requester_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+):
+    """Percorre as SCs filtradas com cursor do servidor (yield_per)."""
+    query = _purchase_requests_query(status, requester_id, created_from, created_to)
+    query = query.order_by(PurchaseRequest.id).execution_options(yield_per=batch_size)
+    yield from db.execute(query).scalars()
+
+# INSERT com ON CONFLICT por dialeto (nos demais bancos, só o NOT EXISTS)
+_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def generate_purchase_requests(db: Session, requester_id: int, product_ids: list[int] | None = None, commit: bool = True) -> int:
+    """Cria SCs automáticas para todo produto com estoque atual <= mínimo
+    que ainda não tenha SC pendente, em um único INSERT ... SELECT.
+    A quantidade solicitada repõe o estoque até o máximo.
+    `product_ids` restringe a avaliação aos produtos informados (ex.: os que
+    acabaram de ter movimentação). Retorna o número de SCs criadas.
+    Em READ COMMITTED, duas execuções simultâneas podem passar pelo NOT EXISTS
+    para o mesmo produto: o índice único parcial de SCs pendentes barra a
+    segunda, e o ON CONFLICT DO NOTHING a descarta em vez de abortar o lote."""
+    pending = select(PurchaseRequest.id).where(
+        PurchaseRequest.product_id == Product.id,
+        PurchaseRequest.status == PRStatus.PENDING,
+    )
+    source = select(
+        Product.id,
+        Product.max_stock - Product.current_stock,
+        literal(requester_id),
+        literal(PRStatus.PENDING, PurchaseRequest.__table__.c.status.type),
+        literal(datetime.utcnow(), DateTime()),
+    ).where(
+        Product.current_stock <= Product.min_stock,
+        ~exists(pending),
+    )
+    if product_ids is not None:
+        if not product_ids:
+            return 0
+        source = source.where(Product.id.in_(product_ids))
+
+    dialect = db.get_bind().dialect.name
+    stmt = _CONFLICT_INSERTS.get(dialect, insert)(PurchaseRequest.__table__).from_select(
+        ["product_id", "quantity", "requester_id", "status", "created_at"], source
+    )
+    if dialect in _CONFLICT_INSERTS:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["product_id"], index_where=text(PENDING_PURCHASE_REQUEST))
+    result = db.execute(stmt)
+    record_rollups(db, status_deltas={PRStatus.PENDING: result.rowcount})
+    bump_catalog_version(db)
+    if commit:
+        db.commit()
+    return result.rowcount
+
+def _lock_purchase_request(db: Session, request_id: int) -> PurchaseRequest | None:
+    """Lê a SC travando a linha (FOR UPDATE) e com o status atual do banco: o
+    status lido decide a variação dos contadores, e duas decisões concorrentes
+    sobre a mesma SC não podem partir do mesmo status antigo."""
+    return (
+        db.query(PurchaseRequest)
+        .filter(PurchaseRequest.id == request_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+
 def update_purchase_request_status(db: Session, request_id: int, status: PRStatus) -> PurchaseRequest | None:
-    purchase_request = db.query(PurchaseRequest).filter(PurchaseRequest.id == request_id).first()
+    """Muda o status da SC. Retorna None se ela não existir ou se, ao voltar
+    para pendente, o produto já tiver outra SC pendente (nada é gravado)."""
+    purchase_request = _lock_purchase_request(db, request_id)
     if not purchase_request:
         return None
+    previous = purchase_request.status
+    if previous != status:
+        if status == PRStatus.PENDING:
+            if not _save_pending(db, purchase_request.product_id, lambda: setattr(purchase_request, "status", status)):
+                return None
+        record_rollups(db, status_deltas={previous: -1, status: 1})
     purchase_request.status = status
+    bump_catalog_version(db)
     db.commit()
     db.refresh(purchase_request)
     return purchase_request
 
+def bulk_update_purchase_request_status(
+    db: Session,
+    request_ids: list[int],
+    status: PRStatus,
+    approver_role: UserRole,
+    buyer_limit: int = BUYER_APPROVAL_MAX_QUANTITY,
+) -> dict:
+    """Aprova ou rejeita várias SCs pendentes em um único UPDATE ... RETURNING.
+    Regras de alçada aplicadas no próprio statement:
+    - Gerente decide qualquer SC.
+    - Comprador só decide SCs com quantidade até `buyer_limit`
+      (BUYER_APPROVAL_MAX_QUANTITY) e que não excedam o estoque máximo do
+      produto (regra do README: acima dele, a aprovação é do gerente).
+    - Operador não decide SCs.
+    SCs inexistentes, já decididas ou fora da alçada ficam em "not_updated".
+    Retorna {"updated": [ids], "not_updated": [ids]}."""
+    if status == PRStatus.PENDING:
+        raise ValueError("O novo status deve ser aprovado ou rejeitado")
+    requested = sorted(set(request_ids))
+    if not requested or approver_role not in (UserRole.BUYER, UserRole.MANAGER):
+        return {"updated": [], "not_updated": requested}
+
+    requests = PurchaseRequest.__table__
+    stmt = update(requests).where(
+        requests.c.id.in_(requested),
+        requests.c.status == PRStatus.PENDING,
+    )
+    if approver_role == UserRole.BUYER:
+        max_stock = select(Product.max_stock).where(Product.id == requests.c.product_id).scalar_subquery()
+        stmt = stmt.where(requests.c.quantity <= buyer_limit, requests.c.quantity <= max_stock)
+    stmt = stmt.values(status=status).returning(requests.c.id)
+
+    updated = set(db.execute(stmt).scalars())
+    record_rollups(db, status_deltas={PRStatus.PENDING: -len(updated), status: len(updated)})
+    bump_catalog_version(db)
+    db.commit()
+    return {
+        "updated": sorted(updated),
+        "not_updated": [request_id for request_id in requested if request_id not in updated],
+    }
+
 def delete_purchase_request(db: Session, request_id: int) -> bool:
-    purchase_request = db.query(PurchaseRequest).filter(PurchaseRequest.id == request_id).first()
+    purchase_request = _lock_purchase_request(db, request_id)
     if not purchase_request:
         return False
+    record_rollups(db, status_deltas={purchase_request.status: -1})
     db.delete(purchase_request)
+    bump_catalog_version(db)
     db.commit()
     return True
+
+# ---------------------- STOCK MOVEMENTS ----------------------
+
+def apply_stock_movements(db: Session, movements: list[dict], user_id: int | None = None) -> dict:
+    """Aplica um lote de movimentações de estoque em uma única transação.
+    - Agrupa as quantidades por produto e trava as linhas (em ordem de id).
+    - Atualiza o estoque com `current_stock = current_stock + delta` no SQL.
+    - Produtos inexistentes ou que ficariam com estoque negativo são rejeitados
+      inteiros; os demais são aplicados.
+    - Com `user_id`, gera no mesmo commit as SCs dos produtos cujo estoque caiu
+      para o mínimo (avaliando só os produtos do lote).
+    Retorna {"applied", "products", "rejected": [{"product_id", "reason"}],
+    "purchase_requests_created"}."""
+    deltas = defaultdict(int)
+    for movement in movements:
+        deltas[movement["product_id"]] += movement["quantity"]
+    if not deltas:
+        return {"applied": 0, "products": [], "rejected": [], "purchase_requests_created": 0}
+
+    product_ids = sorted(deltas)
+    current = dict(
+        db.execute(
+            select(Product.id, Product.current_stock)
+            .where(Product.id.in_(product_ids))
+            .order_by(Product.id)
+            .with_for_update()
+        ).all()
+    )
+
+    rejected = []
+    accepted = set()
+    for product_id in product_ids:
+        if product_id not in current:
+            rejected.append({"product_id": product_id, "reason": "Produto não encontrado"})
+        elif current[product_id] + deltas[product_id] < 0:
+            rejected.append({"product_id": product_id, "reason": "Estoque insuficiente"})
+        else:
+            accepted.add(product_id)
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "product_id": m["product_id"],
+            "user_id": user_id,
+            "quantity": m["quantity"],
+            "note": m.get("note"),
+            "created_at": now,
+        }
+        for m in movements
+        if m["product_id"] in accepted and m["quantity"] != 0
+    ]
+    updates = [
+        {"b_id": product_id, "b_delta": deltas[product_id]}
+        for product_id in sorted(accepted)
+        if deltas[product_id] != 0
+    ]
+
+    products = Product.__table__
+    if updates:
+        db.execute(
+            update(products)
+            .where(products.c.id == bindparam("b_id"))
+            .values(current_stock=products.c.current_stock + bindparam("b_delta")),
+            updates,
+        )
+    if rows:
+        db.execute(insert(StockMovement.__table__), rows)
+        record_rollups(db, movements=rows)
+
+    created = 0
+    decreased = [product_id for product_id in sorted(accepted) if deltas[product_id] < 0]
+    if user_id is not None and decreased:
+        created = generate_purchase_requests(db, user_id, product_ids=decreased, commit=False)
+    bump_catalog_version(db)
+    db.commit()
+    return {
+        "applied": len(rows),
+        "products": sorted(accepted),
+        "rejected": rejected,
+        "purchase_requests_created": created,
+    }
+
+def get_stock_movements_by_product(db: Session, product_id: int) -> list[StockMovement]:
+    return (
+        db.query(StockMovement)
+        .filter(StockMovement.product_id == product_id)
+        .order_by(StockMovement.created_at)
+        .all()
+    )
+
+# ---------------------- DASHBOARD ----------------------
+# Leituras dos rollups (app/rollups.py): custo proporcional aos dias pedidos,
+# não ao tamanho do histórico.
+
+def get_daily_movements(db: Session, start: date, end: date, product_id: int | None = None) -> list[dict]:
+    """Entradas/saídas por dia de `start` a `end` (inclusive), de um produto ou
+    do catálogo inteiro. Dias sem movimentação aparecem zerados."""
+    daily = DailyProductMovement
+    query = (
+        select(daily.day, func.sum(daily.inbound), func.sum(daily.outbound), func.sum(daily.movements))
+        .where(daily.day >= start, daily.day <= end)
+        .group_by(daily.day)
+    )
+    if product_id is not None:
+        query = query.where(daily.product_id == product_id)
+    totals = {day: (inbound, outbound, movements) for day, inbound, outbound, movements in db.execute(query)}
+    series = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        inbound, outbound, movements = totals.get(day, (0, 0, 0))
+        series.append({"day": day, "inbound": inbound, "outbound": outbound, "movements": movements})
+    return series
+
+def get_purchase_request_status_counts(db: Session) -> dict[PRStatus, int]:
+    """Quantidade de SCs por status (soma dos shards do contador)."""
+    counts = {status: 0 for status in PRStatus}
+    query = select(PurchaseRequestStatusCount.status, func.sum(PurchaseRequestStatusCount.count)).group_by(
+        PurchaseRequestStatusCount.status
+    )
+    counts.update({status: total for status, total in db.execute(query)})
+    return counts
+
+# ---------------------- EXPORTS ----------------------
+# Consultas de colunas (sem entidades ORM) usadas nas exportações em streaming.
+
+PRODUCT_EXPORT_FIELDS = ["id", "name", "current_stock", "min_stock", "max_stock"]
+PURCHASE_REQUEST_EXPORT_FIELDS = ["id", "product_id", "quantity", "requester_id", "status", "created_at"]
+STOCK_MOVEMENT_EXPORT_FIELDS = ["id", "product_id", "user_id", "quantity", "note", "created_at"]
+
+def products_export_query(product_id: int | None = None):
+    query = select(*(getattr(Product, f) for f in PRODUCT_EXPORT_FIELDS)).order_by(Product.id)
+    if product_id is not None:
+        query = query.where(Product.id == product_id)
+    return query
+
+def purchase_requests_export_query(
+    status: PRStatus | None = None,
+    product_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    query = select(*(getattr(PurchaseRequest, f) for f in PURCHASE_REQUEST_EXPORT_FIELDS))
+    if status is not None:
+        query = query.where(PurchaseRequest.status == status)
+    if product_id is not None:
+        query = query.where(PurchaseRequest.product_id == product_id)
+    if created_from is not None:
+        query = query.where(PurchaseRequest.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(PurchaseRequest.created_at < created_to)
+    return query.order_by(PurchaseRequest.id)
+
+def stock_movements_export_query(
+    product_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    query = select(*(getattr(StockMovement, f) for f in STOCK_MOVEMENT_EXPORT_FIELDS))
+    if product_id is not None:
+        query = query.where(StockMovement.product_id == product_id)
+    if created_from is not None:
+        query = query.where(StockMovement.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(StockMovement.created_at < created_to)
+    if product_id is not None:
+        # Percorre o índice (product_id, created_at) na ordem cronológica
+        return query.order_by(StockMovement.created_at, StockMovement.id)
+    return query.order_by(StockMovement.id)
@@ -0,0 +1,201 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.hashing import get_password_hash
+from app.database import User, Product, PurchaseRequest, UserRole, PRStatus
+from app.executor import hash_executor
+from app.cache import principal_cache
+from app.catalog import bump_catalog_version_async
+from app.crud import pending_purchase_request_exists
+from app.search import product_index
+from app.rollups import purchase_request_status_totals, record_rollups_async
+
+# Variantes assíncronas das funções de app/crud.py, para uso com AsyncSession.
+# O hash de senha (bcrypt) roda no hash_executor para não bloquear o event loop.
+
+# ---------------------- USERS ----------------------
+
+async def create_user(db: AsyncSession, email: str, password: str, role: UserRole) -> User:
+    hashed_password = await hash_executor.run(get_password_hash, password)
+    user = User(email=email, hashed_password=hashed_password, role=role)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+    return await db.get(User, user_id)
+
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+async def get_all_users(db: AsyncSession) -> list[User]:
+    result = await db.execute(select(User))
+    return list(result.scalars().all())
+
+async def update_user_password(db: AsyncSession, user_id: int, new_password: str) -> User | None:
+    user = await db.get(User, user_id)
+    if not user:
+        return None
+    user.hashed_password = await hash_executor.run(get_password_hash, new_password)
+    await bump_catalog_version_async(db)
+    await db.commit()
+    principal_cache.invalidate(user_id)
+    await db.refresh(user)
+    return user
+
+async def update_user(db: AsyncSession, user_id: int, email: str = None, password: str = None, role: UserRole = None) -> User | None:
+    user = await db.get(User, user_id)
+    if not user:
+        return None
+    if email:
+        user.email = email
+    if password:
+        user.hashed_password = await hash_executor.run(get_password_hash, password)
+    if role:
+        user.role = role
+    await bump_catalog_version_async(db)
+    await db.commit()
+    principal_cache.invalidate(user_id)
+    await db.refresh(user)
+    return user
+
+async def delete_user(db: AsyncSession, user_id: int) -> bool:
+    user = await db.get(User, user_id)
+    if not user:
+        return False
+    removed = (await db.execute(purchase_request_status_totals(PurchaseRequest.requester_id == user_id))).all()
+    await record_rollups_async(db, status_deltas={status: -count for status, count in removed})
+    await db.delete(user)
+    await bump_catalog_version_async(db)
+    await db.commit()
+    principal_cache.invalidate(user_id)
+    return True
+
+# ---------------------- PRODUCTS ----------------------
+
+async def create_product(db: AsyncSession, name: str, min_stock: int, max_stock: int, current_stock: int = 0) -> Product:
+    product = Product(name=name, min_stock=min_stock, max_stock=max_stock, current_stock=current_stock)
+    db.add(product)
+    await bump_catalog_version_async(db)
+    await db.commit()
+    await db.refresh(product)
+    product_index.add(product.id, product.name)
+    return product
+
+async def get_product_by_id(db: AsyncSession, product_id: int) -> Product | None:
+    return await db.get(Product, product_id)
+
+async def get_all_products(db: AsyncSession) -> list[Product]:
+    result = await db.execute(select(Product))
+    return list(result.scalars().all())
+
+async def update_product(db: AsyncSession, product_id: int, name: str = None, min_stock: int = None, max_stock: int = None, current_stock: int = None) -> Product | None:
+    product = await db.get(Product, product_id)
+    if not product:
+        return None
+    if name:
+        product.name = name
+    if min_stock is not None:
+        product.min_stock = min_stock
+    if max_stock is not None:
+        product.max_stock = max_stock
+    if current_stock is not None:
+        product.current_stock = current_stock
+    await bump_catalog_version_async(db)
+    await db.commit()
+    await db.refresh(product)
+    if name:
+        product_index.add(product.id, product.name)
+    return product
+
+async def delete_product(db: AsyncSession, product_id: int) -> bool:
+    product = await db.get(Product, product_id)
+    if not product:
+        return False
+    removed = (await db.execute(purchase_request_status_totals(PurchaseRequest.product_id == product_id))).all()
+    await record_rollups_async(db, status_deltas={status: -count for status, count in removed})
+    await db.delete(product)
+    await bump_catalog_version_async(db)
+    await db.commit()
+    product_index.remove(product_id)
+    return True
+
+# ---------------------- PURCHASE REQUESTS ----------------------
+
+async def _save_pending(db: AsyncSession, product_id: int, change) -> bool:
+    """Variante de crud._save_pending para AsyncSession."""
+    try:
+        async with db.begin_nested():
+            change()
+    except IntegrityError:
+        if not await db.scalar(pending_purchase_request_exists(product_id)):
+            raise
+        await db.commit()
+        return False
+    return True
+
+async def create_purchase_request(db: AsyncSession, product_id: int, quantity: int, requester_id: int) -> PurchaseRequest | None:
+    """Cria uma SC pendente. Retorna None, sem gravar nada, se o produto já
+    tiver uma SC pendente."""
+    purchase_request = PurchaseRequest(
+        product_id=product_id,
+        quantity=quantity,
+        requester_id=requester_id,
+        status=PRStatus.PENDING
+    )
+    if not await _save_pending(db, product_id, lambda: db.add(purchase_request)):
+        return None
+    await record_rollups_async(db, status_deltas={PRStatus.PENDING: 1})
+    await bump_catalog_version_async(db)
+    await db.commit()
+    await db.refresh(purchase_request)
+    return purchase_request
+
+async def get_purchase_request_by_id(db: AsyncSession, request_id: int) -> PurchaseRequest | None:
+    return await db.get(PurchaseRequest, request_id)
+
+async def get_purchase_requests_by_user(db: AsyncSession, user_id: int, with_product: bool = False) -> list[PurchaseRequest]:
+    """SCs do solicitante. Com `with_product`, os produtos vêm em uma única
+    query extra (selectinload); sem ele, acessar `.product` em uma AsyncSession
+    levanta erro em vez de consultar o banco."""
+    query = select(PurchaseRequest).where(PurchaseRequest.requester_id == user_id)
+    if with_product:
+        query = query.options(selectinload(PurchaseRequest.product))
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+async def get_all_purchase_requests(db: AsyncSession) -> list[PurchaseRequest]:
+    result = await db.execute(select(PurchaseRequest))
+    return list(result.scalars().all())
+
+async def update_purchase_request_status(db: AsyncSession, request_id: int, status: PRStatus) -> PurchaseRequest | None:
+    """Muda o status da SC. Retorna None se ela não existir ou se, ao voltar
+    para pendente, o produto já tiver outra SC pendente (nada é gravado)."""
+    # Linha travada e status atual do banco (ver crud._lock_purchase_request)
+    purchase_request = await db.get(PurchaseRequest, request_id, with_for_update=True, populate_existing=True)
+    if not purchase_request:
+        return None
+    previous = purchase_request.status
+    if previous != status:
+        if status == PRStatus.PENDING:
+            if not await _save_pending(db, purchase_request.product_id, lambda: setattr(purchase_request, "status", status)):
+                return None
+        await record_rollups_async(db, status_deltas={previous: -1, status: 1})
+    purchase_request.status = status
+    await bump_catalog_version_async(db)
+    await db.commit()
+    await db.refresh(purchase_request)
+    return purchase_request
+
+async def delete_purchase_request(db: AsyncSession, request_id: int) -> bool:
+    purchase_request = await db.get(PurchaseRequest, request_id, with_for_update=True, populate_existing=True)
+    if not purchase_request:
+        return False
+    await record_rollups_async(db, status_deltas={purchase_request.status: -1})
+    await db.delete(purchase_request)
+    await bump_catalog_version_async(db)
+    await db.commit()
+    return True
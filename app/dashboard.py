@@ -0,0 +1,55 @@
+import os
+from datetime import date, datetime, timedelta
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from app.database import PRStatus, get_read_db
+from app.dependencies import get_current_user
+from app.cache import Principal
+from app.crud import get_daily_movements, get_purchase_request_status_counts
+
+load_dotenv()
+
+# Maior período (em dias) aceito pela série de movimentações
+DASHBOARD_MAX_DAYS = int(os.getenv("DASHBOARD_MAX_DAYS", "366"))
+
+router = APIRouter()
+
+class DailyMovementOut(BaseModel):
+    day: date
+    inbound: int
+    outbound: int
+    movements: int
+
+class MovementSeries(BaseModel):
+    product_id: int | None
+    start: date
+    end: date
+    items: list[DailyMovementOut]
+
+class StatusCounts(BaseModel):
+    counts: dict[PRStatus, int]
+    total: int
+
+# Entradas e saídas por dia nos últimos `days` dias (até hoje, UTC), lidas dos rollups
+@router.get("/dashboard/movements", response_model=MovementSeries)
+def movement_series(
+    days: int = Query(30, ge=1, le=DASHBOARD_MAX_DAYS),
+    product_id: int | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    items = get_daily_movements(db, start, end, product_id=product_id)
+    return {"product_id": product_id, "start": start, "end": end, "items": items}
+
+# Quantidade de SCs por status (pendentes, aprovadas, rejeitadas), lida dos rollups
+@router.get("/dashboard/purchase-requests", response_model=StatusCounts)
+def purchase_request_counts(
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    counts = get_purchase_request_status_counts(db)
+    return {"counts": counts, "total": sum(counts.values())}
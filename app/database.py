@@ -6,18 +6,30 @@ from sqlalchemy import (
     ForeignKey, 
     Enum, 
     DateTime,
+    Date,
     Boolean,
     CheckConstraint, 
     Index
 )
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from dotenv import load_dotenv
+import asyncio
 import enum
+import itertools
 import os
-from sqlalchemy.exc import OperationalError
+import threading
+import time
+from sqlalchemy.exc import DBAPIError, OperationalError, TimeoutError as PoolTimeoutError
 from uuid import uuid4
+from app.metrics import Counter, Gauge, Histogram
+from app.instrumentation import instrument_engine
 
 # Carregando variáveis de ambiente
 load_dotenv()
@@ -25,13 +37,413 @@ load_dotenv()
 # Lendo URL do banco de dados do arquivo .env
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Verificação da variável de ambiente DATABASE_URL
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL não está definido no arquivo .env")
+# Configuração do pool de conexões
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # segundos; -1 desativa
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Conexões abertas antecipadamente na inicialização (warm-up)
+DB_POOL_MIN_WARM = int(os.getenv("DB_POOL_MIN_WARM", "0"))
 
-# Criação do engine e configuração do session maker
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Réplicas de leitura (URLs separadas por vírgula); vazio = tudo no primário
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# Intervalo da verificação periódica das réplicas e tempo fora do rodízio após uma falha
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "10"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+# Drivers assíncronos equivalentes aos drivers síncronos
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def _async_database_url(url: str) -> str:
+    """Converte a URL síncrona na URL do driver assíncrono (asyncpg/aiosqlite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Sem driver assíncrono configurado para o banco '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# ========== POOL DE CONEXÕES ==========
+
+POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Tempo para obter uma conexão do pool (inclui a espera por conexão livre)",
+)
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts que estouraram DB_POOL_TIMEOUT")
+
+class _TimedCheckoutMixin:
+    """Mede o tempo de checkout de cada conexão do pool."""
+    metrics_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(engine=self.metrics_label)
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, engine=self.metrics_label)
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics_label = "sync"
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+def _pool_options(url: str, poolclass) -> dict:
+    """Parâmetros do pool vindos do ambiente. SQLite em memória mantém o pool padrão."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def _enable_sqlite_foreign_keys(engine) -> None:
+    """O SQLite só aplica as FKs (e o ON DELETE CASCADE/SET NULL dos modelos)
+    com este PRAGMA, que vale por conexão. No Postgres não faz nada."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _foreign_keys_on(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+# ========== ENGINES (criados sob demanda) ==========
+# Nada aqui conecta ao banco durante o import: os engines só são criados
+# no primeiro uso, e a verificação de conexão/esquema roda no lifespan do app.
+
+_engine = None
+_async_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Retorna o engine síncrono, criando-o no primeiro uso."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                # Verificação da variável de ambiente DATABASE_URL
+                if not DATABASE_URL:
+                    raise ValueError("DATABASE_URL não está definido no arquivo .env")
+                _engine = create_engine(DATABASE_URL, **_pool_options(DATABASE_URL, InstrumentedQueuePool))
+                instrument_engine(_engine)
+                _enable_sqlite_foreign_keys(_engine)
+    return _engine
+
+def get_async_engine():
+    """Retorna o engine assíncrono, criando-o no primeiro uso.
+    A URL pode ser definida em ASYNC_DATABASE_URL ou derivada da DATABASE_URL."""
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                if not DATABASE_URL and not os.getenv("ASYNC_DATABASE_URL"):
+                    raise ValueError("DATABASE_URL não está definido no arquivo .env")
+                url = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+                _async_engine = create_async_engine(url, **_pool_options(url, InstrumentedAsyncQueuePool))
+                instrument_engine(_async_engine.sync_engine)
+                _enable_sqlite_foreign_keys(_async_engine.sync_engine)
+    return _async_engine
+
+# ========== RÉPLICAS DE LEITURA ==========
+# Para testar localmente, aponte DATABASE_REPLICA_URLS para uma cópia do banco
+# primário (ex.: dois arquivos SQLite, o segundo copiado do primeiro).
+
+class Replica:
+    """Uma réplica de leitura: engine criado sob demanda e estado de saúde."""
+
+    def __init__(self, url: str, label: str):
+        self.url = url
+        self.label = label
+        self.healthy = True
+        self.retry_at = 0.0
+        self.failures = 0
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def get_engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine = create_engine(self.url, **_pool_options(self.url, InstrumentedQueuePool))
+                    instrument_engine(engine)
+                    _enable_sqlite_foreign_keys(engine)
+                    event.listen(engine, "handle_error", self._on_error)
+                    self._engine = engine
+        return self._engine
+
+    def _on_error(self, context) -> None:
+        # Perda de conexão ou falha ao conectar: tira a réplica do rodízio
+        if context.is_disconnect or context.connection is None:
+            self.mark_down()
+
+    def mark_down(self) -> None:
+        self.healthy = False
+        self.failures += 1
+        self.retry_at = time.monotonic() + REPLICA_RETRY_SECONDS
+
+    def recover(self, now: float) -> bool:
+        """Passado o tempo de espera, testa a réplica antes de devolvê-la ao
+        rodízio. O próximo teste é adiado antes de conectar, para que as
+        requisições simultâneas não testem todas a mesma réplica fora do ar."""
+        if now < self.retry_at:
+            return False
+        self.retry_at = now + REPLICA_RETRY_SECONDS
+        return self.check()
+
+    def check(self) -> bool:
+        """SELECT 1 na réplica; atualiza e retorna o estado de saúde."""
+        try:
+            with self.get_engine().connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            self.mark_down()
+            return False
+        self.healthy = True
+        return True
+
+class ReplicaSet:
+    """Rodízio (round robin) entre as réplicas saudáveis."""
+
+    def __init__(self, urls: list[str]):
+        self.replicas = [Replica(url, f"replica{i}") for i, url in enumerate(urls)]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Replica | None:
+        """Próxima réplica saudável (ou que voltou a responder), ou None se nenhuma estiver."""
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[next(self._counter) % len(self.replicas)]
+            if replica.healthy or replica.recover(now):
+                return replica
+        return None
+
+    def check_all(self) -> dict:
+        return {replica.label: replica.check() for replica in self.replicas}
+
+    def dispose(self, close: bool = True) -> None:
+        for replica in self.replicas:
+            if replica._engine is not None:
+                replica._engine.dispose(close=close)
+
+replicas = ReplicaSet(DATABASE_REPLICA_URLS)
+
+async def check_replicas_periodically() -> None:
+    """Verifica as réplicas a cada REPLICA_HEALTH_INTERVAL segundos (roda no lifespan)."""
+    while True:
+        await asyncio.to_thread(replicas.check_all)
+        await asyncio.sleep(REPLICA_HEALTH_INTERVAL)
+
+def _dispose_after_fork() -> None:
+    """No processo filho (ex.: workers do gunicorn) descarta as conexões herdadas
+    sem fechá-las, para não interferir nas conexões do processo pai."""
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+    replicas.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+def warm_pool(connections: int = DB_POOL_MIN_WARM) -> int:
+    """Abre `connections` conexões (validadas com SELECT 1) e as devolve ao pool.
+    Retorna quantas conexões foram aquecidas (no máximo DB_POOL_SIZE)."""
+    opened = []
+    try:
+        for _ in range(min(connections, DB_POOL_SIZE)):
+            conn = get_engine().connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+async def warm_async_pool(connections: int = DB_POOL_MIN_WARM) -> int:
+    """Equivalente assíncrono de warm_pool."""
+    opened = []
+    try:
+        for _ in range(min(connections, DB_POOL_SIZE)):
+            conn = await get_async_engine().connect()
+            opened.append(conn)
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+def _engine_pool_stats(engine, label: str) -> dict:
+    pool = engine.pool
+    stats = {"engine": label, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    checkout = POOL_CHECKOUT_SECONDS.snapshot(engine=label)
+    stats["checkout_count"] = checkout["count"]
+    stats["checkout_wait_seconds"] = checkout["sum"]
+    stats["checkout_latency_buckets"] = checkout["buckets"]
+    stats["timeouts"] = POOL_TIMEOUTS.value(engine=label)
+    return stats
+
+def pool_stats() -> list[dict]:
+    """Estatísticas ao vivo dos pools já criados."""
+    stats = []
+    if _engine is not None:
+        stats.append(_engine_pool_stats(_engine, "sync"))
+    if _async_engine is not None:
+        stats.append(_engine_pool_stats(_async_engine.sync_engine, "async"))
+    for replica in replicas.replicas:
+        if replica._engine is not None:
+            replica_stats = _engine_pool_stats(replica._engine, replica.label)
+            replica_stats.update({"healthy": replica.healthy, "failures": replica.failures})
+            stats.append(replica_stats)
+    return stats
+
+def _pool_gauge(field: str):
+    def collect():
+        return [
+            ({"engine": s["engine"]}, s[field]) for s in pool_stats() if field in s
+        ]
+    return collect
+
+Gauge("db_pool_checked_out", "Conexões em uso", _pool_gauge("checked_out"))
+Gauge("db_pool_checked_in", "Conexões livres no pool", _pool_gauge("checked_in"))
+Gauge("db_pool_overflow", "Conexões abertas além de DB_POOL_SIZE", _pool_gauge("overflow"))
+
+def __getattr__(name):
+    # Compatibilidade com `from app.database import engine/async_engine`
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker que só cria o engine ao abrir a primeira sessão."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+class _LazyAsyncSessionmaker(async_sessionmaker):
+    """async_sessionmaker que só cria o engine ao abrir a primeira sessão."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_async_engine())
+        return super().__call__(**local_kw)
+
+class RoutingSession(Session):
+    """Sessão que envia as leituras para uma réplica e as escritas para o primário.
+    - Cada sessão usa uma única réplica (escolhida no primeiro SELECT), para
+      enxergar um estado consistente.
+    - Qualquer escrita (flush, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE) fixa
+      a sessão no primário até o fim, então leituras seguintes (ex.: o
+      db.refresh após o commit) veem o que acabou de ser gravado.
+    - Sem réplicas configuradas ou disponíveis, tudo vai para o primário.
+    - Se a réplica cair (ou não conectar) durante uma leitura, a leitura é
+      refeita no primário, que a sessão passa a usar até o fim."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._primary_only = False
+        self._replica: Replica | None = None
+        self._read_bind = None
+
+    def use_primary(self) -> None:
+        """Força o primário pelo restante da sessão."""
+        self._primary_only = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._primary_only:
+            return get_engine()
+        if self._flushing or clause is None or not getattr(clause, "is_select", False) \
+                or getattr(clause, "_for_update_arg", None) is not None:
+            if self._flushing or clause is not None:
+                self._primary_only = True
+            return get_engine()
+        if self._read_bind is None:
+            self._replica = replicas.choose()
+            self._read_bind = self._replica.get_engine() if self._replica is not None else get_engine()
+        return self._read_bind
+
+    def _with_failover(self, method, *args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except DBAPIError:
+            # O handle_error da réplica já a tirou do rodízio: se foi ela que
+            # falhou, a sessão (que só leu) recomeça no primário
+            if self._replica is None or self._primary_only or self._replica.healthy:
+                raise
+            self.rollback()
+            self.use_primary()
+            return method(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._with_failover(super().execute, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._with_failover(super().scalar, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._with_failover(super().scalars, *args, **kwargs)
+
+    def close(self) -> None:
+        super().close()
+        self._primary_only = False
+        self._replica = None
+        self._read_bind = None
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+# Sessões das rotas de leitura (listagens, relatórios, exportações)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+AsyncSessionLocal = _LazyAsyncSessionmaker(autoflush=False, expire_on_commit=False)
+
+# ========== DEPENDÊNCIAS ==========
+
+def get_db():
+    """Dependência do FastAPI que fornece uma sessão síncrona."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db():
+    """Dependência do FastAPI para rotas de leitura: sessão que usa as réplicas."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """Dependência do FastAPI que fornece uma sessão assíncrona."""
+    async with AsyncSessionLocal() as db:
+        yield db
 
 # Base para as models
 Base = declarative_base()
@@ -72,6 +484,9 @@ class Product(Base):
         Index('idx_product_stocks', 'min_stock', 'max_stock')
     )
 
+# Condição do índice único parcial de SCs pendentes (o Enum grava o nome do membro)
+PENDING_PURCHASE_REQUEST = "status = 'PENDING'"
+
 class PurchaseRequest(Base):
     __tablename__ = "purchase_requests"
     id = Column(Integer, primary_key=True, index=True)
@@ -81,9 +496,38 @@ class PurchaseRequest(Base):
     status = Column(Enum(PRStatus), default=PRStatus.PENDING, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
+    # Produto e solicitante; nas listagens, carregue com joinedload/selectinload (ver crud)
+    product = relationship("Product")
+    requester = relationship("User")
+
     # Restrição para garantir que a quantidade seja positiva
     __table_args__ = (
         CheckConstraint('quantity > 0', name='check_quantity_positive'),
+        Index('idx_purchase_product_status', 'product_id', 'status'),  # Busca de SCs pendentes por produto
+        Index('idx_purchase_requester', 'requester_id', 'id'),  # SCs de um solicitante, mais recentes primeiro
+        # No máximo uma SC pendente por produto (crud.generate_purchase_requests depende disso)
+        Index(
+            'uq_purchase_pending_product', 'product_id', unique=True,
+            postgresql_where=text(PENDING_PURCHASE_REQUEST), sqlite_where=text(PENDING_PURCHASE_REQUEST),
+        ),
+    )
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    quantity = Column(Integer, nullable=False)  # Positivo = entrada, negativo = saída
+    note = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    product = relationship("Product")
+    user = relationship("User")
+
+    # Movimentações com quantidade zero não fazem sentido; histórico consultado por produto e data
+    __table_args__ = (
+        CheckConstraint('quantity <> 0', name='check_movement_quantity_non_zero'),
+        Index('idx_movement_product_created', 'product_id', 'created_at'),
     )
 
 class RefreshToken(Base):
@@ -92,7 +536,7 @@ class RefreshToken(Base):
     jti = Column(String(36), unique=True, nullable=False, default=lambda: str(uuid4()))
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Usado pela limpeza de tokens expirados
     revoked = Column(Boolean, default=False, nullable=False)
 
     # Índice para otimizar consultas baseadas em usuário e jti
@@ -112,15 +556,63 @@ class AccessTokenBlacklist(Base):
     # Índice para facilitar buscas rápidas
     __table_args__ = (
         Index('idx_blacklist_token', 'token'),  # Índice para consultas rápidas
-        Index('idx_blacklist_jti', 'jti')  # Índice para consultas rápidas pelo jti
+        Index('idx_blacklist_jti', 'jti'),  # Índice para consultas rápidas pelo jti
+        Index('idx_blacklist_revoked_at', 'revoked_at'),  # Usado pela limpeza da blacklist
+    )
+
+
+# ========== ROLLUPS (PAINEL) ==========
+# Agregados mantidos pelo crud na mesma transação de cada escrita (ver app/rollups.py);
+# podem ser reconstruídos a partir das tabelas de origem com `python -m app.rollups`.
+
+class DailyProductMovement(Base):
+    """Entradas e saídas de um produto em um dia (UTC)."""
+    __tablename__ = "daily_product_movements"
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    inbound = Column(Integer, nullable=False, default=0)
+    outbound = Column(Integer, nullable=False, default=0)  # Soma das saídas, positiva
+    movements = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_daily_movement_day', 'day'),  # Totais do catálogo por período
     )
 
+class PurchaseRequestStatusCount(Base):
+    """Quantidade de SCs por status, dividida em `shard`s para que escritas
+    concorrentes não disputem a mesma linha. O total é a soma dos shards."""
+    __tablename__ = "purchase_request_status_counts"
+    status = Column(Enum(PRStatus), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# ========== VERSÃO DO CATÁLOGO ==========
+# Incrementada pelo crud na mesma transação de cada escrita em produtos ou SCs
+# (ver app/catalog.py); é a base do ETag das listagens em todos os workers.
+
+class CatalogVersion(Base):
+    """Contador de escritas no catálogo, dividido em `shard`s como os
+    contadores de SCs. A versão é a soma dos shards e nunca diminui."""
+    __tablename__ = "catalog_versions"
+    shard = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
 
 # ========== VERIFICAÇÃO DE CONEXÃO ==========
 
-try:
-    engine.connect()
-    print("✅ Conexão com o banco de dados bem-sucedida!")
-except OperationalError as e:
-    print(f"❌ Erro de conexão: {e}")
-    raise
+def check_connection() -> None:
+    """Abre (e fecha) uma conexão para validar o acesso ao banco."""
+    try:
+        with get_engine().connect():
+            pass
+        print("✅ Conexão com o banco de dados bem-sucedida!")
+    except OperationalError as e:
+        print(f"❌ Erro de conexão: {e}")
+        raise
+
+def init_db() -> None:
+    """Verifica a conexão e cria as tabelas que ainda não existem.
+    Chamado no lifespan do app, nunca durante o import."""
+    check_connection()
+    Base.metadata.create_all(bind=get_engine())
@@ -0,0 +1,50 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import User, UserRole, get_async_db
+from app.utils import verify_access_token
+from app.cache import principal_cache, Principal
+
+# Dependências compartilhadas entre as rotas
+
+# Instanciando o OAuth2PasswordBearer
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+
+# Dependência para validar o token de acesso
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    payload = verify_access_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido ou expirado",
+        )
+    # Usa o cache de usuários antes de consultar o banco
+    principal = principal_cache.get(payload["id"])
+    if principal is not None:
+        return principal
+    # Uma alteração do usuário confirmada durante a leitura invalida o cache
+    # antes deste set: o principal lido (talvez antigo) não é gravado
+    generation = principal_cache.generation()
+    user = await db.get(User, payload["id"])
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Usuário não encontrado",
+        )
+    principal = Principal(id=user.id, email=user.email, role=user.role.value)
+    principal_cache.set(user.id, principal, generation=generation)
+    return principal
+
+# Dependência que restringe a rota aos perfis informados
+def require_roles(*roles: UserRole):
+    allowed = {role.value for role in roles}
+
+    async def checker(current_user: Principal = Depends(get_current_user)) -> Principal:
+        if current_user.role not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Permissão insuficiente",
+            )
+        return current_user
+
+    return checker
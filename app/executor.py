@@ -0,0 +1,150 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+
+from dotenv import load_dotenv
+
+from app import hashing
+from app.metrics import Gauge
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+# Tipo do pool usado para o bcrypt: "thread" ou "process"
+HASH_EXECUTOR_KIND = os.getenv("HASH_EXECUTOR_KIND", "thread")
+HASH_EXECUTOR_WORKERS = int(os.getenv("HASH_EXECUTOR_WORKERS", str(os.cpu_count() or 1)))
+# Máximo de hashes executando ao mesmo tempo e de requisições aguardando na fila
+HASH_MAX_CONCURRENT = int(os.getenv("HASH_MAX_CONCURRENT", str(HASH_EXECUTOR_WORKERS)))
+HASH_MAX_QUEUED = int(os.getenv("HASH_MAX_QUEUED", str(HASH_MAX_CONCURRENT * 4)))
+HASH_QUEUE_TIMEOUT = float(os.getenv("HASH_QUEUE_TIMEOUT", "2.0"))
+
+
+class OverloadedError(Exception):
+    """Levantada quando a fila de trabalho está cheia ou o tempo de espera acabou."""
+
+
+class BoundedExecutor:
+    """Executor com limite de concorrência e fila limitada.
+
+    - No máximo `max_concurrent` tarefas rodam ao mesmo tempo.
+    - No máximo `max_queued` tarefas aguardam por uma vaga; acima disso falha na hora.
+    - Uma tarefa que espera mais que `queue_timeout` segundos também falha.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "thread",
+        max_workers: int = 1,
+        max_concurrent: int = 1,
+        max_queued: int = 0,
+        queue_timeout: float = 0.0,
+        initializer: Callable | None = None,
+        initargs: Callable[[], tuple] | tuple = (),
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Tipo de executor inválido: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        # Inicialização dos workers do pool de processos; initargs pode ser uma
+        # função, avaliada no momento em que o pool é criado
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._waiting = 0
+        self.rejected = 0
+
+    def _get_pool(self) -> Executor:
+        """Cria o pool apenas no primeiro uso."""
+        if self._pool is None:
+            if self.kind == "process":
+                initargs = self.initargs() if callable(self.initargs) else self.initargs
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=self.initializer,
+                    initargs=initargs,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._pool
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def run(self, fn, *args, **kwargs):
+        """Executa `fn(*args, **kwargs)` no pool sem bloquear o event loop.
+        Levanta OverloadedError se não houver vaga na fila."""
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self._waiting >= self.max_queued:
+                self.rejected += 1
+                raise OverloadedError(f"Fila do executor '{self.name}' cheia.")
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout or None)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise OverloadedError(f"Tempo de espera do executor '{self.name}' esgotado.")
+            finally:
+                self._waiting -= 1
+        else:
+            await semaphore.acquire()
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), partial(fn, *args, **kwargs))
+        finally:
+            semaphore.release()
+
+    def stats(self) -> dict:
+        """Estado atual do executor."""
+        running = 0
+        if self._semaphore is not None:
+            running = self.max_concurrent - self._semaphore._value
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_concurrent": self.max_concurrent,
+            "running": running,
+            "waiting": self._waiting,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# ----- Executor do hash de senhas (bcrypt) -----
+hash_executor = BoundedExecutor(
+    "hash",
+    kind=HASH_EXECUTOR_KIND,
+    max_workers=HASH_EXECUTOR_WORKERS,
+    max_concurrent=HASH_MAX_CONCURRENT,
+    max_queued=HASH_MAX_QUEUED,
+    queue_timeout=HASH_QUEUE_TIMEOUT,
+    # Processos filhos usam o mesmo custo e a mesma faixa (piso/teto) do processo principal
+    initializer=hashing.configure,
+    initargs=hashing.current_settings,
+)
+
+def _executor_gauge(field: str):
+    def collect():
+        return [({"executor": hash_executor.name}, hash_executor.stats()[field])]
+    return collect
+
+Gauge("executor_running", "Tarefas em execução no executor", _executor_gauge("running"))
+Gauge("executor_waiting", "Tarefas aguardando vaga no executor", _executor_gauge("waiting"))
+Gauge("executor_rejected", "Tarefas recusadas por sobrecarga", _executor_gauge("rejected"))
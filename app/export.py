@@ -0,0 +1,87 @@
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from fastapi.responses import StreamingResponse
+from app.database import ReadSessionLocal
+from app.pagination import STREAM_BATCH_SIZE
+
+# Tamanho aproximado de cada bloco enviado ao cliente
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+# ------------------------------------------------------
+# ------------- Exportação em streaming ----------------
+# ------------------------------------------------------
+# As linhas vêm de um cursor do servidor (yield_per) e passam por geradores
+# até o StreamingResponse: o resultado completo nunca fica em memória.
+
+def _plain(value):
+    """Converte valores do banco para tipos simples de CSV/JSON."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def iter_rows(query):
+    """Executa `query` (select de colunas) em uma sessão própria (réplica de leitura,
+    se houver), com cursor do servidor. A sessão da requisição já foi fechada
+    quando o streaming começa."""
+    with ReadSessionLocal() as db:
+        result = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        for row in result:
+            yield row
+
+def csv_lines(fields: list[str], rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_plain(value) for value in row])
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+def ndjson_lines(fields: list[str], rows):
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps({f: _plain(v) for f, v in zip(fields, row)}, ensure_ascii=False) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(parts).encode()
+            parts, size = [], 0
+    yield "".join(parts).encode()
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_response(query, fields: list[str], fmt: str, name: str, gzip: bool = False) -> StreamingResponse:
+    """Monta o StreamingResponse de uma exportação CSV ou NDJSON (opcionalmente gzip)."""
+    media_type, extension = EXPORT_FORMATS[fmt]
+    lines = csv_lines if fmt == "csv" else ndjson_lines
+    body = lines(fields, iter_rows(query))
+    filename = f"{name}.{extension}"
+    if gzip:
+        body = gzip_chunks(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
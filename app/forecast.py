@@ -0,0 +1,233 @@
+import argparse
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.orm import Session
+
+from app.catalog import bump_catalog_version
+from app.database import Product, SessionLocal, StockMovement
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+# Histórico de consumo (saídas de estoque) considerado, em dias
+FORECAST_HISTORY_DAYS = int(os.getenv("FORECAST_HISTORY_DAYS", "730"))
+# Médias móveis curta (reage a mudanças recentes) e longa (estável), e o peso da curta
+FORECAST_SHORT_WINDOW = int(os.getenv("FORECAST_SHORT_WINDOW", "28"))
+FORECAST_LONG_WINDOW = int(os.getenv("FORECAST_LONG_WINDOW", "91"))
+FORECAST_SHORT_WEIGHT = float(os.getenv("FORECAST_SHORT_WEIGHT", "0.5"))
+# Prazo de entrega do fornecedor e intervalo entre compras (dias)
+FORECAST_LEAD_TIME_DAYS = int(os.getenv("FORECAST_LEAD_TIME_DAYS", "7"))
+FORECAST_REVIEW_DAYS = int(os.getenv("FORECAST_REVIEW_DAYS", "14"))
+# Fator z do estoque de segurança (1.65 ~ 95% de nível de serviço)
+FORECAST_SERVICE_Z = float(os.getenv("FORECAST_SERVICE_Z", "1.65"))
+# Limites do fator de sazonalidade anual (evita extrapolar picos isolados)
+FORECAST_SEASONAL_MIN = float(os.getenv("FORECAST_SEASONAL_MIN", "0.5"))
+FORECAST_SEASONAL_MAX = float(os.getenv("FORECAST_SEASONAL_MAX", "2.0"))
+# Produtos por bloco: a matriz de um bloco ocupa CHUNK x HISTORY_DAYS x 4 bytes
+# (50 mil x 730 dias ~ 140 MiB), independentemente do tamanho do catálogo
+FORECAST_CHUNK_SIZE = int(os.getenv("FORECAST_CHUNK_SIZE", "50000"))
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------
+# ------------------ Cálculo (vetorizado) --------------
+# ------------------------------------------------------
+# `history` é uma matriz produtos x dias (float32) com o consumo diário; a
+# última coluna é o dia anterior à data de referência. Todas as funções
+# operam sobre todas as linhas de uma vez (em run_forecast, um bloco do catálogo).
+
+def weekday_profile(history: np.ndarray, weeks: int) -> np.ndarray:
+    """Índice de sazonalidade semanal por produto (produtos x 7), média 1.
+    A coluna j corresponde a j dias após a data de referência (mod 7)."""
+    n, days = history.shape
+    weeks = min(weeks, days // 7)
+    if weeks == 0:
+        return np.ones((n, 7), dtype=np.float32)
+    recent = history[:, days - 7 * weeks:].reshape(n, weeks, 7).mean(axis=1)
+    mean = recent.mean(axis=1, keepdims=True)
+    return np.divide(recent, mean, out=np.ones_like(recent), where=mean > 0)
+
+def yearly_factor(history: np.ndarray, horizon: int, window: int) -> np.ndarray:
+    """Sazonalidade anual: no ano passado, quanto o período equivalente ao
+    que vamos prever diferiu da média das `window` semanas anteriores a ele.
+    Sem um ano de histórico (mais a janela), o fator é 1."""
+    n, days = history.shape
+    if days < 365 + window or horizon > 365:
+        return np.ones(n, dtype=np.float32)
+    upcoming = history[:, days - 365:days - 365 + horizon].mean(axis=1)
+    baseline = history[:, days - 365 - window:days - 365].mean(axis=1)
+    factor = np.divide(upcoming, baseline, out=np.ones_like(upcoming), where=baseline > 0)
+    return np.clip(factor, FORECAST_SEASONAL_MIN, FORECAST_SEASONAL_MAX)
+
+def compute_suggestions(
+    history: np.ndarray,
+    lead_time: int = FORECAST_LEAD_TIME_DAYS,
+    review: int = FORECAST_REVIEW_DAYS,
+    short_window: int = FORECAST_SHORT_WINDOW,
+    long_window: int = FORECAST_LONG_WINDOW,
+    z: float = FORECAST_SERVICE_Z,
+) -> dict:
+    """Ponto de pedido (min_stock) e estoque máximo sugeridos para cada linha
+    de `history`. Retorna arrays alinhados às linhas:
+    {"active", "daily_demand", "min_stock", "max_stock"}; produtos sem consumo
+    na janela longa ficam com active=False e não devem ser alterados."""
+    history = np.asarray(history, dtype=np.float32)
+    horizon = lead_time + review
+
+    short_ma = history[:, -short_window:].mean(axis=1)
+    long_window_values = history[:, -long_window:]
+    long_ma = long_window_values.mean(axis=1)
+    level = FORECAST_SHORT_WEIGHT * short_ma + (1 - FORECAST_SHORT_WEIGHT) * long_ma
+    level *= yearly_factor(history, horizon, long_window)
+
+    # Previsão diária dos próximos `horizon` dias com o perfil da semana
+    profile = weekday_profile(history, long_window // 7)
+    daily = level[:, None] * profile[:, np.arange(horizon) % 7]
+    lead_demand = daily[:, :lead_time].sum(axis=1)
+    review_demand = daily[:, lead_time:].sum(axis=1)
+
+    # Estoque de segurança pela variabilidade diária recente durante o prazo de entrega
+    sigma = long_window_values.std(axis=1, ddof=1) if long_window_values.shape[1] > 1 else np.zeros_like(long_ma)
+    safety = z * sigma * np.sqrt(lead_time)
+
+    min_stock = np.ceil(lead_demand + safety).astype(np.int64)
+    max_stock = np.maximum(np.ceil(min_stock + review_demand).astype(np.int64), min_stock + 1)
+    return {
+        "active": long_ma > 0,
+        "daily_demand": level,
+        "min_stock": min_stock,
+        "max_stock": max_stock,
+    }
+
+# ------------------------------------------------------
+# ------------------ Banco de dados --------------------
+# ------------------------------------------------------
+
+def load_products(db: Session) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(ids, min_stock, max_stock) de todos os produtos, ordenados por id."""
+    rows = db.execute(select(Product.id, Product.min_stock, Product.max_stock).order_by(Product.id)).all()
+    table = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    return table[:, 0], table[:, 1], table[:, 2]
+
+def load_consumption(db: Session, product_ids: np.ndarray, end: date, days: int = FORECAST_HISTORY_DAYS) -> np.ndarray:
+    """Matriz produtos x dias com as saídas diárias de `end - days` até o dia
+    anterior a `end`, para `product_ids` (ordenados; em run_forecast, um bloco
+    contíguo do catálogo). A agregação por produto/dia é feita no banco; aqui
+    só se espalham os totais na matriz, um lote de linhas por vez."""
+    history = np.zeros((len(product_ids), days), dtype=np.float32)
+    if len(product_ids) == 0:
+        return history
+    start = end - timedelta(days=days)
+    start_day = np.datetime64(start, "D")
+    day = func.date(StockMovement.created_at)
+    query = (
+        select(StockMovement.product_id, day, func.sum(-StockMovement.quantity))
+        .where(
+            StockMovement.quantity < 0,
+            StockMovement.product_id.between(int(product_ids[0]), int(product_ids[-1])),
+            StockMovement.created_at >= datetime.combine(start, datetime.min.time()),
+            StockMovement.created_at < datetime.combine(end, datetime.min.time()),
+        )
+        .group_by(StockMovement.product_id, day)
+        .execution_options(yield_per=50000)
+    )
+    for partition in db.execute(query).partitions():
+        ids, days_, totals = zip(*partition)
+        ids = np.array(ids, dtype=np.int64)
+        # str(): o SQLite devolve 'AAAA-MM-DD' e o Postgres um date
+        columns = (np.array([str(d) for d in days_], dtype="datetime64[D]") - start_day).astype(np.int64)
+        rows = np.searchsorted(product_ids, ids)
+        # Produtos criados depois da leitura do catálogo ficam de fora
+        known = (rows < len(product_ids)) & (product_ids[np.minimum(rows, len(product_ids) - 1)] == ids)
+        history[rows[known], columns[known]] = np.array(totals, dtype=np.float32)[known]
+    return history
+
+def apply_suggestions(db: Session, product_ids: np.ndarray, min_stock: np.ndarray, max_stock: np.ndarray) -> int:
+    """Grava min_stock/max_stock com um único UPDATE em lote e faz commit.
+    No Postgres é um UPDATE ... FROM unnest(arrays); nos demais bancos, um
+    executemany do mesmo statement."""
+    if len(product_ids) == 0:
+        return 0
+    ids, mins, maxs = product_ids.tolist(), min_stock.tolist(), max_stock.tolist()
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text(
+                "UPDATE products AS p SET min_stock = v.min_stock, max_stock = v.max_stock "
+                "FROM unnest(CAST(:ids AS integer[]), CAST(:mins AS integer[]), CAST(:maxs AS integer[])) "
+                "AS v(id, min_stock, max_stock) WHERE p.id = v.id"
+            ),
+            {"ids": ids, "mins": mins, "maxs": maxs},
+        )
+    else:
+        products = Product.__table__
+        db.execute(
+            update(products)
+            .where(products.c.id == bindparam("b_id"))
+            .values(min_stock=bindparam("b_min"), max_stock=bindparam("b_max")),
+            [{"b_id": i, "b_min": lo, "b_max": hi} for i, lo, hi in zip(ids, mins, maxs)],
+        )
+    bump_catalog_version(db)
+    db.commit()
+    return len(ids)
+
+def run_forecast(db: Session, today: date | None = None, dry_run: bool = False, chunk_size: int = FORECAST_CHUNK_SIZE) -> dict:
+    """Recalcula min_stock/max_stock de todo o catálogo a partir do consumo,
+    em blocos de `chunk_size` produtos (carga, cálculo e um UPDATE em lote
+    por bloco), com memória limitada ao tamanho do bloco.
+    Só grava produtos ativos cuja sugestão difere do valor atual.
+    Retorna {"products", "active", "changed", "updated", "seconds": {etapa: s}}."""
+    today = today or datetime.utcnow().date()
+    seconds = {"load": 0.0, "compute": 0.0}
+    if not dry_run:
+        seconds["write"] = 0.0
+    active = changed_total = updated = 0
+
+    start = time.perf_counter()
+    product_ids, current_min, current_max = load_products(db)
+    seconds["load"] += time.perf_counter() - start
+
+    for offset in range(0, len(product_ids), chunk_size):
+        chunk = slice(offset, offset + chunk_size)
+        ids = product_ids[chunk]
+
+        start = time.perf_counter()
+        history = load_consumption(db, ids, today)
+        seconds["load"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = compute_suggestions(history)
+        del history
+        changed = result["active"] & (
+            (result["min_stock"] != current_min[chunk]) | (result["max_stock"] != current_max[chunk])
+        )
+        active += int(result["active"].sum())
+        changed_total += int(changed.sum())
+        seconds["compute"] += time.perf_counter() - start
+
+        if not dry_run:
+            start = time.perf_counter()
+            updated += apply_suggestions(db, ids[changed], result["min_stock"][changed], result["max_stock"][changed])
+            seconds["write"] += time.perf_counter() - start
+
+    return {
+        "products": int(len(product_ids)),
+        "active": active,
+        "changed": changed_total,
+        "updated": updated,
+        "seconds": seconds,
+    }
+
+if __name__ == "__main__":
+    # Execução manual: python -m app.forecast [--dry-run]
+    parser = argparse.ArgumentParser(description="Recalcula ponto de pedido e estoque máximo pelo consumo")
+    parser.add_argument("--dry-run", action="store_true", help="calcula sem gravar")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        print(run_forecast(db, dry_run=args.dry_run))
@@ -0,0 +1,145 @@
+import argparse
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from passlib.context import CryptContext
+
+from app.metrics import Histogram
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+# Custo fixo do bcrypt; se não for definido, é calibrado para BCRYPT_TARGET_MS
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "16"))
+
+# Contexto único de hash de senhas usado por toda a aplicação
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+BCRYPT_SECONDS = Histogram("bcrypt_seconds", "Tempo de cada operação bcrypt (hash/verify)")
+
+_settings: tuple[int, int, int] | None = None
+_lock = threading.Lock()
+
+# ------------------------------------------------------
+# ---------------- Custo do bcrypt ---------------------
+# ------------------------------------------------------
+
+def measure(rounds: int, samples: int = 3) -> float:
+    """Tempo médio (segundos) de um hash bcrypt com o custo informado, em um núcleo."""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds)
+    context.hash("calibration")  # aquecimento
+    start = time.perf_counter()
+    for _ in range(samples):
+        context.hash("calibration")
+    return (time.perf_counter() - start) / samples
+
+def calibrate(target_ms: float = BCRYPT_TARGET_MS) -> int:
+    """Maior custo cujo hash fica dentro de `target_ms` neste hardware.
+    Mede só o custo mínimo e extrapola: cada +1 no custo dobra o tempo."""
+    base = measure(BCRYPT_MIN_ROUNDS)
+    rounds = BCRYPT_MIN_ROUNDS
+    while rounds < BCRYPT_MAX_ROUNDS and base * 2 ** (rounds + 1 - BCRYPT_MIN_ROUNDS) * 1000 <= target_ms:
+        rounds += 1
+    return rounds
+
+def configure(rounds: int, floor: int | None = None, ceiling: int | None = None) -> None:
+    """Define o custo dos hashes novos. Hashes com custo abaixo de `floor` ou
+    acima de `ceiling` (padrão de ambos: o próprio custo) ficam desatualizados
+    (needs_update) e são refeitos no próximo login; os que estão na faixa
+    continuam válidos como estão."""
+    global _settings
+    floor = rounds if floor is None else min(floor, rounds)
+    ceiling = rounds if ceiling is None else max(ceiling, rounds)
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=floor,
+        bcrypt__max_rounds=ceiling,
+    )
+    _settings = (rounds, floor, ceiling)
+
+def current_settings() -> tuple[int, int, int]:
+    """(custo, piso, teto) em uso; configura no primeiro acesso.
+    - BCRYPT_ROUNDS definido: piso e teto iguais ao custo, e os hashes sobem
+      ou descem para ele no próximo login.
+    - Calibração: feita por processo, pode variar entre workers; a faixa
+      aceita é BCRYPT_MIN_ROUNDS..BCRYPT_MAX_ROUNDS, para que um worker não
+      refaça a cada login os hashes gravados por outro com custo ligeiramente
+      diferente.
+    Os processos do hash_executor recebem esta tupla do processo principal."""
+    if _settings is None:
+        with _lock:
+            if _settings is None:
+                if BCRYPT_ROUNDS:
+                    configure(int(BCRYPT_ROUNDS))
+                else:
+                    configure(calibrate(), floor=BCRYPT_MIN_ROUNDS, ceiling=BCRYPT_MAX_ROUNDS)
+    return _settings
+
+def current_rounds() -> int:
+    """Custo dos hashes novos (ver current_settings)."""
+    return current_settings()[0]
+
+# ------------------------------------------------------
+# ------------------ Funções de senha ------------------
+# ------------------------------------------------------
+
+def get_password_hash(password: str) -> str:
+    """Gera o hash da senha usando bcrypt + salt, com o custo configurado."""
+    current_rounds()
+    start = time.perf_counter()
+    try:
+        return pwd_context.hash(password)
+    finally:
+        BCRYPT_SECONDS.observe(time.perf_counter() - start, operation="hash")
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifica se a senha fornecida corresponde ao hash armazenado."""
+    start = time.perf_counter()
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        BCRYPT_SECONDS.observe(time.perf_counter() - start, operation="verify")
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verifica a senha e, se o custo do hash estiver fora da faixa aceita
+    (piso/teto de current_settings), devolve um novo hash com o custo atual
+    para ser gravado. Retorna (válida, novo_hash ou None)."""
+    current_rounds()
+    start = time.perf_counter()
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    finally:
+        BCRYPT_SECONDS.observe(time.perf_counter() - start, operation="verify")
+
+# ------------------------------------------------------
+# ------------------ Benchmark -------------------------
+# ------------------------------------------------------
+
+def benchmark(min_rounds: int, max_rounds: int, samples: int) -> list[dict]:
+    """Hashes por segundo por núcleo em cada custo."""
+    results = []
+    for rounds in range(min_rounds, max_rounds + 1):
+        seconds = measure(rounds, samples)
+        results.append({"rounds": rounds, "ms_per_hash": seconds * 1000, "hashes_per_second_per_core": 1 / seconds})
+    return results
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.hashing [--min 10] [--max 14] [--samples 3]
+    parser = argparse.ArgumentParser(description="Benchmark do custo do bcrypt")
+    parser.add_argument("--min", type=int, default=BCRYPT_MIN_ROUNDS)
+    parser.add_argument("--max", type=int, default=14)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    for result in benchmark(args.min, args.max, args.samples):
+        print(
+            f"custo {result['rounds']:>2}: {result['ms_per_hash']:9.1f} ms/hash   "
+            f"{result['hashes_per_second_per_core']:8.2f} hashes/s/núcleo"
+        )
+    print(f"custo calibrado para {BCRYPT_TARGET_MS:.0f} ms: {calibrate()}")
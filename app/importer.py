@@ -0,0 +1,217 @@
+import csv
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from dotenv import load_dotenv
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.catalog import bump_catalog_version
+from app.search import product_index
+from app.hashing import get_password_hash
+from app.database import Product, User, UserRole
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# Threads usadas para gerar os hashes bcrypt na importação de usuários
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+PRODUCT_COLUMNS = ["name", "current_stock", "min_stock", "max_stock"]
+
+
+@dataclass
+class ImportReport:
+    """Resultado de uma importação: linhas inseridas e erros por linha."""
+    inserted: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.errors.append({"line": line, "error": message})
+
+# ------------------------------------------------------
+# ------------------ Leitura e validação ---------------
+# ------------------------------------------------------
+
+def read_csv(stream) -> Iterator[dict]:
+    """Lê um CSV (texto ou binário) linha a linha, sem carregá-lo inteiro."""
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(stream, "mode", ""):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    yield from csv.DictReader(stream)
+
+def _int_field(row: dict, name: str, default: int | None = None) -> int:
+    value = row.get(name)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if default is None:
+            raise ValueError(f"Campo obrigatório ausente: {name}")
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor inválido para {name}: {value!r}")
+
+def validate_product_row(row: dict) -> dict:
+    """Aplica as mesmas regras das CheckConstraints de Product antes de enviar ao banco."""
+    name = (row.get("name") or "").strip()
+    if not name:
+        raise ValueError("Campo obrigatório ausente: name")
+    if len(name) > 100:
+        raise ValueError("name excede 100 caracteres")
+    current_stock = _int_field(row, "current_stock", default=0)
+    min_stock = _int_field(row, "min_stock", default=0)
+    max_stock = _int_field(row, "max_stock")
+    if min_stock < 0:
+        raise ValueError("min_stock não pode ser negativo")
+    if max_stock <= min_stock:
+        raise ValueError("max_stock deve ser maior que min_stock")
+    if current_stock < 0:
+        raise ValueError("current_stock não pode ser negativo")
+    return {"name": name, "current_stock": current_stock, "min_stock": min_stock, "max_stock": max_stock}
+
+def validate_user_row(row: dict) -> dict:
+    email = (row.get("email") or "").strip()
+    password = row.get("password") or ""
+    role = (row.get("role") or "").strip().lower()
+    if not email or "@" not in email:
+        raise ValueError(f"Email inválido: {email!r}")
+    if len(email) > 100:
+        raise ValueError("email excede 100 caracteres")
+    if not password:
+        raise ValueError("Campo obrigatório ausente: password")
+    try:
+        role = UserRole(role)
+    except ValueError:
+        raise ValueError(f"Perfil inválido: {role!r}")
+    return {"email": email, "password": password, "role": role}
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[tuple[int, dict]]]:
+    """Agrupa as linhas em blocos, numerando-as (linha 1 = primeira linha de dados)."""
+    chunk = []
+    for line, row in enumerate(rows, start=1):
+        chunk.append((line, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# ------------------------------------------------------
+# ------------------ Inserção em lote ------------------
+# ------------------------------------------------------
+
+def _copy_products(db: Session, rows: list[dict]) -> None:
+    """Insere via COPY (PostgreSQL + psycopg2)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[c] for c in PRODUCT_COLUMNS])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY products ({', '.join(PRODUCT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+def _insert_chunk(
+    db: Session, table, rows: list[dict], report: ImportReport, lines: list[int],
+    use_copy: bool = False, catalog: bool = False,
+) -> None:
+    """Insere um bloco em uma transação. Se o banco recusar o bloco, refaz linha a
+    linha (com savepoint) para registrar apenas as linhas com erro. Com `catalog`,
+    a versão do catálogo é incrementada na mesma transação."""
+    try:
+        if use_copy:
+            _copy_products(db, rows)
+        else:
+            db.execute(insert(table).values(rows))
+        if catalog:
+            bump_catalog_version(db)
+        db.commit()
+        report.inserted += len(rows)
+        return
+    except SQLAlchemyError:
+        db.rollback()
+
+    for line, row in zip(lines, rows):
+        try:
+            with db.begin_nested():
+                db.execute(insert(table).values(row))
+            report.inserted += 1
+        except SQLAlchemyError as e:
+            report.add_error(line, str(getattr(e, "orig", e)))
+    if catalog:
+        bump_catalog_version(db)
+    db.commit()
+
+def import_products(db: Session, rows: Iterable[dict], chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Importa produtos em blocos. Usa COPY no PostgreSQL (psycopg2) e
+    INSERT com múltiplos VALUES nos demais bancos (ex.: SQLite nos testes)."""
+    report = ImportReport()
+    use_copy = db.get_bind().dialect.driver == "psycopg2"
+    for chunk in _chunks(rows, chunk_size):
+        valid, lines = [], []
+        for line, row in chunk:
+            try:
+                valid.append(validate_product_row(row))
+                lines.append(line)
+            except ValueError as e:
+                report.add_error(line, str(e))
+        if valid:
+            _insert_chunk(db, Product.__table__, valid, report, lines, use_copy=use_copy, catalog=True)
+    if report.inserted:
+        # Ids gerados pelo banco (COPY/executemany): mais simples recarregar o índice
+        product_index.invalidate()
+    report.errors.sort(key=lambda e: e["line"])
+    return report
+
+def import_users(db: Session, rows: Iterable[dict], chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Importa usuários em blocos. Os hashes bcrypt de cada bloco são gerados
+    em paralelo; emails repetidos (no arquivo ou já cadastrados) viram erro."""
+    report = ImportReport()
+    seen = set()
+    with ThreadPoolExecutor(max_workers=IMPORT_HASH_WORKERS, thread_name_prefix="import-hash") as pool:
+        for chunk in _chunks(rows, chunk_size):
+            valid, lines = [], []
+            for line, row in chunk:
+                try:
+                    user = validate_user_row(row)
+                except ValueError as e:
+                    report.add_error(line, str(e))
+                    continue
+                if user["email"] in seen:
+                    report.add_error(line, f"Email duplicado no arquivo: {user['email']}")
+                    continue
+                seen.add(user["email"])
+                valid.append(user)
+                lines.append(line)
+            if not valid:
+                continue
+
+            existing = set(
+                db.execute(select(User.email).where(User.email.in_([u["email"] for u in valid]))).scalars()
+            )
+            to_insert, insert_lines = [], []
+            for line, user in zip(lines, valid):
+                if user["email"] in existing:
+                    report.add_error(line, f"Email já cadastrado: {user['email']}")
+                else:
+                    to_insert.append(user)
+                    insert_lines.append(line)
+            if not to_insert:
+                continue
+
+            hashes = pool.map(get_password_hash, [u["password"] for u in to_insert])
+            db_rows = [
+                {"email": u["email"], "hashed_password": hashed, "role": u["role"]}
+                for u, hashed in zip(to_insert, hashes)
+            ]
+            _insert_chunk(db, User.__table__, db_rows, report, insert_lines)
+    report.errors.sort(key=lambda e: e["line"])
+    return report
@@ -0,0 +1,138 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+from app.metrics import Counter, Histogram
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+# Statements mais lentos que isso são registrados no log (0 desativa)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+# Requisições com mais queries que isso são registradas no log, para achar N+1 (0 desativa)
+MAX_QUERIES_PER_REQUEST = int(os.getenv("MAX_QUERIES_PER_REQUEST", "0"))
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Latência das requisições por rota")
+HTTP_REQUESTS = Counter("http_requests_total", "Requisições atendidas por rota e status")
+DB_STATEMENT_SECONDS = Histogram("db_statement_duration_seconds", "Duração de cada statement SQL")
+DB_QUERIES = Counter("db_queries_total", "Statements SQL executados por rota")
+DB_SECONDS = Counter("db_seconds_total", "Tempo gasto no banco por rota")
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Quantidade de statements SQL por requisição",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+# ------------------------------------------------------
+# ---------------- Estatísticas da requisição ----------
+# ------------------------------------------------------
+
+class RequestStats:
+    """Queries e tempo de banco acumulados durante uma requisição."""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+def current_request_stats() -> RequestStats | None:
+    return _request_stats.get()
+
+@contextmanager
+def track_queries():
+    """Conta as queries e o tempo de banco do bloco, fora de uma requisição HTTP
+    (scripts, jobs, verificações de N+1)."""
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+# ------------------------------------------------------
+# ---------------- Hooks do SQLAlchemy -----------------
+# ------------------------------------------------------
+
+# O início fica no contexto de execução do statement (e não em uma pilha em
+# conn.info): se o statement falhar, after_cursor_execute não roda e nada
+# sobra acumulado na conexão do pool.
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    DB_STATEMENT_SECONDS.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning("Query lenta (%.1f ms): %s", elapsed * 1000, statement)
+
+def instrument_engine(engine) -> None:
+    """Registra os hooks de medição em um engine síncrono
+    (para o assíncrono, use engine.sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+# ------------------------------------------------------
+# ---------------- Middleware HTTP ---------------------
+# ------------------------------------------------------
+
+def _record_request(request, stats: RequestStats, status_code: int, elapsed: float) -> None:
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    HTTP_REQUEST_SECONDS.observe(elapsed, method=request.method, route=path)
+    HTTP_REQUESTS.inc(method=request.method, route=path, status=status_code)
+    DB_QUERIES.inc(stats.queries, route=path)
+    DB_SECONDS.inc(stats.db_seconds, route=path)
+    DB_QUERIES_PER_REQUEST.observe(stats.queries, route=path)
+    if MAX_QUERIES_PER_REQUEST and stats.queries > MAX_QUERIES_PER_REQUEST:
+        logger.warning(
+            "%s %s executou %d queries (limite %d)",
+            request.method, path, stats.queries, MAX_QUERIES_PER_REQUEST,
+        )
+
+async def metrics_middleware(request, call_next):
+    """Mede latência, queries e tempo de banco de cada requisição, por rota.
+    O registro acontece quando o corpo termina de ser enviado: respostas em
+    streaming (ex.: exportações) consultam o banco depois de call_next
+    retornar, e essas queries também entram na conta da rota. A latência
+    inclui o envio do corpo."""
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        _record_request(request, stats, 500, time.perf_counter() - start)
+        raise
+    finally:
+        # A rota roda em outra task, com cópia do contexto: segue somando em `stats`
+        _request_stats.reset(token)
+
+    body = response.body_iterator
+
+    async def record_when_done():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            _record_request(request, stats, response.status_code, time.perf_counter() - start)
+
+    response.body_iterator = record_when_done()
+    return response
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from app.database import SessionLocal, User
-from app.utils import verify_password, create_access_token, create_refresh_token  # Adicionamos create_refresh_token
+from app.database import get_async_db
+from app.crud_async import get_user_by_email
+from app.utils import create_access_token, create_refresh_token  # Adicionamos create_refresh_token
+from app.hashing import verify_and_update
+from app.executor import hash_executor, OverloadedError
+from app.ratelimit import limit_login
 from fastapi.security import OAuth2PasswordBearer
 from datetime import timedelta
 
@@ -22,34 +26,43 @@ class LoginResponse(BaseModel):
     user_id: int
     email: str
 
-# Função para obter a sessão do banco de dados
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # Instanciando o OAuth2PasswordBearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 # Rota de login
 @router.post("/login", response_model=LoginResponse)
-async def login(login_request: LoginRequest, db: Session = Depends(get_db)):
-    # 1. Verifica se o usuário existe no banco de dados
-    user = db.query(User).filter(User.email == login_request.email).first()
-    if not user:
+async def login(login_request: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # 0. Limite de tentativas por IP e por email (429 antes de tocar no banco ou no bcrypt)
+    await limit_login(request, login_request.email)
+
+    try:
+        # 1. Verifica se o usuário existe no banco de dados
+        user = await get_user_by_email(db, login_request.email)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuário ou senha incorretos"
+            )
+
+        # 2. Verifica se a senha fornecida é a mesma que o hash armazenado
+        #    (e gera um novo hash se o custo do bcrypt foi alterado)
+        valid, new_hash = await hash_executor.run(verify_and_update, login_request.password, user.hashed_password)
+    except OverloadedError:
+        # Muitos logins simultâneos: falha rápido em vez de travar o restante da API
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuário ou senha incorretos"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor sobrecarregado, tente novamente em instantes",
+            headers={"Retry-After": "1"},
         )
 
-    # 2. Verifica se a senha fornecida é a mesma que o hash armazenado
-    if not verify_password(login_request.password, user.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário ou senha incorretos"
         )
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
 
     # 3. Gera o token de acesso e o refresh token
     access_token = create_access_token(data={"sub": user.email, "id": user.id})
@@ -1,58 +1,90 @@
-from fastapi import FastAPI, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.database import SessionLocal, Base, engine, User
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends
+from fastapi.responses import PlainTextResponse
+from app.database import SessionLocal, init_db, warm_pool, warm_async_pool, pool_stats, replicas, check_replicas_periodically
 from app.login import router as login_router
-from app.utils import verify_access_token
+from app.stock import router as stock_router
+from app.purchase_requests import router as purchase_requests_router
+from app.products import router as products_router
+from app.users import router as users_router
+from app.dashboard import router as dashboard_router
+from app.dependencies import get_current_user
+from app.cache import Principal
+from app.executor import hash_executor
+from app.hashing import current_rounds
+from app.instrumentation import metrics_middleware
+from app.metrics import render
+from app.revocation import revocation_filter
+from app.maintenance import purge_periodically, TOKEN_PURGE_INTERVAL_SECONDS
 from pydantic import BaseModel
 
+# Carrega a blacklist de tokens no filtro de revogação em memória
+def _seed_revocation_filter():
+    with SessionLocal() as db:
+        revocation_filter.seed(db)
+
+# Ciclo de vida da aplicação (inicialização e encerramento)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Verificação de conexão e criação das tabelas (fora do import do módulo)
+    await asyncio.to_thread(init_db)
+    # Abre antecipadamente as conexões mínimas configuradas (DB_POOL_MIN_WARM)
+    await asyncio.to_thread(warm_pool)
+    await warm_async_pool()
+    await asyncio.to_thread(_seed_revocation_filter)
+    # Define o custo do bcrypt (BCRYPT_ROUNDS ou calibração para BCRYPT_TARGET_MS)
+    await asyncio.to_thread(current_rounds)
+    # Limpeza periódica de refresh tokens expirados e da blacklist
+    purge_task = None
+    if TOKEN_PURGE_INTERVAL_SECONDS > 0:
+        purge_task = asyncio.create_task(purge_periodically())
+    # Verificação de saúde das réplicas de leitura (DATABASE_REPLICA_URLS)
+    replica_task = None
+    if replicas:
+        replica_task = asyncio.create_task(check_replicas_periodically())
+    yield
+    if purge_task is not None:
+        purge_task.cancel()
+    if replica_task is not None:
+        replica_task.cancel()
+    hash_executor.shutdown()
+
 # Inicializando o app FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
-# Incluindo as rotas do login
-app.include_router(login_router)
+# Métricas por requisição (latência, queries e tempo de banco)
+app.middleware("http")(metrics_middleware)
 
-# Função para obter a sessão do banco de dados
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Incluindo as rotas
+app.include_router(login_router)
+app.include_router(stock_router)
+app.include_router(purchase_requests_router)
+app.include_router(products_router)
+app.include_router(users_router)
+app.include_router(dashboard_router)
 
 # Definindo o modelo de dados para uma rota protegida
 class UserResponse(BaseModel):
     id: int
     email: str
 
-# Instanciando o OAuth2PasswordBearer
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
-
-# Dependência para validar o token de acesso
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    payload = verify_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido ou expirado",
-        )
-    user = db.query(User).filter(User.id == payload["id"]).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuário não encontrado",
-        )
-    return user
-
 # Rota de exemplo protegida que requer autenticação
 @app.get("/protected", response_model=UserResponse)
-async def protected_route(current_user: User = Depends(get_current_user)):
+async def protected_route(current_user: Principal = Depends(get_current_user)):
     return {"id": current_user.id, "email": current_user.email}
 
+# Estatísticas ao vivo dos pools de conexão
+@app.get("/db/pool")
+async def db_pool():
+    return pool_stats()
+
+# Métricas no formato texto do Prometheus
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
 # Verifica o estado do servidor (ping)
 @app.get("/ping")
 async def ping():
     return {"message": "pong"}
-
-# Inicialização do banco de dados (só uma vez)
-Base.metadata.create_all(bind=engine)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, RefreshToken, AccessTokenBlacklist, get_engine
+from app.revocation import revocation_filter
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# Intervalo entre execuções da limpeza (0 desativa o agendamento)
+TOKEN_PURGE_INTERVAL_SECONDS = float(os.getenv("TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
+TOKEN_PURGE_BATCH_SIZE = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", "1000"))
+# Tempo máximo de uma execução e pausa entre lotes, para não segurar as tabelas
+TOKEN_PURGE_TIME_BUDGET = float(os.getenv("TOKEN_PURGE_TIME_BUDGET", "5"))
+TOKEN_PURGE_PAUSE = float(os.getenv("TOKEN_PURGE_PAUSE", "0.05"))
+# Chave do advisory lock do Postgres: com vários workers, só um limpa por rodada
+TOKEN_PURGE_LOCK_KEY = int(os.getenv("TOKEN_PURGE_LOCK_KEY", "731104"))
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------
+# ------------- Limpeza de tokens expirados ------------
+# ------------------------------------------------------
+
+def _purge_table(db: Session, model, condition, batch_size: int, deadline: float, batches: list) -> bool:
+    """Apaga em lotes pequenos (um commit por lote) as linhas que atendem `condition`.
+    Retorna False se o tempo acabou antes de esgotar as linhas."""
+    while True:
+        if time.monotonic() >= deadline:
+            return False
+        start = time.perf_counter()
+        ids = list(db.execute(select(model.id).where(condition).limit(batch_size)).scalars())
+        if not ids:
+            return True
+        result = db.execute(delete(model).where(model.id.in_(ids)))
+        db.commit()
+        elapsed = time.perf_counter() - start
+        batches.append({"table": model.__tablename__, "rows": result.rowcount, "elapsed": elapsed})
+        logger.info("Limpeza %s: %d linhas em %.3fs", model.__tablename__, result.rowcount, elapsed)
+        if len(ids) < batch_size:
+            return True
+        time.sleep(TOKEN_PURGE_PAUSE)
+
+def purge_tokens(
+    db: Session,
+    now: datetime | None = None,
+    batch_size: int = TOKEN_PURGE_BATCH_SIZE,
+    time_budget: float = TOKEN_PURGE_TIME_BUDGET,
+) -> dict:
+    """Remove refresh tokens expirados ou revogados e entradas da blacklist cujo
+    token já teria expirado de qualquer forma. Retorna o relatório por lote:
+    {"batches": [{"table", "rows", "elapsed"}], "purged": {tabela: total}, "complete"}."""
+    now = now or datetime.utcnow()
+    deadline = time.monotonic() + time_budget
+    batches: list = []
+
+    complete = _purge_table(
+        db,
+        RefreshToken,
+        or_(RefreshToken.expires_at < now, RefreshToken.revoked.is_(True)),
+        batch_size,
+        deadline,
+        batches,
+    )
+    # Um jti revogado há mais tempo que a validade do refresh token não tem mais o que bloquear
+    blacklist_cutoff = now - timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    complete = _purge_table(
+        db,
+        AccessTokenBlacklist,
+        AccessTokenBlacklist.revoked_at < blacklist_cutoff,
+        batch_size,
+        deadline,
+        batches,
+    ) and complete
+
+    purged: dict = {}
+    for batch in batches:
+        purged[batch["table"]] = purged.get(batch["table"], 0) + batch["rows"]
+
+    # O filtro de Bloom não remove itens: é reconstruído após apagar a blacklist
+    if purged.get(AccessTokenBlacklist.__tablename__):
+        revocation_filter.seed(db)
+
+    return {"batches": batches, "purged": purged, "complete": complete}
+
+@contextmanager
+def purge_lock():
+    """No Postgres, tenta o advisory lock TOKEN_PURGE_LOCK_KEY em uma conexão
+    própria (as sessões da limpeza devolvem a conexão ao pool a cada commit)
+    e informa se conseguiu. Nos demais bancos não há disputa: sempre True."""
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    with engine.connect() as conn:
+        acquired = conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": TOKEN_PURGE_LOCK_KEY})
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": TOKEN_PURGE_LOCK_KEY})
+
+def run_purge() -> dict | None:
+    """Executa uma limpeza completa com sessão própria. Se outro processo já
+    estiver limpando (ver purge_lock), pula a rodada e retorna None."""
+    with purge_lock() as acquired:
+        if not acquired:
+            logger.info("Limpeza de tokens em andamento em outro processo; rodada ignorada")
+            return None
+        with SessionLocal() as db:
+            report = purge_tokens(db)
+    logger.info("Limpeza de tokens concluída: %s", report["purged"])
+    return report
+
+async def purge_periodically(interval: float = TOKEN_PURGE_INTERVAL_SECONDS) -> None:
+    """Laço do agendamento, iniciado no lifespan do app (em todos os workers;
+    purge_lock garante uma limpeza por vez)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(run_purge)
+        except Exception:
+            logger.exception("Falha na limpeza de tokens")
+
+
+if __name__ == "__main__":
+    # Execução manual: python -m app.maintenance
+    logging.basicConfig(level=logging.INFO)
+    print(run_purge())
@@ -0,0 +1,135 @@
+import threading
+from bisect import bisect_left
+
+# ------------------------------------------------------
+# --------- Métricas em memória (formato Prometheus) ----
+# ------------------------------------------------------
+
+# Faixas padrão de latência, em segundos
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list = []
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        _registry.append(metric)
+    return metric
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    items = key + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Counter:
+    """Contador monotônico, opcionalmente separado por labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: dict = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _labels_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_labels_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge:
+    """Valor instantâneo, calculado por uma função no momento da leitura."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback):
+        self.name = name
+        self.documentation = documentation
+        # callback() -> lista de (labels: dict, valor)
+        self._callback = callback
+        _register(self)
+
+    def samples(self):
+        return [(self.name, _labels_key(labels), value) for labels, value in self._callback()]
+
+
+class Histogram:
+    """Histograma cumulativo de observações, opcionalmente separado por labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels) -> dict:
+        """Contagens por faixa (cumulativas), soma e total de uma série."""
+        with self._lock:
+            series = self._series.get(_labels_key(labels))
+            if series is None:
+                return {"buckets": {}, "sum": 0.0, "count": 0}
+            counts, total, count = list(series[0]), series[1], series[2]
+        cumulative, buckets = 0, {}
+        for bound, c in zip(self.buckets, counts):
+            cumulative += c
+            buckets[bound] = cumulative
+        return {"buckets": buckets, "sum": total, "count": count}
+
+    def samples(self):
+        result = []
+        with self._lock:
+            series = {key: (list(s[0]), s[1], s[2]) for key, s in self._series.items()}
+        for key, (counts, total, count) in series.items():
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                result.append((f"{self.name}_bucket", key + (("le", repr(bound)),), cumulative))
+            result.append((f"{self.name}_bucket", key + (("le", "+Inf"),), count))
+            result.append((f"{self.name}_sum", key, total))
+            result.append((f"{self.name}_count", key, count))
+        return result
+
+
+def render() -> str:
+    """Todas as métricas registradas no formato texto do Prometheus."""
+    lines = []
+    with _registry_lock:
+        metrics = list(_registry)
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, key, value in metric.samples():
+            lines.append(f"{name}{_format_labels(key)} {value}")
+    return "\n".join(lines) + "\n"
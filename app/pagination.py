@@ -0,0 +1,43 @@
+import base64
+import json
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Tamanho padrão e máximo das páginas das listagens
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+# Tamanho dos lotes buscados do cursor do servidor no modo streaming
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+# ------------------------------------------------------
+# ------------- Cursores da paginação keyset -----------
+# ------------------------------------------------------
+# O cursor é opaco para o cliente: JSON com a chave da última linha entregue,
+# codificado em base64 url-safe.
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> dict:
+    """Decodifica o cursor; levanta ValueError se estiver malformado."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(values, dict):
+        raise ValueError("Cursor inválido")
+    return values
+
+def cursor_id(token: str | None) -> int | None:
+    """Extrai o id do cursor (None se não houver cursor)."""
+    if token is None:
+        return None
+    values = decode_cursor(token)
+    if not isinstance(values.get("id"), int):
+        raise ValueError("Cursor inválido")
+    return values["id"]
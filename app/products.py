@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict
+from app.database import UserRole, get_db, get_read_db
+from app.dependencies import get_current_user, require_roles
+from app.cache import Principal
+from app.catalog import catalog_response
+from app.crud import get_critical_products_page, get_products_page, products_export_query, search_products, PRODUCT_EXPORT_FIELDS
+from app.export import export_response
+from app.importer import import_products, read_csv
+from app.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, cursor_id
+from app.search import AUTOCOMPLETE_LIMIT_MAX, product_index
+
+router = APIRouter()
+
+class ProductOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    current_stock: int
+    min_stock: int
+    max_stock: int
+
+class ProductPage(BaseModel):
+    items: list[ProductOut]
+    next_cursor: str | None
+
+class ProductSuggestion(BaseModel):
+    id: int
+    name: str
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportResponse(BaseModel):
+    inserted: int
+    errors: list[ImportRowError]
+
+def _after_id(cursor: str | None) -> int | None:
+    try:
+        return cursor_id(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+# Lista os produtos com paginação por cursor (keyset); suporta If-None-Match (304)
+@router.get("/products", response_model=ProductPage)
+def list_products(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    after_id = _after_id(cursor)
+
+    def build():
+        items, next_cursor = get_products_page(db, limit, after_id=after_id)
+        return ProductPage(items=items, next_cursor=next_cursor)
+
+    return catalog_response(request, db, build)
+
+# Lista os produtos com estoque crítico (atual <= mínimo); suporta If-None-Match (304)
+@router.get("/products/critical", response_model=ProductPage)
+def list_critical_products(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    after_id = _after_id(cursor)
+
+    def build():
+        items, next_cursor = get_critical_products_page(db, limit, after_id=after_id)
+        return ProductPage(items=items, next_cursor=next_cursor)
+
+    return catalog_response(request, db, build)
+
+# Busca produtos cujo nome contém o termo (índice trigram no Postgres)
+@router.get("/products/search", response_model=list[ProductOut])
+def search_products_by_name(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    return search_products(db, q, limit)
+
+# Autocomplete por prefixo do nome (ou de uma palavra do nome), atendido pelo índice em memória
+@router.get("/products/autocomplete", response_model=list[ProductSuggestion])
+def autocomplete_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=AUTOCOMPLETE_LIMIT_MAX),
+    current_user: Principal = Depends(get_current_user),
+):
+    return product_index.search(q, limit)
+
+# Exporta o cadastro/estoque de produtos em CSV ou NDJSON (streaming)
+@router.get("/products/export")
+def export_products(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    product_id: int | None = None,
+    current_user: Principal = Depends(get_current_user),
+):
+    return export_response(
+        products_export_query(product_id), PRODUCT_EXPORT_FIELDS, format, "products", gzip=gzip
+    )
+
+# Importa produtos em lote a partir de um CSV (name,min_stock,max_stock,current_stock)
+@router.post("/products/import", response_model=ImportResponse)
+def import_products_csv(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_roles(UserRole.MANAGER)),
+):
+    report = import_products(db, read_csv(file.file))
+    return {"inserted": report.inserted, "errors": report.errors}
@@ -0,0 +1,201 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict, Field
+from app.database import UserRole, PRStatus, get_db, get_read_db
+from app.dependencies import get_current_user, require_roles
+from app.cache import Principal
+from app.catalog import catalog_response
+from app.crud import (
+    bulk_update_purchase_request_status,
+    generate_purchase_requests,
+    get_purchase_request_summaries_page,
+    get_purchase_requests_page,
+    purchase_requests_export_query,
+    PURCHASE_REQUEST_EXPORT_FIELDS,
+    PURCHASE_REQUEST_SUMMARY_FIELDS,
+)
+from app.export import export_response
+from app.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, cursor_id
+
+router = APIRouter()
+
+def _before_id(cursor: str | None) -> int | None:
+    try:
+        return cursor_id(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+class PurchaseRequestOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    product_id: int
+    quantity: int
+    requester_id: int
+    status: PRStatus
+    created_at: datetime | None
+
+class PurchaseRequestPage(BaseModel):
+    items: list[PurchaseRequestOut]
+    next_cursor: str | None
+
+class ProductRef(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+
+class RequesterRef(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+
+class PurchaseRequestDetailOut(PurchaseRequestOut):
+    product: ProductRef
+    requester: RequesterRef
+
+class PurchaseRequestDetailPage(BaseModel):
+    items: list[PurchaseRequestDetailOut]
+    next_cursor: str | None
+
+class PurchaseRequestSummaryPage(BaseModel):
+    fields: list[str]
+    items: list[list]
+    next_cursor: str | None
+
+class GenerateResponse(BaseModel):
+    created: int
+
+class BulkStatusRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=5000)
+    status: PRStatus
+
+class BulkStatusResponse(BaseModel):
+    updated: list[int]
+    not_updated: list[int]
+
+# Lista as SCs (mais recentes primeiro) com paginação por cursor e filtros; suporta If-None-Match (304)
+@router.get("/purchase-requests", response_model=PurchaseRequestPage)
+def list_purchase_requests(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    status_filter: PRStatus | None = Query(None, alias="status"),
+    requester_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    before_id = _before_id(cursor)
+
+    def build():
+        items, next_cursor = get_purchase_requests_page(
+            db,
+            limit,
+            before_id=before_id,
+            status=status_filter,
+            requester_id=requester_id,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        return PurchaseRequestPage(items=items, next_cursor=next_cursor)
+
+    return catalog_response(request, db, build)
+
+# Mesma listagem com produto e solicitante embutidos (carregados na mesma query)
+@router.get("/purchase-requests/details", response_model=PurchaseRequestDetailPage)
+def list_purchase_requests_with_details(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    status_filter: PRStatus | None = Query(None, alias="status"),
+    requester_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    before_id = _before_id(cursor)
+
+    def build():
+        items, next_cursor = get_purchase_requests_page(
+            db,
+            limit,
+            before_id=before_id,
+            status=status_filter,
+            requester_id=requester_id,
+            created_from=created_from,
+            created_to=created_to,
+            with_details=True,
+        )
+        return PurchaseRequestDetailPage(items=items, next_cursor=next_cursor)
+
+    return catalog_response(request, db, build)
+
+# Listagem compacta para painéis: linhas como listas na ordem de `fields`
+@router.get("/purchase-requests/summary", response_model=PurchaseRequestSummaryPage)
+def list_purchase_request_summaries(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    status_filter: PRStatus | None = Query(None, alias="status"),
+    requester_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    before_id = _before_id(cursor)
+
+    def build():
+        items, next_cursor = get_purchase_request_summaries_page(
+            db,
+            limit,
+            before_id=before_id,
+            status=status_filter,
+            requester_id=requester_id,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        return PurchaseRequestSummaryPage(fields=PURCHASE_REQUEST_SUMMARY_FIELDS, items=items, next_cursor=next_cursor)
+
+    return catalog_response(request, db, build)
+
+# Exporta as SCs para auditoria em CSV ou NDJSON (streaming)
+@router.get("/purchase-requests/export")
+def export_purchase_requests(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    status_filter: PRStatus | None = Query(None, alias="status"),
+    product_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    current_user: Principal = Depends(require_roles(UserRole.BUYER, UserRole.MANAGER)),
+):
+    query = purchase_requests_export_query(status_filter, product_id, created_from, created_to)
+    return export_response(query, PURCHASE_REQUEST_EXPORT_FIELDS, format, "purchase_requests", gzip=gzip)
+
+# Avalia todo o catálogo e cria as SCs automáticas de estoque baixo
+@router.post("/purchase-requests/generate", response_model=GenerateResponse)
+def generate_requests(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_roles(UserRole.BUYER, UserRole.MANAGER)),
+):
+    return {"created": generate_purchase_requests(db, requester_id=current_user.id)}
+
+# Aprova ou rejeita várias SCs pendentes de uma vez, respeitando a alçada do perfil
+@router.post("/purchase-requests/status", response_model=BulkStatusResponse)
+def bulk_update_status(
+    body: BulkStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_roles(UserRole.BUYER, UserRole.MANAGER)),
+):
+    if body.status == PRStatus.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O novo status deve ser aprovado ou rejeitado",
+        )
+    return bulk_update_purchase_request_status(db, body.ids, body.status, UserRole(current_user.role))
@@ -0,0 +1,176 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+
+from app.metrics import Counter
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+# "memory" (por processo) ou "redis" (compartilhado entre workers, exige REDIS_URL)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_PREFIX = os.getenv("RATE_LIMIT_PREFIX", "ratelimit:")
+# Limite de chaves guardadas no backend em memória (as menos usadas saem primeiro)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Só use atrás de um proxy confiável: o IP do cliente passa a vir do X-Forwarded-For
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+# Balde por email: rajada de LOGIN_EMAIL_BURST tentativas, repostas a LOGIN_EMAIL_REFILL por segundo
+LOGIN_EMAIL_BURST = float(os.getenv("LOGIN_EMAIL_BURST", "5"))
+LOGIN_EMAIL_REFILL = float(os.getenv("LOGIN_EMAIL_REFILL", "0.2"))
+# Balde por IP (vários usuários atrás do mesmo NAT precisam de mais folga)
+LOGIN_IP_BURST = float(os.getenv("LOGIN_IP_BURST", "30"))
+LOGIN_IP_REFILL = float(os.getenv("LOGIN_IP_REFILL", "1"))
+# Teto do Retry-After: com reposição 0 (ou muito lenta) o balde não volta a
+# encher em tempo útil, e o cliente recebe este valor em vez de infinito
+RATE_LIMIT_MAX_RETRY_AFTER = float(os.getenv("RATE_LIMIT_MAX_RETRY_AFTER", "3600"))
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = Counter("rate_limited_total", "Requisições recusadas pelo limitador, por balde")
+
+# ------------------------------------------------------
+# ------------------ Token bucket ----------------------
+# ------------------------------------------------------
+
+def refill(tokens: float, updated_at: float, now: float, burst: float, rate: float) -> float:
+    """Fichas disponíveis em `now`, repostas a `rate` por segundo até `burst`."""
+    return min(burst, tokens + max(0.0, now - updated_at) * rate)
+
+def take(tokens: float, burst: float, rate: float, cost: float = 1.0) -> tuple[bool, float, float]:
+    """Tenta consumir `cost` fichas. Retorna (permitido, fichas restantes,
+    segundos até haver fichas suficientes, no máximo RATE_LIMIT_MAX_RETRY_AFTER)."""
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    if rate <= 0:
+        return False, tokens, RATE_LIMIT_MAX_RETRY_AFTER
+    return False, tokens, min((cost - tokens) / rate, RATE_LIMIT_MAX_RETRY_AFTER)
+
+class MemoryBackend:
+    """Baldes em memória, por processo. Cada worker limita sozinho: com N
+    workers o limite efetivo pode chegar a N vezes o configurado."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, burst: float, rate: float, cost: float = 1.0) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens = refill(tokens, updated_at, now, burst, rate)
+            allowed, tokens, retry_after = take(tokens, burst, rate, cost)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+class RedisBackend:
+    """Baldes compartilhados em um servidor com protocolo Redis (hash com
+    fichas e instante da última atualização). A atualização usa
+    WATCH/MULTI, que também funciona em substitutos locais (ex.: fakeredis).
+    Se o servidor estiver fora do ar, as requisições passam (fail open)."""
+
+    MAX_RETRIES = 5
+
+    def __init__(self, url: str = REDIS_URL, client=None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise RuntimeError("RATE_LIMIT_BACKEND=redis exige o pacote redis (pip install redis)") from e
+            client = redis.from_url(url)
+        self.client = client
+
+    async def hit(self, key: str, burst: float, rate: float, cost: float = 1.0) -> tuple[bool, float]:
+        from redis.exceptions import RedisError, WatchError
+
+        key = RATE_LIMIT_PREFIX + key
+        # Tempo até o balde encher de novo: depois disso a chave pode sumir
+        ttl_ms = max(1, int(burst / rate * 1000)) if rate > 0 else None
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                for _ in range(self.MAX_RETRIES):
+                    try:
+                        await pipe.watch(key)
+                        now = time.time()
+                        stored_tokens, stored_at = await pipe.hmget(key, "tokens", "ts")
+                        if stored_tokens is None:
+                            tokens = burst
+                        else:
+                            tokens = refill(float(stored_tokens), float(stored_at), now, burst, rate)
+                        allowed, tokens, retry_after = take(tokens, burst, rate, cost)
+                        pipe.multi()
+                        pipe.hset(key, mapping={"tokens": tokens, "ts": now})
+                        if ttl_ms is not None:
+                            pipe.pexpire(key, ttl_ms)
+                        await pipe.execute()
+                        return allowed, retry_after
+                    except WatchError:
+                        continue
+        except RedisError:
+            logger.warning("Limitador indisponível (%s); requisição liberada", key, exc_info=True)
+            return True, 0.0
+        # Disputa intensa pela mesma chave: trata como limitado
+        return False, 1.0
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """Backend configurado em RATE_LIMIT_BACKEND, criado no primeiro uso."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = RedisBackend() if RATE_LIMIT_BACKEND == "redis" else MemoryBackend()
+    return _backend
+
+def set_backend(backend) -> None:
+    """Troca o backend (ex.: um RedisBackend com cliente fakeredis em testes locais)."""
+    global _backend
+    _backend = backend
+
+# ------------------------------------------------------
+# ------------------ Uso nas rotas ---------------------
+# ------------------------------------------------------
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+async def enforce_rate_limit(buckets: list[tuple[str, str, float, float]]) -> None:
+    """Consome uma ficha de cada balde (nome, chave, rajada, reposição/s).
+    Levanta 429 com Retry-After no primeiro balde vazio."""
+    backend = get_backend()
+    for name, key, burst, rate in buckets:
+        allowed, retry_after = await backend.hit(key, burst, rate)
+        if not allowed:
+            RATE_LIMITED.inc(bucket=name)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Muitas tentativas, tente novamente mais tarde",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+            )
+
+async def limit_login(request: Request, email: str) -> None:
+    """Limita tentativas de login por email e por IP; chamar antes de
+    qualquer consulta ao banco ou verificação de senha.
+    O balde do email vem primeiro: tentativas contra um email já bloqueado
+    param nele e não gastam a cota do IP, compartilhada por quem está atrás
+    do mesmo NAT."""
+    await enforce_rate_limit([
+        ("login_email", f"login:email:{email.strip().lower()}", LOGIN_EMAIL_BURST, LOGIN_EMAIL_REFILL),
+        ("login_ip", f"login:ip:{client_ip(request)}", LOGIN_IP_BURST, LOGIN_IP_REFILL),
+    ])
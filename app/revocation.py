@@ -0,0 +1,159 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from app.database import AccessTokenBlacklist
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+REVOCATION_FILTER_ERROR_RATE = float(os.getenv("REVOCATION_FILTER_ERROR_RATE", "0.01"))
+# Intervalo para buscar revogações feitas por outros processos
+REVOCATION_FILTER_REFRESH_SECONDS = float(os.getenv("REVOCATION_FILTER_REFRESH_SECONDS", "5"))
+# Cada atualização relê as revogações desde (maior revoked_at visto - esta janela):
+# cobre transações que gravaram antes e fizeram commit depois, e relógios
+# levemente diferentes entre os workers
+REVOCATION_FILTER_OVERLAP_SECONDS = float(os.getenv("REVOCATION_FILTER_OVERLAP_SECONDS", "300"))
+
+
+class _Bloom:
+    """Bits e parâmetros de um filtro. Uma instância publicada nunca muda de
+    tamanho: o redimensionamento cria outra e troca a referência."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.size = int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)) + 1
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self.watermark = None  # Maior revoked_at já carregado
+
+    def positions(self, jti: str):
+        digest = hashlib.sha256(jti.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def contains(self, jti: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self.positions(jti))
+
+    def add(self, jti: str) -> None:
+        positions = self.positions(jti)
+        bits = self.bits
+        # Releituras da janela de sobreposição não contam de novo
+        if all(bits[pos >> 3] & (1 << (pos & 7)) for pos in positions):
+            return
+        for pos in positions:
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def absorb(self, rows) -> None:
+        """Adiciona linhas (jti, revoked_at) e avança o watermark."""
+        for jti, revoked_at in rows:
+            self.add(jti)
+            if self.watermark is None or revoked_at > self.watermark:
+                self.watermark = revoked_at
+
+
+def _revocations_since(db: Session, watermark):
+    """(jti, revoked_at) da blacklist a partir de `watermark` menos a janela de
+    sobreposição (tudo, se não houver watermark). Os ids e o revoked_at são
+    atribuídos antes do commit e transações concorrentes podem confirmar fora
+    de ordem: em vez de "id > último id", cada atualização relê essa janela."""
+    query = db.query(AccessTokenBlacklist.jti, AccessTokenBlacklist.revoked_at)
+    if watermark is not None:
+        since = watermark - timedelta(seconds=REVOCATION_FILTER_OVERLAP_SECONDS)
+        query = query.filter(AccessTokenBlacklist.revoked_at >= since)
+    return query
+
+
+class RevocationFilter:
+    """Filtro de Bloom com os jti da blacklist.
+
+    - `might_contain` False: o token certamente não foi revogado (sem consulta ao banco).
+    - `might_contain` True: possivelmente revogado, o banco decide.
+    O filtro é carregado da blacklist na inicialização e atualizado por
+    `add` (revogações locais) e `refresh` (revogações de outros processos).
+    `seed` monta um filtro novo à parte e o publica com uma troca de
+    referência: os leitores nunca veem um filtro vazio ou pela metade."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.error_rate = error_rate
+        self._lock = threading.Lock()          # Escritas de bits e troca do filtro
+        self._load_lock = threading.Lock()     # Uma carga (seed/refresh) por vez
+        self._bloom = _Bloom(capacity, error_rate)
+        self._rebuilding: list[str] | None = None  # jti adicionados durante um seed
+        self.last_refresh = 0.0
+        self.seeded = False
+
+    @property
+    def capacity(self) -> int:
+        return self._bloom.capacity
+
+    @property
+    def count(self) -> int:
+        return self._bloom.count
+
+    def add(self, jti: str) -> None:
+        with self._lock:
+            self._bloom.add(jti)
+            if self._rebuilding is not None:
+                self._rebuilding.append(jti)
+
+    def might_contain(self, jti: str) -> bool:
+        return self._bloom.contains(jti)
+
+    def seed(self, db: Session) -> None:
+        """Carrega toda a blacklist em um filtro novo (redimensionado se
+        necessário) e só então substitui o atual."""
+        with self._load_lock:
+            total = db.query(AccessTokenBlacklist.id).count()
+            with self._lock:
+                self._rebuilding = []
+            try:
+                bloom = _Bloom(max(REVOCATION_FILTER_CAPACITY, total * 2), self.error_rate)
+                bloom.absorb(_revocations_since(db, None).yield_per(10000))
+                with self._lock:
+                    # Revogações locais feitas enquanto o filtro novo era montado
+                    for jti in self._rebuilding:
+                        bloom.add(jti)
+                    self._bloom = bloom
+            finally:
+                with self._lock:
+                    self._rebuilding = None
+            self.last_refresh = time.monotonic()
+            self.seeded = True
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        """Incorpora as revogações novas no banco (ver _revocations_since).
+        Só consulta o banco se o intervalo de atualização tiver passado."""
+        if not self.seeded:
+            self.seed(db)
+            return
+        if not force and time.monotonic() - self.last_refresh < REVOCATION_FILTER_REFRESH_SECONDS:
+            return
+        bloom = self._bloom
+        if bloom.count > bloom.capacity:
+            self.seed(db)
+            return
+        # Outra thread já está carregando: esta segue com o filtro atual
+        if not self._load_lock.acquire(blocking=False):
+            return
+        try:
+            rows = _revocations_since(db, bloom.watermark).all()
+            with self._lock:
+                self._bloom.absorb(rows)
+            self.last_refresh = time.monotonic()
+        finally:
+            self._load_lock.release()
+
+
+revocation_filter = RevocationFilter(REVOCATION_FILTER_CAPACITY, REVOCATION_FILTER_ERROR_RATE)
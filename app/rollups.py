@@ -0,0 +1,155 @@
+import argparse
+import logging
+import os
+import random
+from collections import defaultdict
+from datetime import date, datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import case, delete, func, insert, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.database import (
+    DailyProductMovement, PurchaseRequest, PurchaseRequestStatusCount, SessionLocal, StockMovement,
+)
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+# Linhas por status no contador de SCs (1 = sem divisão)
+ROLLUP_COUNTER_SHARDS = int(os.getenv("ROLLUP_COUNTER_SHARDS", "8"))
+
+logger = logging.getLogger(__name__)
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# ------------------------------------------------------
+# ------------------ Atualização incremental -----------
+# ------------------------------------------------------
+# O crud chama record_* antes do commit da própria escrita: o agregado e a
+# linha de origem são gravados (ou desfeitos) juntos. Os upserts somam ao
+# valor existente (INSERT ... ON CONFLICT DO UPDATE SET x = x + excluded.x)
+# e são emitidos em ordem de chave, evitando deadlocks entre transações.
+
+def _upsert(dialect: str, table, keys: list[str], counters: list[str]):
+    try:
+        stmt = _INSERTS[dialect](table)
+    except KeyError:
+        raise RuntimeError(f"Rollups não suportados no banco {dialect!r}") from None
+    return stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+    )
+
+def movement_rollup_rows(movements: list[dict]) -> list[dict]:
+    """Soma movimentações ({"product_id", "quantity", "created_at"}) por produto e dia."""
+    totals = defaultdict(lambda: [0, 0, 0])
+    for movement in movements:
+        entry = totals[(movement["product_id"], movement["created_at"].date())]
+        if movement["quantity"] > 0:
+            entry[0] += movement["quantity"]
+        else:
+            entry[1] -= movement["quantity"]
+        entry[2] += 1
+    return [
+        {"product_id": product_id, "day": day, "inbound": inbound, "outbound": outbound, "movements": count}
+        for (product_id, day), (inbound, outbound, count) in sorted(totals.items())
+    ]
+
+def status_rollup_rows(deltas: dict) -> list[dict]:
+    """Variações por status em um shard sorteado (o shard pode ficar negativo; a soma não)."""
+    return [
+        {"status": status, "shard": random.randrange(ROLLUP_COUNTER_SHARDS), "count": delta}
+        for status, delta in sorted(deltas.items(), key=lambda item: item[0].name)
+        if delta
+    ]
+
+def rollup_statements(dialect: str, movements: list[dict] = (), status_deltas: dict | None = None) -> list[tuple]:
+    """Pares (statement, parâmetros) a executar na transação corrente."""
+    statements = []
+    rows = movement_rollup_rows(movements)
+    if rows:
+        table = DailyProductMovement.__table__
+        statements.append((_upsert(dialect, table, ["product_id", "day"], ["inbound", "outbound", "movements"]), rows))
+    rows = status_rollup_rows(status_deltas or {})
+    if rows:
+        table = PurchaseRequestStatusCount.__table__
+        statements.append((_upsert(dialect, table, ["status", "shard"], ["count"]), rows))
+    return statements
+
+def record_rollups(db: Session, movements: list[dict] = (), status_deltas: dict | None = None) -> None:
+    """Aplica as variações nos rollups, sem commit."""
+    for stmt, rows in rollup_statements(db.get_bind().dialect.name, movements, status_deltas):
+        db.execute(stmt, rows)
+
+async def record_rollups_async(db, movements: list[dict] = (), status_deltas: dict | None = None) -> None:
+    """Variante de record_rollups para AsyncSession."""
+    for stmt, rows in rollup_statements(db.get_bind().dialect.name, movements, status_deltas):
+        await db.execute(stmt, rows)
+
+def purchase_request_status_totals(condition):
+    """SELECT status, count(*) das SCs que atendem `condition` (ex.: as que
+    serão removidas em cascata junto com um produto ou usuário)."""
+    return (
+        select(PurchaseRequest.status, func.count())
+        .where(condition)
+        .group_by(PurchaseRequest.status)
+    )
+
+# ------------------------------------------------------
+# ------------------ Reconstrução ----------------------
+# ------------------------------------------------------
+
+def rebuild_rollups(db: Session, since: date | None = None) -> dict:
+    """Recalcula os rollups a partir das tabelas de origem, em uma transação.
+    `since` limita a reconstrução das movimentações diárias aos dias a partir
+    dessa data (backfill parcial); os contadores de SCs são sempre refeitos.
+    No Postgres, as escritas nas tabelas de origem esperam a reconstrução
+    terminar (LOCK ... IN SHARE MODE) para nenhum incremento se perder."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE stock_movements, purchase_requests IN SHARE MODE"))
+
+    daily = DailyProductMovement.__table__
+    clear = delete(daily)
+    source_filter = []
+    if since is not None:
+        clear = clear.where(daily.c.day >= since)
+        source_filter.append(StockMovement.created_at >= datetime.combine(since, datetime.min.time()))
+    db.execute(clear)
+    day = func.date(StockMovement.created_at)
+    movements = db.execute(
+        insert(daily).from_select(
+            ["product_id", "day", "inbound", "outbound", "movements"],
+            select(
+                StockMovement.product_id,
+                day,
+                func.sum(case((StockMovement.quantity > 0, StockMovement.quantity), else_=0)),
+                func.sum(case((StockMovement.quantity < 0, -StockMovement.quantity), else_=0)),
+                func.count(),
+            )
+            .where(*source_filter)
+            .group_by(StockMovement.product_id, day),
+        )
+    ).rowcount
+
+    counts = PurchaseRequestStatusCount.__table__
+    db.execute(delete(counts))
+    statuses = db.execute(
+        insert(counts).from_select(
+            ["status", "shard", "count"],
+            select(PurchaseRequest.status, literal(0), func.count()).group_by(PurchaseRequest.status),
+        )
+    ).rowcount
+    db.commit()
+    return {"daily_rows": movements, "status_rows": statuses}
+
+
+if __name__ == "__main__":
+    # Backfill manual: python -m app.rollups [--since AAAA-MM-DD]
+    parser = argparse.ArgumentParser(description="Reconstrói os rollups do painel")
+    parser.add_argument("--since", type=date.fromisoformat, help="reconstrói as movimentações a partir desta data")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        print(rebuild_rollups(db, since=args.since))
@@ -0,0 +1,209 @@
+import logging
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from app.database import Product, ReadSessionLocal
+
+# ----- Carrega variáveis do ambiente -----
+load_dotenv()
+
+# Cada worker só vê as próprias escritas: o índice é recarregado do banco
+# depois desse tempo para incorporar as alterações feitas pelos demais (0 desativa)
+PRODUCT_INDEX_MAX_AGE = float(os.getenv("PRODUCT_INDEX_MAX_AGE", "300"))
+AUTOCOMPLETE_LIMIT_MAX = int(os.getenv("AUTOCOMPLETE_LIMIT_MAX", "50"))
+
+logger = logging.getLogger(__name__)
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos ("Pão" e "pao" casam)."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).strip()
+
+def _terms(name: str) -> list[tuple[str, int]]:
+    """Chaves indexadas de um nome: o nome inteiro (rank 0) e cada palavra
+    seguinte (rank 1), para que "sextav" encontre "Parafuso sextavado"."""
+    normalized = normalize(name)
+    words = normalized.split()
+    terms = [(normalized, 0)]
+    terms.extend((" ".join(words[i:]), 1) for i in range(1, len(words)))
+    return terms
+
+def _build(rows) -> tuple[dict[int, str], list[tuple[str, int, int]]]:
+    """Nomes por id e a lista ordenada de termos para pares (id, nome)."""
+    names = {}
+    entries = []
+    for product_id, name in rows:
+        names[product_id] = name
+        entries.extend((term, rank, product_id) for term, rank in _terms(name))
+    entries.sort()
+    return names, entries
+
+def _add_to(names: dict, entries: list, product_id: int, name: str) -> None:
+    names[product_id] = name
+    for term, rank in _terms(name):
+        insort(entries, (term, rank, product_id))
+
+def _remove_from(names: dict, entries: list, product_id: int) -> None:
+    name = names.pop(product_id, None)
+    if name is None:
+        return
+    for term, rank in _terms(name):
+        entry = (term, rank, product_id)
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+# ------------------------------------------------------
+# ------------------ Índice de prefixos ----------------
+# ------------------------------------------------------
+
+class PrefixIndex:
+    """Autocomplete de nomes de produtos em memória: lista ordenada de
+    (termo, rank, id) consultada por busca binária. Atualizada pelo crud a
+    cada criação/alteração/remoção; carregada do banco no primeiro uso.
+
+    A recarga lê o catálogo e monta a lista nova fora de `_lock` e só troca as
+    referências no fim: buscas e atualizações não esperam a leitura do banco.
+    Vencido o max_age, a busca continua servindo o índice atual e a recarga
+    roda em uma thread de fundo."""
+
+    def __init__(self, max_age: float = PRODUCT_INDEX_MAX_AGE):
+        self.max_age = max_age
+        self._entries: list[tuple[str, int, int]] = []
+        self._names: dict[int, str] = {}
+        self._loaded_at: float | None = None
+        self._lock = threading.RLock()
+        # Uma recarga por vez; durante ela, add/remove são anotados em
+        # _pending e reaplicados ao índice novo antes da troca
+        self._load_lock = threading.Lock()
+        self._pending: list[tuple[int, str | None]] | None = None
+        # Incrementado por invalidate(): descarta uma leitura já em andamento
+        self._generation = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def expired(self) -> bool:
+        return self.loaded and self.max_age > 0 and time.monotonic() - self._loaded_at > self.max_age
+
+    def load(self, rows) -> None:
+        """Reconstrói o índice a partir de pares (id, nome)."""
+        names, entries = _build(rows)
+        with self._lock:
+            self._names = names
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+
+    def load_from_db(self) -> None:
+        """Recarrega do banco, esperando uma recarga em andamento terminar."""
+        self._reload(blocking=True)
+
+    def invalidate(self) -> None:
+        """Descarta o índice; a próxima busca recarrega do banco."""
+        with self._lock:
+            self._entries, self._names, self._loaded_at = [], {}, None
+            self._generation += 1
+
+    def _reload(self, blocking: bool, missing_only: bool = False) -> bool:
+        """Lê o catálogo e troca o índice. Sem `blocking`, retorna False se
+        outra thread já estiver recarregando; com `missing_only`, não relê
+        se o índice foi carregado enquanto esperava."""
+        if not self._load_lock.acquire(blocking=blocking):
+            return False
+        try:
+            if missing_only and self.loaded:
+                return True
+            with self._lock:
+                generation = self._generation
+                self._pending = []
+            try:
+                with ReadSessionLocal() as db:
+                    names, entries = _build(db.execute(select(Product.id, Product.name)))
+                with self._lock:
+                    # invalidate() durante a leitura: ela pode não conter o que
+                    # motivou a invalidação, e a próxima busca lê de novo
+                    if generation != self._generation:
+                        return False
+                    for product_id, name in self._pending:
+                        _remove_from(names, entries, product_id)
+                        if name is not None:
+                            _add_to(names, entries, product_id, name)
+                    self._names, self._entries = names, entries
+                    self._loaded_at = time.monotonic()
+                return True
+            finally:
+                with self._lock:
+                    self._pending = None
+        finally:
+            self._load_lock.release()
+
+    def _reload_in_background(self) -> None:
+        try:
+            self._reload(blocking=False)
+        except Exception:
+            logger.exception("Falha ao recarregar o índice de produtos")
+
+    def _ensure_loaded(self) -> None:
+        # Sem índice não há o que servir: a primeira busca espera a carga
+        while not self.loaded:
+            self._reload(blocking=True, missing_only=True)
+        if self.expired and not self._load_lock.locked():
+            threading.Thread(target=self._reload_in_background, name="product-index-reload", daemon=True).start()
+
+    # Atualizações incrementais: ignoradas enquanto o índice não foi carregado
+    # (a carga inicial já lê o estado atual do banco), mas anotadas durante
+    # uma recarga, cuja leitura pode ser anterior a elas
+
+    def add(self, product_id: int, name: str) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((product_id, name))
+            if self.loaded:
+                _remove_from(self._names, self._entries, product_id)
+                _add_to(self._names, self._entries, product_id, name)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((product_id, None))
+            if self.loaded:
+                _remove_from(self._names, self._entries, product_id)
+
+    def search(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Produtos cujo nome (ou uma palavra do nome) começa com `prefix`.
+        Ordem: prefixo do nome inteiro antes de prefixo de palavra; depois
+        nomes mais curtos (mais próximos do que foi digitado) e ordem alfabética."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_loaded()
+        matches = {}
+        with self._lock:
+            i = bisect_left(self._entries, (prefix,))
+            while i < len(self._entries) and self._entries[i][0].startswith(prefix):
+                term, rank, product_id = self._entries[i]
+                if rank < matches.get(product_id, 2):
+                    matches[product_id] = rank
+                i += 1
+            names = {product_id: self._names[product_id] for product_id in matches}
+        ranked = sorted(matches, key=lambda pid: (matches[pid], len(names[pid]), normalize(names[pid]), pid))
+        return [{"id": pid, "name": names[pid]} for pid in ranked[:limit]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "products": len(self._names),
+                "entries": len(self._entries),
+                "age_seconds": time.monotonic() - self._loaded_at if self.loaded else None,
+            }
+
+# Índice compartilhado do processo
+product_index = PrefixIndex()
@@ -0,0 +1,65 @@
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+from app.database import UserRole, get_db
+from app.dependencies import get_current_user, require_roles
+from app.cache import Principal
+from app.crud import apply_stock_movements, stock_movements_export_query, STOCK_MOVEMENT_EXPORT_FIELDS
+from app.export import export_response
+
+load_dotenv()
+
+# Tamanho máximo de um lote de movimentações por requisição
+STOCK_MOVEMENT_MAX_BATCH = int(os.getenv("STOCK_MOVEMENT_MAX_BATCH", "10000"))
+
+router = APIRouter()
+
+# Uma movimentação: quantidade positiva = entrada, negativa = saída
+class MovementIn(BaseModel):
+    product_id: int
+    quantity: int
+    note: str | None = Field(default=None, max_length=255)
+
+class MovementBatch(BaseModel):
+    movements: list[MovementIn]
+
+class RejectedProduct(BaseModel):
+    product_id: int
+    reason: str
+
+class MovementBatchResponse(BaseModel):
+    applied: int
+    products: list[int]
+    rejected: list[RejectedProduct]
+    purchase_requests_created: int
+
+# Registra um lote de movimentações (ex.: leituras dos coletores do armazém)
+@router.post("/stock/movements", response_model=MovementBatchResponse)
+def register_movements(
+    batch: MovementBatch,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if len(batch.movements) > STOCK_MOVEMENT_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote acima do limite de {STOCK_MOVEMENT_MAX_BATCH} movimentações",
+        )
+    movements = [m.model_dump() for m in batch.movements]
+    return apply_stock_movements(db, movements, user_id=current_user.id)
+
+# Exporta o histórico de movimentações em CSV ou NDJSON (streaming)
+@router.get("/stock/history/export")
+def export_stock_history(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    product_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    current_user: Principal = Depends(require_roles(UserRole.BUYER, UserRole.MANAGER)),
+):
+    query = stock_movements_export_query(product_id, created_from, created_to)
+    return export_response(query, STOCK_MOVEMENT_EXPORT_FIELDS, format, "stock_history", gzip=gzip)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict
+from app.database import UserRole, get_db, get_read_db
+from app.dependencies import require_roles
+from app.cache import Principal
+from app.crud import get_users_page
+from app.importer import import_users, read_csv
+from app.products import ImportResponse
+from app.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, cursor_id
+
+router = APIRouter()
+
+class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    role: UserRole
+
+class UserPage(BaseModel):
+    items: list[UserOut]
+    next_cursor: str | None
+
+# Lista os usuários com paginação por cursor (somente gerente)
+@router.get("/users", response_model=UserPage)
+def list_users(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_roles(UserRole.MANAGER)),
+):
+    try:
+        after_id = cursor_id(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+    items, next_cursor = get_users_page(db, limit, after_id=after_id)
+    return {"items": items, "next_cursor": next_cursor}
+
+# Importa usuários em lote a partir de um CSV (email,password,role)
+@router.post("/users/import", response_model=ImportResponse)
+def import_users_csv(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_roles(UserRole.MANAGER)),
+):
+    report = import_users(db, read_csv(file.file))
+    return {"inserted": report.inserted, "errors": report.errors}
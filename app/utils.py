@@ -1,10 +1,12 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from typing import Union
 from dotenv import load_dotenv
 import os
 
+from app.cache import decode_token
+from app.hashing import verify_password
+
 # Carregar as variáveis de ambiente
 load_dotenv()
 
@@ -14,16 +16,6 @@ ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))  # 15 minutos por padrão
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))  # Definindo 7 dias para o refresh token
 
-# Contexto para criptografia de senhas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# Função para verificar a senha fornecida
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    Verifica se a senha fornecida corresponde ao hash armazenado.
-    """
-    return pwd_context.verify(plain_password, hashed_password)
-
 # Função para criar o token de acesso (JWT)
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None) -> str:
     """
@@ -62,7 +54,7 @@ def verify_access_token(token: str) -> Union[dict, None]:
     Valida o token JWT. Retorna o payload decodificado se for válido ou None se for inválido ou expirado.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token, SECRET_KEY, algorithms=[ALGORITHM])  # Usa o cache de tokens verificados
         return payload  # Retorna o payload decodificado se for válido
     except JWTError:
         return None  # Se o token for inválido ou expirado
@@ -0,0 +1,124 @@
+"""Mede o motor de previsão de demanda/ponto de pedido (app/forecast.py).
+
+1. Cálculo: gera em memória o consumo diário de --products produtos por
+   --days dias (Poisson com taxa de cauda longa, perfil semanal e ciclo
+   anual) e mede compute_suggestions sobre o catálogo inteiro, --repeat vezes.
+   Para comparação, mede também a mesma função aplicada produto a produto em
+   uma amostra (--loop-sample) e extrapola para o catálogo.
+2. Ponta a ponta (opcional, --db-products > 0): popula um SQLite temporário
+   com o gerador sintético e mede run_forecast (leitura agregada, cálculo e
+   UPDATE em lote).
+
+Uso:
+    python benchmarks/bench_forecast.py                      # 100k produtos x 730 dias
+    python benchmarks/bench_forecast.py --db-products 10000 --db-movements 500000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure_environment() -> None:
+    tmpdir = tempfile.mkdtemp(prefix="bench-forecast-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'forecast.db')}"
+    os.environ.setdefault("SECRET_KEY", "bench-forecast")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+
+def synthetic_history(products: int, days: int, seed: int) -> np.ndarray:
+    """Consumo diário (produtos x dias, float32) com sazonalidade semanal e anual."""
+    rng = np.random.default_rng(seed)
+    base = rng.lognormal(mean=0.5, sigma=1.2, size=(products, 1)).astype(np.float32)
+    weekday = np.array([1.2, 1.1, 1.0, 1.0, 1.1, 0.4, 0.2], dtype=np.float32)
+    t = np.arange(days)
+    annual = (1 + 0.3 * np.sin(2 * np.pi * t / 365)).astype(np.float32)
+    rates = base * (weekday[t % 7] * annual)[None, :]
+    # ~20% dos produtos sem giro
+    rates[rng.random(products) < 0.2] = 0
+    return rng.poisson(rates).astype(np.float32)
+
+
+def timed(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_compute(args) -> None:
+    from app.forecast import compute_suggestions
+
+    start = time.perf_counter()
+    history = synthetic_history(args.products, args.days, args.seed)
+    print(f"histórico sintético: {args.products} produtos x {args.days} dias "
+          f"({history.nbytes / 2**20:.0f} MiB, gerado em {time.perf_counter() - start:.1f} s)")
+
+    timings = timed(lambda: compute_suggestions(history), args.repeat)
+    result = compute_suggestions(history)
+    print(f"vetorizado:       mediana {statistics.median(timings):8.3f} s   mínimo {min(timings):8.3f} s   "
+          f"({args.products / min(timings):,.0f} produtos/s)")
+    print(f"  ativos: {int(result['active'].sum())}   "
+          f"min_stock mediano: {int(np.median(result['min_stock'][result['active']]))}   "
+          f"max_stock mediano: {int(np.median(result['max_stock'][result['active']]))}")
+
+    sample = history[: args.loop_sample]
+    start = time.perf_counter()
+    for row in sample:
+        compute_suggestions(row[None, :])
+    per_product = (time.perf_counter() - start) / len(sample)
+    print(f"produto a produto: {per_product * 1000:8.3f} ms/produto   "
+          f"~{per_product * args.products:8.1f} s estimados para o catálogo")
+
+
+def bench_database(args) -> None:
+    from app.database import SessionLocal, get_engine
+    from app.forecast import run_forecast
+    from seed_dataset import seed
+
+    volumes = {"users": 100, "products": args.db_products, "purchase_requests": 0,
+               "stock_movements": args.db_movements, "refresh_tokens": 0}
+    start = time.perf_counter()
+    seed(get_engine(), volumes, args.seed)
+    print(f"\nbase SQLite: {args.db_products} produtos, {args.db_movements} movimentações "
+          f"(carga em {time.perf_counter() - start:.1f} s)")
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        report = run_forecast(db)
+        total = time.perf_counter() - start
+    stages = "   ".join(f"{stage}: {seconds:.3f} s" for stage, seconds in report["seconds"].items())
+    print(f"run_forecast:     total {total:8.3f} s   {stages}")
+    print(f"  produtos: {report['products']}   ativos: {report['active']}   atualizados: {report['updated']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--loop-sample", type=int, default=1000, help="produtos medidos um a um")
+    parser.add_argument("--db-products", type=int, default=0, help="produtos na medição ponta a ponta (0 desativa)")
+    parser.add_argument("--db-movements", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Antes de qualquer import de app.*: app.database lê DATABASE_URL no import
+    configure_environment()
+    bench_compute(args)
+    if args.db_products:
+        bench_database(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Micro-benchmarks dos caminhos quentes de autenticação e do crud.
+
+Roda tudo no mesmo processo, sobre um SQLite descartável, usando o TestClient
+do FastAPI para as rotas (/login, /protected) e chamando diretamente
+verify_token, authenticate_user e cada função de app/crud.py. O catálogo de
+produtos é aumentado a cada tamanho de --sizes (ex.: 1k, 10k, 100k, 1M) e
+todos os casos são medidos novamente em cada tamanho.
+
+Para cada caso são registrados p50, p99 (ms) e vazão (operações/s).
+--save grava os resultados como baseline em JSON; --compare lê um baseline
+e termina com código 1 se algum caso piorar além de --tolerance
+(p50/p99 maiores ou vazão menor).
+
+Uso:
+    python benchmarks/bench_hot_paths.py --sizes 1000,10000 --save benchmarks/baseline.json
+    python benchmarks/bench_hot_paths.py --sizes 1000,10000 --compare benchmarks/baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import count
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Métricas comparadas e o sentido em que "pior" acontece
+GATES = {"p50_ms": "higher", "p99_ms": "higher", "ops_per_second": "lower"}
+
+SEED_CHUNK_SIZE = 10000
+
+# Sufixos únicos para emails/nomes criados pelos casos de escrita, entre todos os tamanhos
+_unique = count()
+
+
+def configure_environment(args) -> None:
+    """Banco e configurações do benchmark; precisa rodar antes de importar o app."""
+    tmpdir = tempfile.mkdtemp(prefix="bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ["TOKEN_PURGE_INTERVAL_SECONDS"] = "0"
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_case(fn, setup=None, seconds: float = 1.0, min_iterations: int = 5, max_iterations: int = 1000) -> dict:
+    """Executa `fn` repetidamente até esgotar o tempo (respeitando o mínimo e o
+    máximo de iterações). `setup`, se informado, prepara o argumento de cada
+    iteração fora da medição."""
+    fn(setup() if setup else None)  # aquecimento
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while len(samples) < max_iterations and (len(samples) < min_iterations or time.perf_counter() < deadline):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - start)
+    return {
+        "iterations": len(samples),
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "ops_per_second": len(samples) / sum(samples),
+    }
+
+# ------------------------------------------------------
+# ------------------ Dados do benchmark ----------------
+# ------------------------------------------------------
+
+def seed_catalog(db, size: int) -> None:
+    """Completa o catálogo até `size` produtos (e uma SC para cada 10 produtos).
+    Os produtos ficam acima do mínimo para não disparar SCs automáticas."""
+    from sqlalchemy import func, insert, select
+    from app.database import Product, PurchaseRequest, PRStatus, User
+
+    existing = db.execute(select(func.count(Product.id))).scalar_one()
+    requester_id = db.execute(select(User.id).order_by(User.id)).scalars().first()
+    for start in range(existing, size, SEED_CHUNK_SIZE):
+        stop = min(size, start + SEED_CHUNK_SIZE)
+        db.execute(
+            insert(Product),
+            [
+                {"name": f"Produto {i}", "current_stock": 50, "min_stock": 10, "max_stock": 100}
+                for i in range(start, stop)
+            ],
+        )
+        first_id = db.execute(select(func.max(Product.id))).scalar_one() - (stop - start) + 1
+        db.execute(
+            insert(PurchaseRequest),
+            [
+                {"product_id": product_id, "quantity": 10, "requester_id": requester_id,
+                 "status": PRStatus.APPROVED, "created_at": datetime.utcnow()}
+                for product_id in range(first_id, first_id + (stop - start), 10)
+            ],
+        )
+        db.commit()
+
+
+def make_cases(client, db, user, access_token: str, refresh_token: str, size: int) -> dict:
+    """Casos medidos: nome -> (função, setup ou None)."""
+    from app import auth, crud
+    from app.database import PRStatus, UserRole
+    from app.search import product_index
+
+    password = "benchmark"
+    # /protected usa o token emitido pelo próprio /login
+    login = client.post("/login", json={"email": user.email, "password": password}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    middle_id = max(1, size // 2)
+    today = datetime.utcnow().date()
+    month_ago = today - timedelta(days=29)
+
+    def fresh_session(_=None):
+        db.expunge_all()
+
+    def new_user(_=None):
+        db.expunge_all()
+        return crud.create_user(db, f"bench{next(_unique)}@example.com", password, UserRole.OPERATOR).id
+
+    def new_product(_=None):
+        db.expunge_all()
+        return crud.create_product(db, f"Bench {next(_unique)}", 1, 10, 5).id
+
+    def new_purchase_request(_=None):
+        db.expunge_all()
+        return crud.create_purchase_request(db, middle_id, 1, user.id).id
+
+    def new_purchase_requests(_=None):
+        db.expunge_all()
+        return [crud.create_purchase_request(db, middle_id, 1, user.id).id for _ in range(10)]
+
+    def drain(iterator):
+        for _ in iterator:
+            pass
+
+    return {
+        # Rotas
+        "POST /login": (lambda _: client.post("/login", json={"email": user.email, "password": password}), None),
+        "GET /protected": (lambda _: client.get("/protected", headers=headers), None),
+        # Autenticação
+        "verify_token(access)": (lambda _: auth.verify_token(db, access_token, "access"), fresh_session),
+        "verify_token(refresh)": (lambda _: auth.verify_token(db, refresh_token, "refresh"), fresh_session),
+        "authenticate_user": (lambda _: auth.authenticate_user(db, user.email, password), fresh_session),
+        # Usuários
+        "crud.create_user": (lambda _: crud.create_user(db, f"c{next(_unique)}@example.com", password, UserRole.OPERATOR), fresh_session),
+        "crud.get_user_by_id": (lambda _: crud.get_user_by_id(db, user.id), fresh_session),
+        "crud.get_user_by_email": (lambda _: crud.get_user_by_email(db, user.email), fresh_session),
+        "crud.get_all_users": (lambda _: crud.get_all_users(db), fresh_session),
+        "crud.get_users_page": (lambda _: crud.get_users_page(db, 50), fresh_session),
+        "crud.update_user_password": (lambda user_id: crud.update_user_password(db, user_id, "outra"), new_user),
+        "crud.update_user": (lambda user_id: crud.update_user(db, user_id, role=UserRole.BUYER), new_user),
+        "crud.delete_user": (lambda user_id: crud.delete_user(db, user_id), new_user),
+        # Produtos
+        "crud.create_product": (lambda _: crud.create_product(db, f"p{next(_unique)}", 1, 10, 5), fresh_session),
+        "crud.get_product_by_id": (lambda _: crud.get_product_by_id(db, middle_id), fresh_session),
+        "crud.get_all_products": (lambda _: crud.get_all_products(db), fresh_session),
+        "crud.get_products_page": (lambda _: crud.get_products_page(db, 50, after_id=middle_id), fresh_session),
+        "crud.iter_products": (lambda _: drain(crud.iter_products(db)), fresh_session),
+        "crud.search_products": (lambda _: crud.search_products(db, f"produto {middle_id}", 20), fresh_session),
+        "search.autocomplete": (lambda _: product_index.search(f"produto {middle_id}", 10), None),
+        "crud.update_product": (lambda product_id: crud.update_product(db, product_id, max_stock=20), new_product),
+        "crud.delete_product": (lambda product_id: crud.delete_product(db, product_id), new_product),
+        # Solicitações de compra
+        "crud.create_purchase_request": (lambda _: crud.create_purchase_request(db, middle_id, 1, user.id), fresh_session),
+        "crud.get_purchase_request_by_id": (lambda request_id: crud.get_purchase_request_by_id(db, request_id), new_purchase_request),
+        "crud.get_purchase_requests_by_user": (lambda _: crud.get_purchase_requests_by_user(db, user.id), fresh_session),
+        "crud.get_all_purchase_requests": (lambda _: crud.get_all_purchase_requests(db), fresh_session),
+        "crud.get_purchase_requests_page": (lambda _: crud.get_purchase_requests_page(db, 50, status=PRStatus.PENDING), fresh_session),
+        "crud.iter_purchase_requests": (lambda _: drain(crud.iter_purchase_requests(db)), fresh_session),
+        "crud.generate_purchase_requests": (lambda _: crud.generate_purchase_requests(db, user.id), fresh_session),
+        "crud.update_purchase_request_status": (
+            lambda request_id: crud.update_purchase_request_status(db, request_id, PRStatus.REJECTED), new_purchase_request),
+        "crud.bulk_update_purchase_request_status": (
+            lambda ids: crud.bulk_update_purchase_request_status(db, ids, PRStatus.REJECTED, UserRole.MANAGER), new_purchase_requests),
+        "crud.delete_purchase_request": (lambda request_id: crud.delete_purchase_request(db, request_id), new_purchase_request),
+        # Movimentações
+        "crud.apply_stock_movements": (
+            lambda _: crud.apply_stock_movements(db, [{"product_id": middle_id, "quantity": 1}], user.id), fresh_session),
+        "crud.get_stock_movements_by_product": (lambda _: crud.get_stock_movements_by_product(db, middle_id), fresh_session),
+        # Painel (rollups)
+        "crud.get_daily_movements": (lambda _: crud.get_daily_movements(db, month_ago, today), fresh_session),
+        "crud.get_purchase_request_status_counts": (lambda _: crud.get_purchase_request_status_counts(db), fresh_session),
+    }
+
+# ------------------------------------------------------
+# ------------------ Comparação ------------------------
+# ------------------------------------------------------
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Lista de regressões (em texto) dos casos presentes nos dois resultados."""
+    regressions = []
+    for size, cases in results.items():
+        for name, current in cases.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            for metric, worse in GATES.items():
+                before, after = previous[metric], current[metric]
+                if worse == "higher" and after > before * (1 + tolerance):
+                    regressions.append(f"[{size}] {name}: {metric} {before:.3f} -> {after:.3f}")
+                elif worse == "lower" and after < before * (1 - tolerance):
+                    regressions.append(f"[{size}] {name}: {metric} {before:.1f} -> {after:.1f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000", help="tamanhos do catálogo, separados por vírgula (ex.: 1000,10000,100000,1000000)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="tempo de medição por caso")
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--max-iterations", type=int, default=1000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=10, help="custo do bcrypt (fixo, para resultados comparáveis)")
+    parser.add_argument("--filter", help="mede apenas os casos cujo nome contém este texto")
+    parser.add_argument("--save", help="grava os resultados como baseline (JSON)")
+    parser.add_argument("--compare", help="baseline (JSON) para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="piora relativa aceita (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    configure_environment(args)
+
+    from fastapi.testclient import TestClient
+    from app import auth, crud
+    from app.database import SessionLocal, UserRole
+    from app.main import app
+    from app.search import product_index
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = {}
+    with TestClient(app) as client, SessionLocal() as db:
+        user = crud.create_user(db, "bench@example.com", "benchmark", UserRole.MANAGER)
+        access_token = auth.create_access_token(user.id, user.role.value)
+        refresh_token = auth.create_refresh_token(db, user.id)
+
+        for size in sorted(sizes):
+            seed_start = time.perf_counter()
+            seed_catalog(db, size)
+            # A carga usa insert em lote (sem passar pelo crud): o índice de autocomplete recarrega
+            product_index.invalidate()
+            product_index.load_from_db()
+            print(f"\n== catálogo com {size} produtos (carga em {time.perf_counter() - seed_start:.1f} s) ==")
+
+            cases = make_cases(client, db, user, access_token, refresh_token, size)
+            results[str(size)] = {}
+            for name, (fn, setup) in cases.items():
+                if args.filter and args.filter not in name:
+                    continue
+                result = run_case(fn, setup, args.seconds, args.min_iterations, args.max_iterations)
+                results[str(size)][name] = result
+                print(
+                    f"{name:<42} p50 {result['p50_ms']:9.3f} ms   p99 {result['p99_ms']:9.3f} ms   "
+                    f"{result['ops_per_second']:10.1f} ops/s   ({result['iterations']} it.)"
+                )
+
+    if args.save:
+        document = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "bcrypt_rounds": args.bcrypt_rounds,
+                "created_at": datetime.utcnow().isoformat(),
+            },
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(document, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nSem regressões acima de {args.tolerance:.0%} em relação a {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
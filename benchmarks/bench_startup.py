@@ -0,0 +1,74 @@
+"""Mede o custo de import (cold start) dos módulos do app.
+
+Cada alvo é importado em um processo Python novo, várias vezes, e o script
+reporta mediana e mínimo do tempo de parede. Para comparar antes/depois,
+rode o script em cada versão do código e compare as saídas (ou use --json).
+
+Uso:
+    python benchmarks/bench_startup.py [--repeat 10] [--json saida.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    "import app",
+    "import app.database",
+    "import app.main",
+]
+
+
+def measure(statement: str, repeat: int, env: dict) -> dict:
+    """Executa `statement` em `repeat` processos novos e mede o tempo de cada um."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", statement],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        samples.append(time.perf_counter() - start)
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", help="arquivo para salvar os resultados")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT
+    # Banco descartável: o import não deveria nem tocar nele
+    tmpdir = tempfile.mkdtemp()
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmpdir, 'startup.db')}")
+    env.setdefault("SECRET_KEY", "benchmark")
+
+    # Custo do próprio interpretador, para referência
+    results = {"python -c pass": measure("pass", args.repeat, env)}
+    for target in TARGETS:
+        results[target] = measure(target, args.repeat, env)
+
+    for target, result in results.items():
+        print(f"{target:<25} mediana {result['median_ms']:8.1f} ms   mínimo {result['min_ms']:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Verifica os planos de execução das consultas de app/crud.py e app/auth.py.
+
+Popula a base com o gerador sintético (seed_dataset.py) em escalas crescentes
+e, em cada escala, executa cada função capturando os statements emitidos
+(hook before_cursor_execute). Cada statement é então passado por EXPLAIN
+(EXPLAIN QUERY PLAN no SQLite) e as tabelas lidas por varredura completa
+("SCAN <tabela>" no SQLite, "Seq Scan on <tabela>" no PostgreSQL) são
+anotadas. Mudanças de plano entre escalas também são reportadas.
+
+Funções que precisam percorrer a tabela inteira (listagens completas,
+exportações sem filtro, geração automática de SCs) declaram isso em
+EXPECTED_SCANS. Qualquer outra varredura completa na maior escala faz o
+script terminar com código 1.
+
+Uso:
+    python benchmarks/check_query_plans.py [--scales 0.001,0.01,0.1] [--json planos.json]
+    DATABASE_URL=postgresql://... python benchmarks/check_query_plans.py --use-database-url
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Statements que não leem tabelas (INSERT ... VALUES, controle de transação)
+_SKIP = re.compile(r"^\s*(INSERT\s+INTO\s+\w+\s*\([^)]*\)\s*VALUES|PRAGMA|SAVEPOINT|RELEASE|ROLLBACK|BEGIN|COMMIT)", re.I)
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+# Varreduras completas esperadas: caso -> tabelas
+EXPECTED_SCANS = {
+    "crud.get_all_users": {"users"},
+    "crud.get_all_products": {"products"},
+    "crud.iter_products": {"products"},
+    "crud.get_all_purchase_requests": {"purchase_requests"},
+    # Filtro só por período com ORDER BY id DESC LIMIT: o banco percorre a PK do fim
+    # para o início, e como created_at cresce com o id a página sai nas primeiras linhas
+    "crud.get_purchase_requests_page(period)": {"purchase_requests"},
+    "crud.iter_purchase_requests": {"purchase_requests"},
+    # Avalia todos os produtos abaixo do mínimo (comparação entre colunas, sem índice útil)
+    "crud.generate_purchase_requests": {"products"},
+    "crud.products_export_query": {"products"},
+    # LIKE '%termo%': no Postgres usa idx_products_name_trgm, criado só pela migração
+    # (o banco sintético vem de create_all); no SQLite sempre percorre a tabela
+    "crud.search_products": {"products"},
+    "crud.purchase_requests_export_query": {"purchase_requests"},
+    "crud.stock_movements_export_query": {"stock_movements"},
+    # Uma linha por status e shard: a tabela inteira é o resultado
+    "crud.get_purchase_request_status_counts": {"purchase_request_status_counts"},
+}
+
+
+def configure_environment(args) -> None:
+    if not args.use_database_url:
+        tmpdir = tempfile.mkdtemp(prefix="plans-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'plans.db')}"
+    os.environ.setdefault("SECRET_KEY", "query-plans")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+# ------------------------------------------------------
+# ------------------ Captura e EXPLAIN -----------------
+# ------------------------------------------------------
+
+class StatementCapture:
+    """Coleta os statements executados pelo engine enquanto ativo."""
+
+    def __init__(self):
+        self.active = False
+        self.statements: list = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not self.active or _SKIP.match(statement):
+            return
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        self.statements.append((statement, parameters))
+
+
+def full_scans(conn, statement: str, parameters) -> tuple[list[str], set]:
+    """Plano (linhas de texto) e tabelas lidas por varredura completa."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        plan = [row[-1] for row in rows]
+        pattern = _SQLITE_SCAN
+    else:
+        rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+        plan = [row[0] for row in rows]
+        pattern = _POSTGRES_SCAN
+    scanned = set()
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match:
+            scanned.add(match.group(1))
+    return plan, scanned
+
+# ------------------------------------------------------
+# ------------------ Casos -----------------------------
+# ------------------------------------------------------
+
+def sample_ids(db) -> dict:
+    """Ids reais do meio de cada tabela, para as consultas pontuais."""
+    from sqlalchemy import func, select
+    from app.database import AccessTokenBlacklist, Product, PurchaseRequest, RefreshToken, User
+
+    def middle(model):
+        return (db.execute(select(func.max(model.id))).scalar() or 0) // 2 or 1
+
+    user = db.get(User, middle(User))
+    token = db.execute(
+        select(RefreshToken)
+        .where(RefreshToken.revoked.is_(False), RefreshToken.expires_at > datetime.utcnow())
+        .order_by(RefreshToken.id)
+        .limit(1)
+    ).scalar_one()
+    revoked_jti = db.execute(select(AccessTokenBlacklist.jti).limit(1)).scalar_one()
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "product_id": middle(Product),
+        "request_id": middle(PurchaseRequest),
+        "token_user_id": token.user_id,
+        "jti": token.jti,
+        "revoked_jti": revoked_jti,
+    }
+
+
+def make_cases(ids: dict) -> dict:
+    """Casos verificados: nome -> função(db)."""
+    from jose import JWTError
+    from app import auth, crud
+    from app.database import PRStatus, UserRole
+    from app.revocation import revocation_filter
+
+    recent = datetime.utcnow() - timedelta(days=7)
+    refresh_token = auth._create_token(str(ids["token_user_id"]), timedelta(days=1), "refresh", jti=ids["jti"])
+
+    def verify_maybe_revoked(db):
+        # Força o caminho com a blacklist (filtro indica possível revogação)
+        revocation_filter.add(ids["jti"])
+        try:
+            auth.verify_token(db, refresh_token, "refresh")
+        except JWTError:
+            pass
+
+    def first(query):
+        return lambda db: db.execute(query).first()
+
+    return {
+        # Autenticação
+        "auth.authenticate_user": lambda db: auth.authenticate_user(db, ids["email"], "synthetic"),
+        "auth.create_refresh_token": lambda db: auth.create_refresh_token(db, ids["user_id"]),
+        "auth.is_token_revoked": lambda db: auth.is_token_revoked(db, ids["revoked_jti"]),
+        "auth.verify_token(refresh)": lambda db: auth.verify_token(db, refresh_token, "refresh"),
+        "auth.verify_token(refresh, blacklist)": verify_maybe_revoked,
+        # Usuários
+        "crud.get_user_by_id": lambda db: crud.get_user_by_id(db, ids["user_id"]),
+        "crud.get_user_by_email": lambda db: crud.get_user_by_email(db, ids["email"]),
+        "crud.get_all_users": lambda db: crud.get_all_users(db),
+        "crud.get_users_page": lambda db: crud.get_users_page(db, 50, after_id=ids["user_id"]),
+        "crud.update_user": lambda db: crud.update_user(db, ids["user_id"], role=UserRole.BUYER),
+        # Produtos
+        "crud.get_product_by_id": lambda db: crud.get_product_by_id(db, ids["product_id"]),
+        "crud.get_all_products": lambda db: crud.get_all_products(db),
+        "crud.get_products_page": lambda db: crud.get_products_page(db, 50, after_id=ids["product_id"]),
+        "crud.iter_products": lambda db: next(crud.iter_products(db), None),
+        "crud.search_products": lambda db: crud.search_products(db, "prod", 20),
+        "crud.update_product": lambda db: crud.update_product(db, ids["product_id"], name="Renomeado"),
+        # Solicitações de compra
+        "crud.get_purchase_request_by_id": lambda db: crud.get_purchase_request_by_id(db, ids["request_id"]),
+        "crud.get_purchase_requests_by_user": lambda db: crud.get_purchase_requests_by_user(db, ids["user_id"]),
+        "crud.get_all_purchase_requests": lambda db: crud.get_all_purchase_requests(db),
+        "crud.get_purchase_requests_page(status)": lambda db: crud.get_purchase_requests_page(db, 50, status=PRStatus.PENDING),
+        "crud.get_purchase_requests_page(period)": lambda db: crud.get_purchase_requests_page(db, 50, created_from=recent),
+        "crud.get_purchase_requests_page(requester)": lambda db: crud.get_purchase_requests_page(db, 50, requester_id=ids["user_id"]),
+        "crud.get_purchase_requests_page(details)": lambda db: crud.get_purchase_requests_page(
+            db, 50, status=PRStatus.PENDING, with_details=True),
+        "crud.get_purchase_request_summaries_page(status)": lambda db: crud.get_purchase_request_summaries_page(
+            db, 50, status=PRStatus.PENDING),
+        "crud.iter_purchase_requests": lambda db: next(crud.iter_purchase_requests(db), None),
+        "crud.generate_purchase_requests": lambda db: crud.generate_purchase_requests(db, ids["user_id"]),
+        "crud.generate_purchase_requests(products)": lambda db: crud.generate_purchase_requests(db, ids["user_id"], [ids["product_id"]]),
+        "crud.bulk_update_purchase_request_status": lambda db: crud.bulk_update_purchase_request_status(
+            db, [ids["request_id"]], PRStatus.REJECTED, UserRole.BUYER),
+        # Movimentações
+        "crud.apply_stock_movements": lambda db: crud.apply_stock_movements(
+            db, [{"product_id": ids["product_id"], "quantity": 1}], ids["user_id"]),
+        "crud.get_stock_movements_by_product": lambda db: crud.get_stock_movements_by_product(db, ids["product_id"]),
+        # Painel (rollups)
+        "crud.get_daily_movements": lambda db: crud.get_daily_movements(db, recent.date(), datetime.utcnow().date()),
+        "crud.get_daily_movements(product)": lambda db: crud.get_daily_movements(
+            db, recent.date(), datetime.utcnow().date(), product_id=ids["product_id"]),
+        "crud.get_purchase_request_status_counts": lambda db: crud.get_purchase_request_status_counts(db),
+        # Exportações
+        "crud.products_export_query": first(crud.products_export_query()),
+        "crud.purchase_requests_export_query": first(crud.purchase_requests_export_query()),
+        "crud.purchase_requests_export_query(status)": first(crud.purchase_requests_export_query(status=PRStatus.PENDING)),
+        "crud.stock_movements_export_query(product)": first(crud.stock_movements_export_query(product_id=ids["product_id"])),
+        "crud.stock_movements_export_query": first(crud.stock_movements_export_query()),
+    }
+
+
+def check_scale(engine, capture: StatementCapture) -> dict:
+    """Executa todos os casos e devolve {caso: {"statements": [...], "scans": [...]}}."""
+    from app.database import SessionLocal
+
+    results = {}
+    with SessionLocal() as db:
+        cases = make_cases(sample_ids(db))
+    for name, fn in cases.items():
+        capture.statements = []
+        capture.active = True
+        with SessionLocal() as db:
+            try:
+                fn(db)
+            finally:
+                capture.active = False
+                db.rollback()
+        statements, scans = [], set()
+        with engine.connect() as conn:
+            for statement, parameters in capture.statements:
+                plan, scanned = full_scans(conn, statement, parameters)
+                statements.append({"sql": " ".join(statement.split()), "plan": plan, "full_scans": sorted(scanned)})
+                scans |= scanned
+        results[name] = {"statements": statements, "scans": sorted(scans)}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="0.001,0.01,0.1", help="escalas do seed_dataset, em ordem crescente")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--use-database-url", action="store_true",
+                        help="usa a DATABASE_URL do ambiente (base descartável!) em vez de um SQLite temporário")
+    parser.add_argument("--json", help="arquivo para salvar os planos capturados")
+    parser.add_argument("--verbose", action="store_true", help="mostra o plano de cada statement")
+    args = parser.parse_args()
+
+    configure_environment(args)
+
+    from sqlalchemy import event
+    from app.database import get_engine
+    from seed_dataset import BASE_VOLUMES, scaled_volumes, seed
+
+    engine = get_engine()
+    capture = StatementCapture()
+    event.listen(engine, "before_cursor_execute", capture)
+
+    scales = sorted(float(s) for s in args.scales.split(","))
+    seeded = {name: 0 for name in BASE_VOLUMES}
+    by_scale = {}
+    for scale in scales:
+        target = scaled_volumes(scale)
+        print(f"\n== escala {scale} ==")
+        seed(engine, {name: max(0, target[name] - seeded[name]) for name in BASE_VOLUMES}, args.seed + len(by_scale))
+        seeded = target
+        by_scale[str(scale)] = results = check_scale(engine, capture)
+
+        for name, result in results.items():
+            unexpected = set(result["scans"]) - EXPECTED_SCANS.get(name, set())
+            status = "ok" if not result["scans"] else f"varredura: {', '.join(result['scans'])}"
+            if unexpected:
+                status += "   <-- INESPERADA"
+            print(f"  {name:<48} {status}")
+            if args.verbose:
+                for statement in result["statements"]:
+                    print(f"      {statement['sql'][:120]}")
+                    for line in statement["plan"]:
+                        print(f"        {line}")
+
+    # Mudanças de plano entre escalas
+    labels = list(by_scale)
+    for previous, current in zip(labels, labels[1:]):
+        for name, result in by_scale[current].items():
+            before = by_scale[previous].get(name)
+            if before and before["scans"] != result["scans"]:
+                print(f"plano mudou em {name}: {before['scans']} ({previous}) -> {result['scans']} ({current})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(by_scale, f, indent=2)
+
+    largest = by_scale[labels[-1]]
+    failures = {
+        name: sorted(set(result["scans"]) - EXPECTED_SCANS.get(name, set()))
+        for name, result in largest.items()
+        if set(result["scans"]) - EXPECTED_SCANS.get(name, set())
+    }
+    if failures:
+        print(f"\n{len(failures)} consulta(s) com varredura completa inesperada na escala {labels[-1]}:")
+        for name, tables in failures.items():
+            print(f"  {name}: {', '.join(tables)}")
+        sys.exit(1)
+    print(f"\nNenhuma varredura completa inesperada na escala {labels[-1]}")
+
+
+if __name__ == "__main__":
+    main()
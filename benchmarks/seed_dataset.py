@@ -0,0 +1,317 @@
+"""Gera uma base sintética em volume de produção (milhões de linhas).
+
+Popula usuários, produtos, solicitações de compra (SCs), movimentações,
+refresh tokens e a blacklist com distribuições próximas das reais:
+- perfis: maioria de operadores, poucos compradores e gerentes;
+- produtos: estoques mínimos com cauda longa, ~10% abaixo do mínimo;
+- SCs e movimentações concentradas em poucos produtos (cauda longa), com datas crescentes ao longo de dois anos e ~5% pendentes;
+- tokens concentrados nos usuários ativos, parte expirada e parte revogada
+  (os revogados também entram na blacklist).
+
+As linhas são geradas em blocos e gravadas com COPY no PostgreSQL (psycopg2)
+ou com INSERT em lote (executemany) nos demais bancos. Os ids são atribuídos
+aqui, a partir do maior id existente, para que as chaves estrangeiras não
+precisem ser relidas do banco. Todos os usuários compartilham um único hash
+bcrypt (gerar milhões de hashes levaria horas e não muda os planos de consulta).
+
+Uso:
+    DATABASE_URL=... python benchmarks/seed_dataset.py --scale 1 [--seed 42]
+    # --scale 1 = 100k usuários, 1M produtos, 2M SCs, 2M movimentações, 2M tokens
+"""
+import argparse
+import csv
+import enum
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Volumes para --scale 1
+BASE_VOLUMES = {
+    "users": 100_000,
+    "products": 1_000_000,
+    "purchase_requests": 2_000_000,
+    "stock_movements": 2_000_000,
+    "refresh_tokens": 2_000_000,
+}
+
+CHUNK_SIZE = 50_000
+HISTORY_DAYS = 730
+
+
+def scaled_volumes(scale: float) -> dict:
+    return {name: max(1, int(count * scale)) for name, count in BASE_VOLUMES.items()}
+
+
+def skewed_index(rng: random.Random, n: int, skew: float = 3.0) -> int:
+    """Índice em [0, n) com cauda longa: com skew=3, o 1% inicial recebe ~20%
+    das escolhas e metade delas cai nos 12,5% iniciais."""
+    return min(n - 1, int(n * rng.random() ** skew))
+
+# ------------------------------------------------------
+# ------------------ Escrita em lote -------------------
+# ------------------------------------------------------
+
+def _csv_value(value):
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.name  # Enum: o SQLAlchemy grava o nome do membro
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+
+def write_rows(conn, table, rows: list[dict]) -> None:
+    """Grava um bloco de linhas: COPY no PostgreSQL (psycopg2), INSERT em lote nos demais."""
+    from sqlalchemy import insert
+
+    if not rows:
+        return
+    if conn.dialect.driver == "psycopg2":
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if (v := _csv_value(row[c])) is None else v for c in columns])
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        conn.execute(insert(table), rows)
+
+
+def _next_id(conn, table) -> int:
+    from sqlalchemy import func, select
+
+    return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _fix_sequences(conn, tables) -> None:
+    """No PostgreSQL, ajusta as sequences após a inserção com ids explícitos."""
+    from sqlalchemy import text
+
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+        ))
+
+
+def _write_in_chunks(conn, table, generator, total: int, label: str) -> None:
+    start = time.perf_counter()
+    chunk = []
+    for row in generator:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            write_rows(conn, table, chunk)
+            chunk = []
+    write_rows(conn, table, chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {total:>10} linhas em {elapsed:6.1f} s ({total / max(elapsed, 1e-9):,.0f} linhas/s)")
+
+# ------------------------------------------------------
+# ------------------ Geradores -------------------------
+# ------------------------------------------------------
+
+def _users(rng, first_id: int, count: int, hashed_password: str):
+    from app.database import UserRole
+
+    roles = [UserRole.OPERATOR] * 80 + [UserRole.BUYER] * 15 + [UserRole.MANAGER] * 5
+    for i in range(count):
+        yield {
+            "id": first_id + i,
+            "email": f"user{first_id + i}@example.com",
+            "hashed_password": hashed_password,
+            "role": rng.choice(roles),
+        }
+
+
+def _products(rng, first_id: int, count: int):
+    for i in range(count):
+        min_stock = min(10_000, int(rng.paretovariate(1.5) * 5))
+        max_stock = min_stock + rng.randint(min_stock + 1, min_stock * 10 + 10)
+        if rng.random() < 0.10:
+            current_stock = rng.randint(0, min_stock)
+        else:
+            current_stock = rng.randint(min_stock + 1, max_stock)
+        yield {
+            "id": first_id + i,
+            "name": f"Produto {first_id + i:08d}",
+            "current_stock": current_stock,
+            "min_stock": min_stock,
+            "max_stock": max_stock,
+        }
+
+
+def _purchase_requests(rng, first_id: int, count: int, products: range, requesters: range, now: datetime):
+    from app.database import PRStatus
+
+    start = now - timedelta(days=HISTORY_DAYS)
+    step = timedelta(days=HISTORY_DAYS) / max(count, 1)
+    pending = set()  # no máximo uma SC pendente por produto (uq_purchase_pending_product)
+    for i in range(count):
+        roll = rng.random()
+        status = PRStatus.APPROVED if roll < 0.75 else PRStatus.REJECTED if roll < 0.95 else PRStatus.PENDING
+        product_id = products[skewed_index(rng, len(products))]
+        if status == PRStatus.PENDING:
+            if product_id in pending:
+                status = PRStatus.REJECTED
+            else:
+                pending.add(product_id)
+        yield {
+            "id": first_id + i,
+            "product_id": product_id,
+            "quantity": rng.randint(1, 500),
+            "requester_id": requesters[skewed_index(rng, len(requesters))],
+            "status": status,
+            "created_at": start + step * i,
+        }
+
+
+def _stock_movements(rng, first_id: int, count: int, products: range, users: range, now: datetime):
+    start = now - timedelta(days=HISTORY_DAYS)
+    step = timedelta(days=HISTORY_DAYS) / max(count, 1)
+    for i in range(count):
+        quantity = rng.randint(1, 50)
+        yield {
+            "id": first_id + i,
+            "product_id": products[skewed_index(rng, len(products))],
+            "user_id": users[rng.randrange(len(users))],
+            "quantity": quantity if rng.random() < 0.4 else -quantity,
+            "note": None,
+            "created_at": start + step * i,
+        }
+
+
+def _refresh_tokens(rng, first_id: int, count: int, users: range, now: datetime, revoked: list):
+    from app.auth import REFRESH_TOKEN_EXPIRE_DAYS
+
+    lifetime = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    window = timedelta(days=30)
+    for i in range(count):
+        created_at = now - window + window * (i / max(count, 1))
+        jti = str(UUID(int=rng.getrandbits(128), version=4))
+        is_revoked = rng.random() < 0.05
+        if is_revoked:
+            revoked.append((jti, created_at))
+        yield {
+            "id": first_id + i,
+            "jti": jti,
+            "user_id": users[skewed_index(rng, len(users))],
+            "created_at": created_at,
+            "expires_at": created_at + lifetime,
+            "revoked": is_revoked,
+        }
+
+
+def _blacklist(first_id: int, revoked: list):
+    for i, (jti, created_at) in enumerate(revoked):
+        yield {
+            "id": first_id + i,
+            "token": f"revoked:{jti}",
+            "jti": jti,
+            "revoked_at": created_at + timedelta(hours=1),
+        }
+
+# ------------------------------------------------------
+# ------------------ Carga -----------------------------
+# ------------------------------------------------------
+
+def seed(engine, volumes: dict, seed_value: int = 42) -> None:
+    """Acrescenta à base as quantidades de `volumes` (ver BASE_VOLUMES)."""
+    from app.database import (
+        AccessTokenBlacklist, Base, Product, PurchaseRequest, RefreshToken, StockMovement, User,
+    )
+    from app.hashing import pwd_context
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    hashed_password = pwd_context.hash("synthetic")
+    tables = [t.__table__ for t in (User, Product, PurchaseRequest, StockMovement, RefreshToken, AccessTokenBlacklist)]
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+
+        users_table, products_table, requests_table, movements_table, tokens_table, blacklist_table = tables
+        first_user = _next_id(conn, users_table)
+        _write_in_chunks(conn, users_table, _users(rng, first_user, volumes["users"], hashed_password),
+                         volumes["users"], "users")
+        users = range(first_user, first_user + volumes["users"])
+
+        first_product = _next_id(conn, products_table)
+        _write_in_chunks(conn, products_table, _products(rng, first_product, volumes["products"]),
+                         volumes["products"], "products")
+        products = range(first_product, first_product + volumes["products"])
+
+        _write_in_chunks(
+            conn, requests_table,
+            _purchase_requests(rng, _next_id(conn, requests_table), volumes["purchase_requests"], products, users, now),
+            volumes["purchase_requests"], "purchase_requests",
+        )
+        _write_in_chunks(
+            conn, movements_table,
+            _stock_movements(rng, _next_id(conn, movements_table), volumes["stock_movements"], products, users, now),
+            volumes["stock_movements"], "stock_movements",
+        )
+
+        revoked = []
+        _write_in_chunks(
+            conn, tokens_table,
+            _refresh_tokens(rng, _next_id(conn, tokens_table), volumes["refresh_tokens"], users, now, revoked),
+            volumes["refresh_tokens"], "refresh_tokens",
+        )
+        _write_in_chunks(conn, blacklist_table, _blacklist(_next_id(conn, blacklist_table), revoked),
+                         len(revoked), "token_blacklist")
+
+        _fix_sequences(conn, tables)
+
+    # As linhas foram gravadas sem passar pelo crud: refaz os rollups do painel
+    from sqlalchemy.orm import Session
+    from app.rollups import rebuild_rollups
+    with Session(engine) as db:
+        rebuild_rollups(db)
+
+    # Estatísticas atualizadas para o planejador de consultas
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplicador dos volumes base")
+    parser.add_argument("--seed", type=int, default=42, help="semente do gerador (resultados reprodutíveis)")
+    for name in BASE_VOLUMES:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, help=f"sobrescreve o volume de {name}")
+    args = parser.parse_args()
+
+    from app.database import get_engine
+
+    volumes = scaled_volumes(args.scale)
+    for name in BASE_VOLUMES:
+        override = getattr(args, name)
+        if override is not None:
+            volumes[name] = override
+
+    start = time.perf_counter()
+    seed(get_engine(), volumes, args.seed)
+    print(f"total: {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
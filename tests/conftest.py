@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+import pytest
+
+# ----- Ambiente de teste (antes de qualquer import de app.*) -----
+# app.database e os demais módulos leem as variáveis no import: os testes
+# usam um SQLite temporário (aiosqlite no engine assíncrono), nunca o banco do .env
+_TMPDIR = tempfile.mkdtemp(prefix="estoque-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMPDIR, 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+# Custo mínimo útil do bcrypt (a calibração levaria segundos)
+os.environ["BCRYPT_ROUNDS"] = "5"
+os.environ["RATE_LIMIT_BACKEND"] = "memory"
+
+from app import ratelimit  # noqa: E402
+from app.cache import principal_cache, token_cache  # noqa: E402
+from app.catalog import response_cache  # noqa: E402
+from app.database import AsyncSessionLocal, Base, SessionLocal, get_async_engine, get_engine  # noqa: E402
+from app.search import product_index  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    engine = get_engine()
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Esvazia as tabelas e os caches do processo ao fim de cada teste."""
+    yield
+    with get_engine().begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    principal_cache.clear()
+    token_cache.clear()
+    response_cache.clear()
+    product_index.invalidate()
+    ratelimit.set_backend(None)
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def async_db(anyio_backend):
+    async with AsyncSessionLocal() as session:
+        yield session
+    # As conexões do aiosqlite pertencem ao event loop do teste
+    await get_async_engine().dispose()
+
+
+@pytest.fixture
+async def client(anyio_backend):
+    import httpx
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as http:
+        yield http
+    await get_async_engine().dispose()
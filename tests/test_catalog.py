@@ -0,0 +1,75 @@
+"""ETag das listagens do catálogo: a versão fica no banco, então uma escrita
+de qualquer worker invalida os ETags já entregues."""
+import pytest
+from sqlalchemy import insert
+
+from app import crud
+from app.catalog import bump_catalog_version, catalog_version
+from app.database import CatalogVersion, Product, User, UserRole
+from app.utils import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def user(db):
+    db.execute(insert(User), [{"id": 1, "email": "op@example.com", "hashed_password": "x", "role": UserRole.BUYER}])
+    db.execute(insert(Product), [{"id": 1, "name": "Parafuso", "min_stock": 1, "max_stock": 10}])
+    db.commit()
+
+
+def auth_header(**headers) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': 'op@example.com', 'id': 1})}", **headers}
+
+
+async def names(client, etag: str | None = None):
+    headers = auth_header(**({"If-None-Match": etag} if etag else {}))
+    response = await client.get("/products", headers=headers)
+    body = response.json()["items"] if response.status_code == 200 else None
+    return response, body and [item["name"] for item in body]
+
+
+async def test_unchanged_catalog_answers_304(client, user):
+    first, items = await names(client)
+    assert first.status_code == 200 and items == ["Parafuso"]
+
+    again, _ = await names(client, first.headers["ETag"])
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+
+async def test_crud_write_changes_the_etag(client, db, user):
+    first, _ = await names(client)
+    crud.create_product(db, "Porca", 1, 10)
+
+    response, items = await names(client, first.headers["ETag"])
+    assert response.status_code == 200
+    assert items == ["Parafuso", "Porca"]
+    assert response.headers["ETag"] != first.headers["ETag"]
+
+
+async def test_write_from_another_worker_changes_the_etag(client, db, user):
+    first, _ = await names(client)
+    # Outro processo: grava produto e versão sem passar pelo estado deste
+    db.execute(insert(Product), [{"id": 2, "name": "Arruela", "min_stock": 1, "max_stock": 10}])
+    db.execute(insert(CatalogVersion), [{"shard": 99, "version": 1}])
+    db.commit()
+
+    response, items = await names(client, first.headers["ETag"])
+    assert response.status_code == 200
+    assert items == ["Parafuso", "Arruela"]
+
+
+def test_user_updates_bump_the_version(db, user):
+    before = catalog_version(db)
+    crud.update_user_password(db, 1, "nova-senha")
+    after_password = catalog_version(db)
+    crud.update_user(db, 1, email="outro@example.com")
+    assert before < after_password < catalog_version(db)
+
+
+def test_rolled_back_write_keeps_the_version(db, user):
+    before = catalog_version(db)
+    bump_catalog_version(db)
+    db.rollback()
+    assert catalog_version(db) == before
@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import select
+
+from app import crud, crud_async
+from app.database import Product, PRStatus, PurchaseRequest, UserRole
+from app.hashing import verify_password
+from app.instrumentation import track_queries
+from app.search import product_index
+
+pytestmark = pytest.mark.anyio
+
+
+# ---------------------- CRUD assíncrono (aiosqlite) ----------------------
+
+async def test_create_and_get_user(async_db):
+    user = await crud_async.create_user(async_db, "ana@example.com", "segredo", UserRole.BUYER)
+
+    assert user.id is not None
+    assert user.hashed_password != "segredo"
+    assert verify_password("segredo", user.hashed_password)
+    assert (await crud_async.get_user_by_email(async_db, "ana@example.com")).id == user.id
+    assert (await crud_async.get_user_by_id(async_db, user.id)).email == "ana@example.com"
+    assert await crud_async.get_user_by_email(async_db, "outra@example.com") is None
+
+
+async def test_update_user_password_invalidates_principal(async_db):
+    from app.cache import Principal, principal_cache
+
+    user = await crud_async.create_user(async_db, "bia@example.com", "antiga", UserRole.OPERATOR)
+    principal_cache.set(user.id, Principal(id=user.id, email=user.email, role=user.role.value))
+
+    updated = await crud_async.update_user_password(async_db, user.id, "nova")
+
+    assert verify_password("nova", updated.hashed_password)
+    assert principal_cache.get(user.id) is None
+    assert await crud_async.update_user_password(async_db, user.id + 1000, "x") is None
+
+
+async def test_product_crud_updates_search_index(async_db):
+    product_index.load([])
+    product = await crud_async.create_product(async_db, "Parafuso sextavado", 10, 100)
+    assert [hit["id"] for hit in product_index.search("sextav")] == [product.id]
+
+    updated = await crud_async.update_product(async_db, product.id, name="Porca sextavada", current_stock=7)
+    assert updated.current_stock == 7
+    assert [hit["name"] for hit in product_index.search("porca")] == ["Porca sextavada"]
+    assert product_index.search("parafuso") == []
+
+    assert await crud_async.delete_product(async_db, product.id)
+    assert await crud_async.get_product_by_id(async_db, product.id) is None
+    assert product_index.search("porca") == []
+    assert not await crud_async.delete_product(async_db, product.id)
+
+
+async def test_purchase_request_status_keeps_rollups(async_db, db):
+    user = await crud_async.create_user(async_db, "caio@example.com", "segredo", UserRole.BUYER)
+    washer = await crud_async.create_product(async_db, "Arruela", 5, 50)
+    nut = await crud_async.create_product(async_db, "Porca", 5, 50)
+    first = await crud_async.create_purchase_request(async_db, washer.id, 3, user.id)
+    second = await crud_async.create_purchase_request(async_db, nut.id, 4, user.id)
+
+    approved = await crud_async.update_purchase_request_status(async_db, first.id, PRStatus.APPROVED)
+    assert approved.status == PRStatus.APPROVED
+    # Repetir o mesmo status não conta duas vezes
+    await crud_async.update_purchase_request_status(async_db, first.id, PRStatus.APPROVED)
+    assert await crud_async.delete_purchase_request(async_db, second.id)
+
+    assert [pr.id for pr in await crud_async.get_purchase_requests_by_user(async_db, user.id)] == [first.id]
+    counts = crud.get_purchase_request_status_counts(db)
+    assert counts == {PRStatus.PENDING: 0, PRStatus.APPROVED: 1, PRStatus.REJECTED: 0}
+
+
+async def test_delete_user_cascades_purchase_requests(async_db, db):
+    user = await crud_async.create_user(async_db, "duda@example.com", "segredo", UserRole.BUYER)
+    product = await crud_async.create_product(async_db, "Bucha", 5, 50)
+    await crud_async.create_purchase_request(async_db, product.id, 2, user.id)
+
+    assert await crud_async.delete_user(async_db, user.id)
+
+    assert db.scalars(select(PurchaseRequest)).all() == []
+    assert db.get(Product, product.id) is not None
+    assert crud.get_purchase_request_status_counts(db)[PRStatus.PENDING] == 0
+
+
+async def test_duplicate_pending_request_returns_none(async_db, db):
+    user = await crud_async.create_user(async_db, "gabi@example.com", "segredo", UserRole.BUYER)
+    product = await crud_async.create_product(async_db, "Rebite", 5, 50)
+    first = await crud_async.create_purchase_request(async_db, product.id, 3, user.id)
+
+    assert await crud_async.create_purchase_request(async_db, product.id, 4, user.id) is None
+    await crud_async.update_purchase_request_status(async_db, first.id, PRStatus.REJECTED)
+    second = await crud_async.create_purchase_request(async_db, product.id, 4, user.id)
+    assert await crud_async.update_purchase_request_status(async_db, first.id, PRStatus.PENDING) is None
+
+    assert [pr.id for pr in await crud_async.get_purchase_requests_by_user(async_db, user.id)] == [first.id, second.id]
+    counts = crud.get_purchase_request_status_counts(db)
+    assert (counts[PRStatus.PENDING], counts[PRStatus.REJECTED]) == (1, 1)
+
+
+async def test_requests_by_user_with_product(async_db):
+    user = await crud_async.create_user(async_db, "heitor@example.com", "segredo", UserRole.BUYER)
+    for name in ("Arruela", "Porca", "Rebite"):
+        product = await crud_async.create_product(async_db, name, 5, 50)
+        await crud_async.create_purchase_request(async_db, product.id, 2, user.id)
+    async_db.expunge_all()
+
+    with track_queries() as stats:
+        requests = await crud_async.get_purchase_requests_by_user(async_db, user.id, with_product=True)
+        names = [pr.product.name for pr in requests]
+
+    assert names == ["Arruela", "Porca", "Rebite"]
+    assert stats.queries == 2
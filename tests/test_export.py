@@ -0,0 +1,97 @@
+"""Exportações em streaming (CSV/NDJSON, opcionalmente gzip): linhas lidas
+em lotes de um select de colunas, sem objetos ORM, e enviadas em blocos."""
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from sqlalchemy import insert
+
+from app import export
+from app.crud import PRODUCT_EXPORT_FIELDS, products_export_query
+from app.database import Product, User, UserRole
+from app.instrumentation import DB_QUERIES
+from app.utils import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+PRODUCTS = [
+    {"id": i, "name": f"Produto {i}", "current_stock": i % 7, "min_stock": 1, "max_stock": 10}
+    for i in range(1, 51)
+]
+
+
+@pytest.fixture
+def catalog(db):
+    db.execute(insert(User), [{"id": 1, "email": "op@example.com", "hashed_password": "x", "role": UserRole.OPERATOR}])
+    db.execute(insert(Product), PRODUCTS)
+    db.commit()
+
+
+def auth_header() -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': 'op@example.com', 'id': 1})}"}
+
+
+def expected_rows() -> list[list[str]]:
+    return [[str(p[f]) for f in PRODUCT_EXPORT_FIELDS] for p in PRODUCTS]
+
+
+async def test_csv_export(client, catalog):
+    response = await client.get("/products/export", headers=auth_header())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="products.csv"'
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows == [PRODUCT_EXPORT_FIELDS] + expected_rows()
+
+
+async def test_ndjson_export(client, catalog):
+    response = await client.get("/products/export", params={"format": "ndjson"}, headers=auth_header())
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == PRODUCTS
+
+
+async def test_gzip_export(client, catalog):
+    plain = await client.get("/products/export", headers=auth_header())
+    compressed = await client.get("/products/export", params={"gzip": True}, headers=auth_header())
+
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert compressed.headers["content-disposition"] == 'attachment; filename="products.csv.gz"'
+    assert gzip.decompress(compressed.content) == plain.content
+
+
+async def test_streamed_queries_count_for_the_route(client, catalog):
+    await client.get("/products/export", headers=auth_header())  # Principal em cache
+    before = DB_QUERIES.value(route="/products/export")
+
+    await client.get("/products/export", headers=auth_header())
+
+    # O select da exportação roda enquanto o corpo é enviado
+    assert DB_QUERIES.value(route="/products/export") == before + 1
+
+
+def test_rows_are_streamed_without_orm_objects(db, catalog, monkeypatch):
+    sessions = []
+    session_factory = export.ReadSessionLocal
+
+    def read_session():
+        session = session_factory()
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(export, "ReadSessionLocal", read_session)
+    monkeypatch.setattr(export, "STREAM_BATCH_SIZE", 10)
+    monkeypatch.setattr(export, "EXPORT_CHUNK_BYTES", 256)
+
+    chunks = export.csv_lines(PRODUCT_EXPORT_FIELDS, export.iter_rows(products_export_query()))
+    first = next(chunks)
+    # Um bloco enviado antes de o resultado inteiro ser lido, nenhuma entidade na sessão
+    assert first.startswith(b"id,name")
+    assert b"Produto 50" not in first
+    assert len(sessions) == 1 and len(sessions[0].identity_map) == 0
+
+    body = first + b"".join(chunks)
+    assert list(csv.reader(io.StringIO(body.decode()))) == [PRODUCT_EXPORT_FIELDS] + expected_rows()
@@ -0,0 +1,51 @@
+import pytest
+
+from app import hashing
+from app.executor import hash_executor
+
+
+@pytest.fixture
+def settings():
+    """Restaura o custo configurado pelo conftest (BCRYPT_ROUNDS=5)."""
+    original = hashing.current_settings()
+    yield
+    hashing.configure(*original)
+
+
+def hash_with(rounds: int, password: str = "segredo") -> str:
+    return hashing.pwd_context.handler("bcrypt").using(rounds=rounds).hash(password)
+
+
+def rounds_of(hashed: str) -> int:
+    return int(hashed.split("$")[2])
+
+
+def test_explicit_rounds_rehash_up_and_down(settings):
+    hashing.configure(5)
+
+    for stored in (hash_with(4), hash_with(6)):
+        valid, new_hash = hashing.verify_and_update("segredo", stored)
+        assert valid
+        assert rounds_of(new_hash) == 5
+    assert hashing.verify_and_update("segredo", hash_with(5)) == (True, None)
+
+
+def test_calibrated_range_keeps_hashes_inside_it(settings):
+    hashing.configure(5, floor=4, ceiling=6)
+
+    for rounds in (4, 5, 6):
+        assert hashing.verify_and_update("segredo", hash_with(rounds)) == (True, None)
+    valid, new_hash = hashing.verify_and_update("segredo", hash_with(7))
+    assert valid and rounds_of(new_hash) == 5
+
+
+def test_wrong_password_is_not_rehashed(settings):
+    hashing.configure(5)
+    assert hashing.verify_and_update("errada", hash_with(4)) == (False, None)
+
+
+def test_process_workers_get_the_parent_range(settings):
+    hashing.configure(5, floor=4, ceiling=6)
+    initargs = hash_executor.initargs() if callable(hash_executor.initargs) else hash_executor.initargs
+    assert initargs == (5, 4, 6)
+    assert hash_executor.initializer is hashing.configure
@@ -0,0 +1,111 @@
+"""Importação de produtos em lote: validação antes do banco, INSERT com
+múltiplos VALUES por bloco e, se o banco recusar o bloco, linha a linha."""
+import io
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app import importer
+from app.database import Product, User, UserRole
+from app.importer import import_products, read_csv, validate_product_row
+from app.utils import create_access_token
+
+CSV = (
+    "name,current_stock,min_stock,max_stock\n"
+    "Parafuso,5,1,10\n"
+    ",5,1,10\n"                   # 2: sem nome
+    "Porca,cinco,1,10\n"          # 3: estoque não numérico
+    "Arruela,5,10,10\n"           # 4: max_stock <= min_stock
+    "Prego,-1,1,10\n"             # 5: estoque negativo
+    "Rebite,0,0,3\n"
+    f"{'x' * 101},1,1,10\n"       # 7: nome longo demais
+    "Bucha,,,4\n"                 # 8: campos opcionais vazios
+)
+
+
+def product_names(db) -> list[str]:
+    return list(db.scalars(select(Product.name).order_by(Product.id)))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+def test_valid_rows_land_and_bad_rows_are_reported(db, chunk_size):
+    report = import_products(db, read_csv(io.BytesIO(CSV.encode())), chunk_size=chunk_size)
+
+    assert report.inserted == 3
+    assert product_names(db) == ["Parafuso", "Rebite", "Bucha"]
+    assert [error["line"] for error in report.errors] == [2, 3, 4, 5, 7]
+    assert "name" in report.errors[0]["error"]
+    assert "max_stock" in report.errors[2]["error"]
+
+
+@pytest.mark.parametrize("row", [
+    {"name": "Negativo", "current_stock": 0, "min_stock": -1, "max_stock": 5},
+    {"name": "Invertido", "current_stock": 0, "min_stock": 5, "max_stock": 5},
+    {"name": "Sem estoque", "current_stock": -3, "min_stock": 0, "max_stock": 5},
+])
+def test_validation_mirrors_the_check_constraints(db, row):
+    with pytest.raises(ValueError):
+        validate_product_row(row)
+    with pytest.raises(IntegrityError):
+        with db.begin_nested():
+            db.execute(insert(Product).values(row))
+
+
+def test_rejected_chunk_falls_back_to_row_by_row(db, monkeypatch):
+    # Sem a validação, a linha 2 só é recusada pelo banco e derruba o bloco
+    monkeypatch.setattr(importer, "validate_product_row", lambda row: row)
+    rows = [
+        {"name": "A", "current_stock": 0, "min_stock": 1, "max_stock": 5},
+        {"name": "B", "current_stock": 0, "min_stock": 5, "max_stock": 1},
+        {"name": "C", "current_stock": 0, "min_stock": 1, "max_stock": 5},
+    ]
+
+    report = import_products(db, rows)
+
+    assert report.inserted == 2
+    assert product_names(db) == ["A", "C"]
+    assert [error["line"] for error in report.errors] == [2]
+    assert "check_max_stock_greater" in report.errors[0]["error"]
+
+
+def test_copy_sends_the_rows_as_csv():
+    class Cursor:
+        def copy_expert(self, sql, buffer):
+            self.sql, self.payload = sql, buffer.read()
+
+        def close(self):
+            self.closed = True
+
+    cursor = Cursor()
+    raw = SimpleNamespace(cursor=lambda: cursor)
+    session = SimpleNamespace(connection=lambda: SimpleNamespace(connection=raw))
+
+    rows = [
+        {"name": 'Tinta "azul", 1L', "current_stock": 2, "min_stock": 1, "max_stock": 4},
+        {"name": "Lixa", "current_stock": 0, "min_stock": 0, "max_stock": 9},
+    ]
+    importer._copy_products(session, rows)
+
+    assert cursor.sql == "COPY products (name, current_stock, min_stock, max_stock) FROM STDIN WITH (FORMAT csv)"
+    assert cursor.payload.splitlines() == ['"Tinta ""azul"", 1L",2,1,4', "Lixa,0,0,9"]
+    assert cursor.closed
+
+
+@pytest.mark.anyio
+async def test_import_endpoint_reports_errors_per_line(client, db):
+    db.execute(insert(User), [{"id": 1, "email": "gerente@example.com", "hashed_password": "x", "role": UserRole.MANAGER}])
+    db.commit()
+    token = create_access_token(data={"sub": "gerente@example.com", "id": 1})
+
+    response = await client.post(
+        "/products/import",
+        files={"file": ("produtos.csv", CSV.encode(), "text/csv")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["inserted"] == 3
+    assert [error["line"] for error in body["errors"]] == [2, 3, 4, 5, 7]
@@ -0,0 +1,53 @@
+import pytest
+from jose import jwt
+from sqlalchemy import select
+
+from app import crud_async
+from app.database import User, UserRole
+from app.hashing import pwd_context, verify_password
+
+pytestmark = pytest.mark.anyio
+
+
+# ---------------------- Login ----------------------
+
+async def test_login_returns_tokens(client, async_db):
+    user = await crud_async.create_user(async_db, "eva@example.com", "segredo", UserRole.MANAGER)
+
+    response = await client.post("/login", json={"email": "eva@example.com", "password": "segredo"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["user_id"] == user.id
+    assert body["token_type"] == "bearer"
+    claims = jwt.get_unverified_claims(body["access_token"])
+    assert (claims["sub"], claims["id"]) == ("eva@example.com", user.id)
+
+    protected = await client.get("/protected", headers={"Authorization": f"Bearer {body['access_token']}"})
+    assert protected.json() == {"id": user.id, "email": "eva@example.com"}
+
+
+@pytest.mark.parametrize("email, password", [("eva@example.com", "errada"), ("ninguem@example.com", "segredo")])
+async def test_login_rejects_bad_credentials(client, async_db, email, password):
+    await crud_async.create_user(async_db, "eva@example.com", "segredo", UserRole.MANAGER)
+
+    response = await client.post("/login", json={"email": email, "password": password})
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Usuário ou senha incorretos"
+
+
+async def test_login_rehashes_weaker_password(client, db):
+    # Hash gravado com custo abaixo do configurado (BCRYPT_ROUNDS=5 nos testes)
+    weak = pwd_context.handler("bcrypt").using(rounds=4).hash("segredo")
+    db.add(User(email="fabio@example.com", hashed_password=weak, role=UserRole.OPERATOR))
+    db.commit()
+
+    response = await client.post("/login", json={"email": "fabio@example.com", "password": "segredo"})
+
+    assert response.status_code == 200
+    db.expire_all()
+    stored = db.scalars(select(User.hashed_password).where(User.email == "fabio@example.com")).one()
+    assert stored != weak
+    assert pwd_context.identify(stored) == "bcrypt" and "$05$" in stored
+    assert verify_password("segredo", stored)
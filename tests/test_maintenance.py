@@ -0,0 +1,57 @@
+"""Limpeza periódica de refresh tokens e da blacklist: um processo por vez."""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app import maintenance
+from app.database import AccessTokenBlacklist, RefreshToken, User, UserRole
+
+
+@pytest.fixture
+def tokens(db):
+    now = datetime.utcnow()
+    db.execute(insert(User), [{"id": 1, "email": "ana@example.com", "hashed_password": "x", "role": UserRole.BUYER}])
+    db.execute(insert(RefreshToken), [
+        {"user_id": 1, "jti": "valido", "expires_at": now + timedelta(days=1), "revoked": False},
+        {"user_id": 1, "jti": "expirado", "expires_at": now - timedelta(days=1), "revoked": False},
+        {"user_id": 1, "jti": "revogado", "expires_at": now + timedelta(days=1), "revoked": True},
+    ])
+    old = now - timedelta(days=maintenance.REFRESH_TOKEN_EXPIRE_DAYS + 1)
+    db.execute(insert(AccessTokenBlacklist), [
+        {"token": "antigo", "jti": "antigo", "revoked_at": old},
+        {"token": "recente", "jti": "recente", "revoked_at": now},
+    ])
+    db.commit()
+
+
+def remaining(db) -> tuple[list[str], list[str]]:
+    return (
+        sorted(db.scalars(select(RefreshToken.jti))),
+        sorted(db.scalars(select(AccessTokenBlacklist.jti))),
+    )
+
+
+def test_run_purge_removes_expired_and_revoked_tokens(db, tokens):
+    report = maintenance.run_purge()
+
+    assert report["complete"]
+    assert report["purged"] == {"refresh_tokens": 2, "access_token_blacklist": 1}
+    assert remaining(db) == (["valido"], ["recente"])
+
+
+def test_run_purge_skips_while_another_process_holds_the_lock(db, tokens, monkeypatch):
+    @contextmanager
+    def held_elsewhere():
+        yield False
+
+    monkeypatch.setattr(maintenance, "purge_lock", held_elsewhere)
+
+    assert maintenance.run_purge() is None
+    assert db.scalar(select(func.count()).select_from(RefreshToken)) == 3
+
+
+def test_lock_is_always_granted_without_postgres():
+    with maintenance.purge_lock() as acquired:
+        assert acquired
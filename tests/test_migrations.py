@@ -0,0 +1,95 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, insert, inspect
+
+from app.database import Base, Product, PRStatus, PurchaseRequest, User, UserRole
+
+VERSIONS = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+
+def load_migration(name: str):
+    spec = importlib.util.spec_from_file_location(name, VERSIONS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(engine, migration, step: str) -> None:
+    with engine.begin() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            getattr(migration, step)()
+
+
+# ---------------------- b6d2f9e41a73: SC pendente única por produto ----------------------
+
+@pytest.fixture
+def before_unique_pending(tmp_path):
+    """Banco no esquema anterior à migração (sem o índice único parcial)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migration.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX uq_purchase_pending_product")
+        conn.execute(insert(User), [{"id": 1, "email": "a@example.com", "hashed_password": "x", "role": UserRole.BUYER}])
+        conn.execute(insert(Product), [
+            {"id": i, "name": f"Produto {i}", "min_stock": 1, "max_stock": 5} for i in (1, 2, 3)
+        ])
+    yield engine
+    engine.dispose()
+
+
+def add_requests(engine, rows: list[tuple[int, PRStatus]]) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(PurchaseRequest), [
+            {"product_id": product_id, "quantity": 1, "requester_id": 1, "status": status}
+            for product_id, status in rows
+        ])
+
+
+def statuses(engine) -> list[tuple[int, int, PRStatus]]:
+    with engine.connect() as conn:
+        return conn.execute(
+            PurchaseRequest.__table__.select()
+            .with_only_columns(PurchaseRequest.id, PurchaseRequest.product_id, PurchaseRequest.status)
+            .order_by(PurchaseRequest.id)
+        ).all()
+
+
+def index_names(engine) -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes("purchase_requests")}
+
+
+def test_unique_pending_migration_refuses_duplicates(before_unique_pending):
+    engine = before_unique_pending
+    add_requests(engine, [
+        (1, PRStatus.PENDING), (1, PRStatus.PENDING), (2, PRStatus.PENDING),
+        (1, PRStatus.APPROVED), (3, PRStatus.PENDING), (3, PRStatus.PENDING),
+    ])
+    before = statuses(engine)
+    migration = load_migration("b6d2f9e41a73_unique_pending_purchase_request")
+
+    with pytest.raises(RuntimeError) as exc_info:
+        run(engine, migration, "upgrade")
+
+    message = str(exc_info.value)
+    assert "produto 1: SCs [1, 2]" in message
+    assert "produto 3: SCs [5, 6]" in message
+    assert "produto 2" not in message
+    # Nenhuma SC alterada e nenhum índice criado
+    assert statuses(engine) == before
+    assert "uq_purchase_pending_product" not in index_names(engine)
+
+
+def test_unique_pending_migration_creates_and_drops_index(before_unique_pending):
+    engine = before_unique_pending
+    add_requests(engine, [(1, PRStatus.PENDING), (1, PRStatus.APPROVED), (2, PRStatus.PENDING)])
+    migration = load_migration("b6d2f9e41a73_unique_pending_purchase_request")
+
+    run(engine, migration, "upgrade")
+    assert "uq_purchase_pending_product" in index_names(engine)
+
+    run(engine, migration, "downgrade")
+    assert "uq_purchase_pending_product" not in index_names(engine)
@@ -0,0 +1,45 @@
+"""Cache de usuários autenticados: uma leitura do banco que cruza com uma
+alteração do usuário não pode deixar o valor antigo em cache."""
+import pytest
+
+from app import crud
+from app.cache import Principal, TTLCache, principal_cache
+from app.database import UserRole
+from app.dependencies import get_current_user
+from app.utils import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+def test_set_after_an_invalidation_is_skipped():
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation()
+    cache.invalidate(1)
+
+    assert not cache.set(1, "antigo", generation=generation)
+    assert cache.get(1) is None
+    assert cache.set(1, "novo", generation=cache.generation())
+    assert cache.get(1) == "novo"
+
+
+async def test_user_change_during_the_lookup_is_not_cached(db, async_db, monkeypatch):
+    user = crud.create_user(db, "bia@example.com", "segredo", UserRole.OPERATOR)
+    token = create_access_token(data={"sub": user.email, "id": user.id})
+    lookup = async_db.get
+
+    async def get_then_promote(model, ident):
+        stale = await lookup(model, ident)
+        # Outra requisição promove o usuário depois da leitura e antes do set
+        crud.update_user(db, ident, role=UserRole.MANAGER)
+        return stale
+
+    monkeypatch.setattr(async_db, "get", get_then_promote)
+    principal = await get_current_user(token, async_db)
+
+    assert principal == Principal(id=user.id, email="bia@example.com", role="operator")
+    assert principal_cache.get(user.id) is None
+
+    monkeypatch.undo()
+    async_db.expire_all()
+    assert (await get_current_user(token, async_db)).role == "manager"
+    assert principal_cache.get(user.id).role == "manager"
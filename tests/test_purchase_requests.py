@@ -0,0 +1,136 @@
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app import crud
+from app.database import Product, PRStatus, PurchaseRequest, User, UserRole
+from app.rollups import rebuild_rollups
+
+
+@pytest.fixture
+def catalog(db):
+    """Solicitante 1 e produtos 1-3 abaixo do mínimo, 4 acima."""
+    db.execute(insert(User), [{"id": 1, "email": "compras@example.com", "hashed_password": "x", "role": UserRole.BUYER}])
+    db.execute(insert(Product), [
+        {"id": i, "name": f"Produto {i}", "min_stock": 10, "max_stock": 50, "current_stock": stock}
+        for i, stock in ((1, 0), (2, 10), (3, 4), (4, 11))
+    ])
+    db.commit()
+
+
+def pending_by_product(db) -> dict[int, int]:
+    query = (
+        select(PurchaseRequest.product_id, func.count())
+        .where(PurchaseRequest.status == PRStatus.PENDING)
+        .group_by(PurchaseRequest.product_id)
+    )
+    return dict(db.execute(query).all())
+
+
+def test_generate_creates_one_pending_request_per_product(db, catalog):
+    assert crud.generate_purchase_requests(db, requester_id=1) == 3
+    assert crud.generate_purchase_requests(db, requester_id=1) == 0
+
+    assert pending_by_product(db) == {1: 1, 2: 1, 3: 1}
+    quantities = dict(db.execute(select(PurchaseRequest.product_id, PurchaseRequest.quantity)).all())
+    assert quantities == {1: 50, 2: 40, 3: 46}
+    assert crud.get_purchase_request_status_counts(db)[PRStatus.PENDING] == 3
+
+
+def test_generate_after_approval_creates_a_new_request(db, catalog):
+    crud.generate_purchase_requests(db, requester_id=1, product_ids=[1])
+    request_id = db.scalar(select(PurchaseRequest.id))
+    crud.update_purchase_request_status(db, request_id, PRStatus.APPROVED)
+
+    assert crud.generate_purchase_requests(db, requester_id=1, product_ids=[1, 4]) == 1
+    assert pending_by_product(db) == {1: 1}
+
+
+def test_second_pending_request_for_a_product_is_refused(db, catalog):
+    assert crud.create_purchase_request(db, product_id=1, quantity=5, requester_id=1) is not None
+
+    assert crud.create_purchase_request(db, product_id=1, quantity=7, requester_id=1) is None
+    assert pending_by_product(db) == {1: 1}
+    assert crud.get_purchase_request_status_counts(db)[PRStatus.PENDING] == 1
+
+    # Outros status não entram no índice
+    db.execute(insert(PurchaseRequest), [
+        {"product_id": 1, "quantity": 1, "requester_id": 1, "status": status}
+        for status in (PRStatus.APPROVED, PRStatus.APPROVED, PRStatus.REJECTED)
+    ])
+    db.commit()
+    assert pending_by_product(db) == {1: 1}
+
+
+def test_reopening_a_request_while_another_is_pending_is_refused(db, catalog):
+    first = crud.create_purchase_request(db, product_id=1, quantity=5, requester_id=1)
+    crud.update_purchase_request_status(db, first.id, PRStatus.REJECTED)
+    crud.create_purchase_request(db, product_id=1, quantity=7, requester_id=1)
+
+    assert crud.update_purchase_request_status(db, first.id, PRStatus.PENDING) is None
+
+    db.expire_all()
+    assert crud.get_purchase_request_by_id(db, first.id).status == PRStatus.REJECTED
+    counts = crud.get_purchase_request_status_counts(db)
+    assert (counts[PRStatus.PENDING], counts[PRStatus.REJECTED]) == (1, 1)
+
+
+def test_other_integrity_errors_still_raise(db, catalog):
+    with pytest.raises(IntegrityError):
+        crud.create_purchase_request(db, product_id=999, quantity=1, requester_id=1)
+
+
+# ---------------------- Decisão em lote (alçada) ----------------------
+
+@pytest.fixture
+def pending_requests(db, catalog):
+    """SCs pendentes nos produtos 1-4 (max_stock 50) com quantidades 10, 80,
+    60 e 30; a do produto 4 já foi aprovada."""
+    rows = [(1, 10, PRStatus.PENDING), (2, 80, PRStatus.PENDING), (3, 60, PRStatus.PENDING), (4, 30, PRStatus.APPROVED)]
+    db.execute(insert(PurchaseRequest), [
+        {"id": product_id, "product_id": product_id, "quantity": quantity, "requester_id": 1, "status": status}
+        for product_id, quantity, status in rows
+    ])
+    rebuild_rollups(db)
+
+
+def statuses(db) -> dict[int, PRStatus]:
+    db.expire_all()
+    return dict(db.execute(select(PurchaseRequest.id, PurchaseRequest.status)).all())
+
+
+def test_buyer_decides_only_within_the_approval_limit(db, pending_requests):
+    # Limite 70: SC 2 (80) está acima dele; SC 3 (60) está no limite, mas
+    # acima do estoque máximo do produto (50)
+    result = crud.bulk_update_purchase_request_status(
+        db, [3, 1, 2, 4, 99, 1], PRStatus.APPROVED, UserRole.BUYER, buyer_limit=70
+    )
+
+    assert result == {"updated": [1], "not_updated": [2, 3, 4, 99]}
+    assert statuses(db) == {1: PRStatus.APPROVED, 2: PRStatus.PENDING, 3: PRStatus.PENDING, 4: PRStatus.APPROVED}
+
+
+def test_buyer_limit_applies_to_rejections(db, pending_requests):
+    result = crud.bulk_update_purchase_request_status(db, [1, 2], PRStatus.REJECTED, UserRole.BUYER, buyer_limit=5)
+    assert result == {"updated": [], "not_updated": [1, 2]}
+
+
+def test_manager_decides_above_the_limit(db, pending_requests):
+    result = crud.bulk_update_purchase_request_status(db, [1, 2, 3, 4], PRStatus.REJECTED, UserRole.MANAGER, buyer_limit=5)
+
+    assert result == {"updated": [1, 2, 3], "not_updated": [4]}
+    counts = crud.get_purchase_request_status_counts(db)
+    assert (counts[PRStatus.PENDING], counts[PRStatus.REJECTED]) == (0, 3)
+
+
+def test_operator_decides_nothing(db, pending_requests):
+    result = crud.bulk_update_purchase_request_status(db, [1, 2], PRStatus.APPROVED, UserRole.OPERATOR)
+    assert result == {"updated": [], "not_updated": [1, 2]}
+    assert statuses(db)[1] == PRStatus.PENDING
+
+
+def test_default_limit_comes_from_the_environment(db, pending_requests):
+    assert crud.BUYER_APPROVAL_MAX_QUANTITY == 100
+    result = crud.bulk_update_purchase_request_status(db, [1, 2], PRStatus.APPROVED, UserRole.BUYER)
+    # SC 2 (80) está dentro do limite padrão, mas acima do estoque máximo
+    assert result == {"updated": [1], "not_updated": [2]}
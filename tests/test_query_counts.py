@@ -0,0 +1,73 @@
+"""As listagens de SCs custam um número constante de queries, qualquer que
+seja o tamanho da página (sem N+1 ao montar "SC #, produto, solicitante")."""
+import pytest
+from sqlalchemy import insert
+
+from app import crud
+from app.database import Product, PRStatus, PurchaseRequest, User, UserRole
+from app.instrumentation import track_queries
+
+PAGE_SIZES = [5, 20, 60]
+
+
+@pytest.fixture
+def purchase_requests(db):
+    """3 solicitantes (com 60, 30 e 10 SCs) e 20 produtos."""
+    db.execute(insert(User), [
+        {"id": i, "email": f"user{i}@example.com", "hashed_password": "x", "role": UserRole.BUYER}
+        for i in (1, 2, 3)
+    ])
+    db.execute(insert(Product), [
+        {"id": i, "name": f"Produto {i}", "min_stock": 1, "max_stock": 10} for i in range(1, 21)
+    ])
+    requesters = [1] * 60 + [2] * 30 + [3] * 10
+    db.execute(insert(PurchaseRequest), [
+        {"product_id": n % 20 + 1, "requester_id": user_id, "quantity": 1, "status": PRStatus.APPROVED}
+        for n, user_id in enumerate(requesters)
+    ])
+    db.commit()
+    db.expunge_all()
+
+
+def dashboard_rows(requests) -> list[tuple]:
+    """O que um painel mostra por SC; acessa os relacionamentos de cada linha."""
+    return [(r.id, r.product.name, r.requester.email) for r in requests]
+
+
+def count(db, fn) -> int:
+    db.expunge_all()
+    with track_queries() as stats:
+        fn(db)
+    return stats.queries
+
+
+def counts_by_page_size(db, fn) -> list[int]:
+    return [count(db, lambda db: fn(db, n)) for n in PAGE_SIZES]
+
+
+def test_lazy_loading_is_n_plus_one(db, purchase_requests):
+    # Referência: sem eager loading, cada SC carrega produto e solicitante à parte
+    counts = counts_by_page_size(db, lambda db, n: dashboard_rows(crud.get_purchase_requests_page(db, n)[0]))
+    assert counts == sorted(counts) and counts[0] < counts[-1]
+
+
+def test_page_with_details_is_constant(db, purchase_requests):
+    counts = counts_by_page_size(
+        db, lambda db, n: dashboard_rows(crud.get_purchase_requests_page(db, n, with_details=True)[0])
+    )
+    assert len(set(counts)) == 1
+
+
+def test_summaries_page_is_constant(db, purchase_requests):
+    counts = counts_by_page_size(db, lambda db, n: crud.get_purchase_request_summaries_page(db, n))
+    assert len(set(counts)) == 1
+
+
+def test_requests_by_user_with_product_is_constant(db, purchase_requests):
+    counts = [
+        count(db, lambda db, user_id=user_id: [
+            (r.id, r.product.name) for r in crud.get_purchase_requests_by_user(db, user_id, with_product=True)
+        ])
+        for user_id in (1, 2, 3)
+    ]
+    assert len(set(counts)) == 1
@@ -0,0 +1,117 @@
+import fakeredis
+import pytest
+
+from app import crud_async, ratelimit
+from app.database import UserRole
+from app.instrumentation import DB_QUERIES
+from app.ratelimit import MemoryBackend, RedisBackend, enforce_rate_limit, refill, take
+
+pytestmark = pytest.mark.anyio
+
+
+# ---------------------- Token bucket ----------------------
+
+def test_refill_is_capped_at_burst():
+    assert refill(0, updated_at=10, now=12, burst=5, rate=1) == 2
+    assert refill(4, updated_at=10, now=100, burst=5, rate=1) == 5
+    # Relógio voltando não tira fichas
+    assert refill(3, updated_at=10, now=9, burst=5, rate=1) == 3
+
+
+def test_take_reports_time_until_next_token():
+    assert take(2, burst=5, rate=0.5) == (True, 1, 0.0)
+    allowed, tokens, retry_after = take(0.5, burst=5, rate=0.5)
+    assert (allowed, tokens, retry_after) == (False, 0.5, 1.0)
+
+
+@pytest.mark.parametrize("rate", [0, 1e-9])
+def test_take_caps_retry_after(rate):
+    allowed, _, retry_after = take(0, burst=5, rate=rate)
+    assert not allowed
+    assert retry_after == ratelimit.RATE_LIMIT_MAX_RETRY_AFTER
+
+
+# ---------------------- Backends ----------------------
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        backend = MemoryBackend()
+    else:
+        backend = RedisBackend(client=fakeredis.FakeAsyncRedis())
+    ratelimit.set_backend(backend)
+    return backend
+
+
+async def test_backend_allows_burst_then_limits(backend):
+    results = [await backend.hit("k", burst=3, rate=0.5) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(2.0, abs=0.05)
+    # Chaves independentes
+    assert (await backend.hit("outra", burst=3, rate=0.5))[0]
+
+
+async def test_backend_with_zero_refill(backend):
+    assert (await backend.hit("k", burst=1, rate=0))[0]
+    allowed, retry_after = await backend.hit("k", burst=1, rate=0)
+    assert not allowed
+    assert retry_after == ratelimit.RATE_LIMIT_MAX_RETRY_AFTER
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        await backend.hit(key, burst=1, rate=0)
+    # "a" (usada de novo) continua vazia; "b" saiu e recomeça com o balde cheio
+    assert not (await backend.hit("a", burst=1, rate=0))[0]
+    assert (await backend.hit("b", burst=1, rate=0))[0]
+
+
+async def test_enforce_rate_limit_raises_429_with_retry_after(backend):
+    from fastapi import HTTPException
+
+    await enforce_rate_limit([("teste", "k", 1, 0)])
+    with pytest.raises(HTTPException) as exc_info:
+        await enforce_rate_limit([("teste", "k", 1, 0)])
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["Retry-After"] == str(int(ratelimit.RATE_LIMIT_MAX_RETRY_AFTER))
+
+
+# ---------------------- Login ----------------------
+
+async def test_login_is_limited_before_touching_the_database(backend, client, async_db):
+    await crud_async.create_user(async_db, "gil@example.com", "segredo", UserRole.OPERATOR)
+    attempt = {"email": "gil@example.com", "password": "errada"}
+    for _ in range(int(ratelimit.LOGIN_EMAIL_BURST)):
+        assert (await client.post("/login", json=attempt)).status_code == 401
+
+    queries_before = DB_QUERIES.value(route="/login")
+    assert queries_before > 0
+    response = await client.post("/login", json=attempt)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == round(1 / ratelimit.LOGIN_EMAIL_REFILL)
+    assert DB_QUERIES.value(route="/login") == queries_before
+    # O limite é por email: outro usuário do mesmo IP ainda passa pelo balde
+    other = await client.post("/login", json={"email": "outro@example.com", "password": "x"})
+    assert other.status_code == 401
+
+
+async def test_locked_email_does_not_drain_the_ip_budget(backend, client, monkeypatch):
+    monkeypatch.setattr(ratelimit, "LOGIN_IP_BURST", 8)
+    monkeypatch.setattr(ratelimit, "LOGIN_IP_REFILL", 1e-6)
+    monkeypatch.setattr(ratelimit, "LOGIN_EMAIL_REFILL", 1e-6)
+    locked = {"email": "alvo@example.com", "password": "x"}
+    for _ in range(int(ratelimit.LOGIN_EMAIL_BURST)):
+        assert (await client.post("/login", json=locked)).status_code == 401
+    for _ in range(10):
+        assert (await client.post("/login", json=locked)).status_code == 429
+
+    # Sobram 3 fichas do IP (8 - 5) para os vizinhos de NAT
+    statuses = [
+        (await client.post("/login", json={"email": f"vizinho{i}@example.com", "password": "x"})).status_code
+        for i in range(4)
+    ]
+    assert statuses == [401, 401, 401, 429]
@@ -0,0 +1,118 @@
+"""Roteamento de leituras (RoutingSession/ReplicaSet) com dois SQLite: o
+banco dos testes como primário e uma cópia com conteúdo diferente como
+réplica, para saber de onde cada leitura veio."""
+import pytest
+from sqlalchemy import create_engine, select
+
+from app import database
+from app.database import Base, Product, ReadSessionLocal, ReplicaSet
+
+
+def product_row(name: str) -> dict:
+    return {"id": 1, "name": name, "min_stock": 1, "max_stock": 10, "current_stock": 0}
+
+
+@pytest.fixture
+def replica_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Product.__table__.insert(), product_row("réplica"))
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def primary(db):
+    db.execute(Product.__table__.insert(), product_row("primário"))
+    db.commit()
+
+
+def use_replicas(monkeypatch, urls: list[str]) -> ReplicaSet:
+    replica_set = ReplicaSet(urls)
+    monkeypatch.setattr(database, "replicas", replica_set)
+    return replica_set
+
+
+@pytest.fixture
+def replica_set(monkeypatch, replica_url, primary):
+    replica_set = use_replicas(monkeypatch, [replica_url])
+    yield replica_set
+    replica_set.dispose()
+
+
+def read_name(db) -> str:
+    return db.scalar(select(Product.name).where(Product.id == 1))
+
+
+def test_reads_use_the_replica(replica_set):
+    with ReadSessionLocal() as db:
+        assert read_name(db) == "réplica"
+        assert db.get(Product, 1).name == "réplica"
+
+
+def test_flush_pins_the_session_to_the_primary(replica_set):
+    with ReadSessionLocal() as db:
+        assert read_name(db) == "réplica"
+        db.add(Product(id=2, name="Novo", min_stock=1, max_stock=5))
+        db.flush()
+        assert read_name(db) == "primário"
+        db.rollback()
+        # Continua no primário até o fim da sessão
+        assert read_name(db) == "primário"
+
+
+def test_for_update_pins_the_session_to_the_primary(replica_set):
+    with ReadSessionLocal() as db:
+        locked = db.execute(select(Product.name).where(Product.id == 1).with_for_update()).scalar_one()
+        assert locked == "primário"
+        assert read_name(db) == "primário"
+
+
+def test_closed_session_goes_back_to_the_replica(replica_set):
+    db = ReadSessionLocal()
+    db.use_primary()
+    assert read_name(db) == "primário"
+    db.close()
+    assert read_name(db) == "réplica"
+    db.close()
+
+
+def test_no_replicas_reads_from_the_primary(monkeypatch, primary):
+    use_replicas(monkeypatch, [])
+    with ReadSessionLocal() as db:
+        assert read_name(db) == "primário"
+
+
+def test_replica_connect_failure_falls_back_to_the_primary(monkeypatch, tmp_path, primary):
+    down = use_replicas(monkeypatch, [f"sqlite:///{tmp_path / 'inexistente' / 'replica.db'}"])
+    replica = down.replicas[0]
+
+    with ReadSessionLocal() as db:
+        assert read_name(db) == "primário"
+        assert db.get(Product, 1).name == "primário"
+
+    assert not replica.healthy
+    assert replica.failures == 1
+    # Fora do rodízio até o fim do tempo de espera
+    assert down.choose() is None
+    down.dispose()
+
+
+def test_choose_checks_a_replica_before_putting_it_back(monkeypatch, tmp_path, replica_url, primary):
+    replica_set = use_replicas(monkeypatch, [f"sqlite:///{tmp_path / 'inexistente' / 'replica.db'}", replica_url])
+    down, back = replica_set.replicas
+    for replica in (down, back):
+        replica.mark_down()
+        replica.retry_at = 0.0
+
+    # A primeira ainda não conecta: continua fora e o próximo teste é adiado
+    assert replica_set.choose() is back
+    assert not down.healthy and down.retry_at > 0
+    assert back.healthy
+    assert replica_set.choose() is back
+
+    with ReadSessionLocal() as db:
+        assert read_name(db) == "réplica"
+    replica_set.dispose()
@@ -0,0 +1,98 @@
+"""Revogação de refresh tokens: filtro de Bloom em memória (carga inicial e
+atualização a partir da blacklist) e cache de tokens verificados."""
+from datetime import datetime, timedelta
+
+import pytest
+from jose import JWTError
+from sqlalchemy import insert
+
+from app import auth, cache, revocation
+from app.auth import create_refresh_token, revoke_refresh_token, verify_token
+from app.cache import decode_token, token_cache_stats
+from app.database import AccessTokenBlacklist, User, UserRole
+from app.revocation import RevocationFilter
+
+
+@pytest.fixture
+def revocation_filter(monkeypatch):
+    """Filtro novo por teste, usado tanto pelo auth quanto pelo cache de tokens."""
+    bloom = RevocationFilter(capacity=1000, error_rate=0.001)
+    monkeypatch.setattr(auth, "revocation_filter", bloom)
+    monkeypatch.setattr(cache, "revocation_filter", bloom)
+    monkeypatch.setattr(revocation, "REVOCATION_FILTER_REFRESH_SECONDS", 0)
+    return bloom
+
+
+@pytest.fixture
+def refresh_token(db):
+    db.execute(insert(User), [{"id": 1, "email": "ana@example.com", "hashed_password": "x", "role": UserRole.BUYER}])
+    db.commit()
+    return create_refresh_token(db, 1)
+
+
+def jti_of(token: str) -> str:
+    return decode_token(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])["jti"]
+
+
+def revoke_elsewhere(db, jti: str, revoked_at: datetime | None = None) -> None:
+    """Revogação gravada por outro processo: só a blacklist muda."""
+    db.execute(insert(AccessTokenBlacklist), [
+        {"token": jti, "jti": jti, "revoked_at": revoked_at or datetime.utcnow()}
+    ])
+    db.commit()
+
+
+def test_token_revoked_before_the_seed_is_rejected(db, revocation_filter, refresh_token):
+    revoke_elsewhere(db, jti_of(refresh_token))
+    revocation_filter.seed(db)
+
+    assert revocation_filter.might_contain(jti_of(refresh_token))
+    with pytest.raises(JWTError, match="revoked"):
+        verify_token(db, refresh_token, token_type="refresh")
+
+
+def test_revocation_from_another_process_is_picked_up_by_refresh(db, revocation_filter, refresh_token):
+    assert verify_token(db, refresh_token, token_type="refresh")["sub"] == "1"
+
+    revoke_elsewhere(db, jti_of(refresh_token))
+
+    with pytest.raises(JWTError, match="revoked"):
+        verify_token(db, refresh_token, token_type="refresh")
+
+
+def test_late_commit_inside_the_overlap_window_is_picked_up(db, revocation_filter, refresh_token):
+    other = create_refresh_token(db, 1)
+    revoke_elsewhere(db, jti_of(other))
+    revocation_filter.seed(db)
+
+    # Gravada antes da última revogação vista, mas confirmada só agora
+    watermark = revocation_filter._bloom.watermark
+    revoke_elsewhere(db, jti_of(refresh_token), revoked_at=watermark - timedelta(seconds=60))
+
+    with pytest.raises(JWTError, match="revoked"):
+        verify_token(db, refresh_token, token_type="refresh")
+
+
+def test_local_revocation_is_rejected_without_a_refresh(db, revocation_filter, refresh_token, monkeypatch):
+    revocation_filter.seed(db)
+    monkeypatch.setattr(revocation, "REVOCATION_FILTER_REFRESH_SECONDS", 3600)
+
+    revoke_refresh_token(db, jti_of(refresh_token))
+
+    with pytest.raises(JWTError, match="revoked"):
+        verify_token(db, refresh_token, token_type="refresh")
+
+
+def test_cached_payload_is_not_served_once_its_jti_may_be_revoked(db, revocation_filter, refresh_token):
+    jti = jti_of(refresh_token)
+    decodes = token_cache_stats()["decodes"]
+    jti_of(refresh_token)
+    assert token_cache_stats()["decodes"] == decodes  # Servido do cache
+
+    revocation_filter.add(jti)
+
+    jti_of(refresh_token)
+    assert token_cache_stats()["decodes"] == decodes + 1
+    assert jti == jti_of(refresh_token)
+    # Enquanto o jti estiver no filtro, cada uso refaz a verificação completa
+    assert token_cache_stats()["decodes"] == decodes + 2
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import crud, stock
+from app.database import DailyProductMovement, Product, PRStatus, PurchaseRequest, StockMovement, User, UserRole
+from app.utils import create_access_token
+
+
+@pytest.fixture
+def products(db):
+    """Operador 1 e produtos 1 (estoque 20, mínimo 5) e 2 (estoque 3, mínimo 2)."""
+    db.execute(insert(User), [{"id": 1, "email": "op@example.com", "hashed_password": "x", "role": UserRole.OPERATOR}])
+    db.execute(insert(Product), [
+        {"id": 1, "name": "Parafuso", "min_stock": 5, "max_stock": 40, "current_stock": 20},
+        {"id": 2, "name": "Porca", "min_stock": 2, "max_stock": 10, "current_stock": 3},
+    ])
+    db.commit()
+
+
+def stock_levels(db) -> dict[int, int]:
+    db.expire_all()
+    return dict(db.execute(select(Product.id, Product.current_stock)).all())
+
+
+def ledger(db) -> list[tuple[int, int]]:
+    return db.execute(select(StockMovement.product_id, StockMovement.quantity).order_by(StockMovement.id)).all()
+
+
+def test_movements_are_grouped_per_product(db, products):
+    result = crud.apply_stock_movements(db, [
+        {"product_id": 1, "quantity": -4},
+        {"product_id": 2, "quantity": 5},
+        {"product_id": 1, "quantity": 10},
+        {"product_id": 1, "quantity": -1, "note": "avaria"},
+    ])
+
+    assert result == {"applied": 4, "products": [1, 2], "rejected": [], "purchase_requests_created": 0}
+    assert stock_levels(db) == {1: 25, 2: 8}
+    assert ledger(db) == [(1, -4), (2, 5), (1, 10), (1, -1)]
+    assert db.scalar(select(StockMovement.note).where(StockMovement.quantity == -1)) == "avaria"
+
+
+def test_product_that_would_go_negative_is_rejected_whole(db, products):
+    # O saldo do produto 2 no lote (+1 - 5) deixaria o estoque em -1: todas
+    # as movimentações dele são descartadas, inclusive a entrada
+    result = crud.apply_stock_movements(db, [
+        {"product_id": 2, "quantity": 1},
+        {"product_id": 1, "quantity": -2},
+        {"product_id": 2, "quantity": -5},
+        {"product_id": 3, "quantity": 1},
+    ])
+
+    assert result["products"] == [1]
+    assert result["rejected"] == [
+        {"product_id": 2, "reason": "Estoque insuficiente"},
+        {"product_id": 3, "reason": "Produto não encontrado"},
+    ]
+    assert stock_levels(db) == {1: 18, 2: 3}
+    assert ledger(db) == [(1, -2)]
+
+
+def test_whole_batch_rejected_leaves_nothing_behind(db, products):
+    result = crud.apply_stock_movements(db, [{"product_id": 1, "quantity": -21}, {"product_id": 2, "quantity": -4}], user_id=1)
+
+    assert result["applied"] == 0 and result["products"] == []
+    assert stock_levels(db) == {1: 20, 2: 3}
+    assert ledger(db) == []
+    assert db.scalars(select(DailyProductMovement)).all() == []
+    assert db.scalars(select(PurchaseRequest)).all() == []
+
+
+def test_movements_update_the_daily_rollup(db, products):
+    crud.apply_stock_movements(db, [
+        {"product_id": 1, "quantity": -4},
+        {"product_id": 1, "quantity": 6},
+        {"product_id": 2, "quantity": 2},
+    ])
+    crud.apply_stock_movements(db, [{"product_id": 1, "quantity": -1}])
+
+    today = datetime.utcnow().date()
+    series = crud.get_daily_movements(db, today, today, product_id=1)
+    assert [(day["inbound"], day["outbound"], day["movements"]) for day in series] == [(6, 5, 3)]
+    catalog = crud.get_daily_movements(db, today, today)
+    assert [(day["inbound"], day["outbound"], day["movements"]) for day in catalog] == [(8, 5, 4)]
+
+
+def test_stock_at_minimum_generates_purchase_requests(db, products):
+    result = crud.apply_stock_movements(db, [
+        {"product_id": 1, "quantity": -15},  # 20 -> 5 (= mínimo)
+        {"product_id": 2, "quantity": 4},    # entrada: não avalia
+    ], user_id=1)
+
+    assert result["purchase_requests_created"] == 1
+    created = db.execute(select(PurchaseRequest.product_id, PurchaseRequest.quantity, PurchaseRequest.status)).all()
+    assert created == [(1, 35, PRStatus.PENDING)]
+
+    # Nova saída do mesmo produto não duplica a SC pendente
+    again = crud.apply_stock_movements(db, [{"product_id": 1, "quantity": -1}], user_id=1)
+    assert again["purchase_requests_created"] == 0
+    assert crud.get_purchase_request_status_counts(db)[PRStatus.PENDING] == 1
+
+
+def test_without_user_no_purchase_request_is_generated(db, products):
+    result = crud.apply_stock_movements(db, [{"product_id": 1, "quantity": -18}])
+    assert result["purchase_requests_created"] == 0
+    assert db.scalars(select(PurchaseRequest)).all() == []
+
+
+# ---------------------- Rota ----------------------
+
+def auth_header() -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': 'op@example.com', 'id': 1})}"}
+
+
+@pytest.mark.anyio
+async def test_route_rejects_batches_over_the_limit(client, db, products, monkeypatch):
+    monkeypatch.setattr(stock, "STOCK_MOVEMENT_MAX_BATCH", 2)
+    movements = [{"product_id": 1, "quantity": -1}] * 3
+
+    response = await client.post("/stock/movements", json={"movements": movements}, headers=auth_header())
+
+    assert response.status_code == 413
+    assert stock_levels(db) == {1: 20, 2: 3}
+
+    response = await client.post("/stock/movements", json={"movements": movements[:2]}, headers=auth_header())
+    assert response.status_code == 200
+    assert response.json()["applied"] == 2
+    assert stock_levels(db) == {1: 18, 2: 3}